@@ -0,0 +1,229 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from Core.data_model import Model
+from Core.geometry_utils import ray_quad_distances, classify_boxes, INSIDE, INTERSECTING, OUTSIDE
+from Core.metrics import metrics
+
+# 最近傍探索で1回の交差判定カーネル呼び出しにまとめる葉の数
+_LEAVES_PER_BATCH = 16
+
+# 面のAABBを広げる量。交差判定 (Möller–Trumbore) の epsilon と揃え、境界上の交点を取りこぼさないようにする。
+_AABB_PADDING = 1e-6
+
+# @intent:operation 0〜1に正規化した座標から 30bit の Morton コード（Z-order）を計算します。
+def _morton_codes(points: np.ndarray) -> np.ndarray:
+    lo = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lo, 1e-12)
+    cells = np.clip(((points - lo) / extent * 1023.0).astype(np.int64), 0, 1023)
+    codes = np.zeros(len(points), dtype=np.int64)
+    for axis in range(3):
+        v = cells[:, axis]
+        v = (v | (v << 16)) & 0x030000FF
+        v = (v | (v << 8)) & 0x0300F00F
+        v = (v | (v << 4)) & 0x030C30C3
+        v = (v | (v << 2)) & 0x09249249
+        codes |= v << (2 - axis)
+    return codes
+
+# @intent:responsibility Model の面の AABB（軸平行境界ボックス）に対する境界ボリューム階層（BVH）。レイと面の交差判定を面数に対して対数オーダーで行います。
+# @intent:rationale 面の重心を Morton コード順に並べ、leaf_size 個ずつを葉とする完全二分木（ヒープ配置: ノード k の子は 2k, 2k+1）として構築します。
+# 木の形が配列の添字だけで決まるため、構築・再フィット・探索のいずれもレベル単位のベクトル演算で行えます。
+# @intent:lifecycle Model の DirtyTracker を購読し、頂点の移動は次回の問い合わせ時に該当する葉から根までを再フィット、
+# 位相の変更（面の追加・削除）は次回の問い合わせ時に再構築します。不要になった時点で release() を呼び出すこと。
+class FaceBVH:
+    def __init__(self, model: Model, leaf_size: int = 8):
+        self._model = model
+        self._leaf_size = leaf_size
+        self._tracker = model.create_dirty_tracker()
+        self._leaf_base = 0                 # 葉ノードの先頭番号 P（葉 i はノード P + i）
+        self._leaf_rows = None              # (P, leaf_size) 葉ごとの面の行番号。空きは -1
+        self._leaf_of_row = None            # (F,) 面の行番号 -> 葉番号
+        self._face_lo = None                # (F + 1, 3) 面のAABB。末尾は空きスロット用の番兵 (+inf)
+        self._face_hi = None                # (F + 1, 3) 末尾は番兵 (-inf)
+        self._node_lo = None                # (2P, 3) ノードのAABB（ノード0は未使用）
+        self._node_hi = None
+
+    def release(self):
+        self._model.release_dirty_tracker(self._tracker)
+
+    # @intent:operation レイと最も近い交差面を求めます。
+    # @intent:return (距離 t, 面の行番号)。交差しない場合は None。
+    # 候補の葉をレイが入る距離の近い順に数個ずつまとめて判定し、既に見つかった交点より遠い葉に達した時点で打ち切ります。
+    def intersect(self, origin, direction) -> Optional[Tuple[float, int]]:
+        t_enter, leaves = self._candidate_leaves(origin, direction)
+        best: Optional[Tuple[float, int]] = None
+        for start in range(0, len(leaves), _LEAVES_PER_BATCH):
+            if best is not None and t_enter[start] > best[0]:
+                break
+            hits = self._intersect_leaves(origin, direction, leaves[start:start + _LEAVES_PER_BATCH])
+            if hits and (best is None or hits[0] < best):
+                best = hits[0]
+        return best
+
+    # @intent:operation レイと交差する全ての面を距離の近い順に返します。
+    def intersect_all(self, origin, direction) -> List[Tuple[float, int]]:
+        _, leaves = self._candidate_leaves(origin, direction)
+        return self._intersect_leaves(origin, direction, leaves)
+
+    # @intent:operation 視錐台（`frustum_planes` の平面群）と交差する、または内側にある葉の番号を昇順で返します。
+    # @intent:rationale 木をレベルごとに辿り、完全に内側のノードはそれ以上判定せずに配下の葉（連続した番号）をまとめて採用します。
+    # 判定の回数は視錐台の境界にかかるノードの数に比例し、画面外の部分木は根に近いレベルで打ち切られます。
+    def visible_leaves(self, planes: np.ndarray) -> np.ndarray:
+        self._sync()
+        if self._leaf_rows is None:
+            return np.zeros(0, dtype=np.int64)
+        accepted = []
+        nodes = np.array([1], dtype=np.int64)
+        level = 1
+        while nodes.size:
+            state = classify_boxes(self._node_lo[nodes], self._node_hi[nodes], planes)
+            if level == self._leaf_base:
+                accepted.append(nodes[state != OUTSIDE] - self._leaf_base)
+                break
+            inside = nodes[state == INSIDE]
+            if inside.size:
+                span = self._leaf_base // level
+                first = (inside - level) * span
+                accepted.append((first[:, None] + np.arange(span)).ravel())
+            partial = nodes[state == INTERSECTING]
+            nodes = np.concatenate((partial * 2, partial * 2 + 1))
+            level *= 2
+        leaves = np.concatenate(accepted) if accepted else np.zeros(0, dtype=np.int64)
+        # 面を持たない葉（末尾の空き）は除く
+        leaves = leaves[self._leaf_rows[leaves, 0] >= 0]
+        return np.sort(leaves)
+
+    # @intent:operation 葉ごとの AABB を返します（(lo, hi)。いずれも (L, 3)）。
+    def leaf_bounds(self, leaves: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        nodes = leaves + self._leaf_base
+        return self._node_lo[nodes], self._node_hi[nodes]
+
+    # @intent:operation 葉に含まれる面の行番号 (L, leaf_size) を返します。空きは -1。
+    def leaf_rows(self, leaves: np.ndarray) -> np.ndarray:
+        return self._leaf_rows[leaves]
+
+    # @intent:operation レイが通過する葉を、レイが葉のAABBに入る距離の近い順に返します。
+    # 木をレベルごとに幅優先で辿り、各レベルのフロンティアに対するスラブ判定を1回のベクトル演算で行います。
+    # @intent:return (t_enter, leaves)。いずれも同じ長さの配列。
+    def _candidate_leaves(self, origin, direction) -> Tuple[np.ndarray, np.ndarray]:
+        self._sync()
+        if self._leaf_rows is None:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        origin = np.asarray(origin, dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            inv_dir = 1.0 / np.asarray(direction, dtype=np.float64)
+
+        nodes = np.array([1], dtype=np.int64)
+        while True:
+            hit, t_enter = self._slab_test(nodes, origin, inv_dir)
+            nodes = nodes[hit]
+            t_enter = t_enter[hit]
+            if nodes.size == 0 or nodes[0] >= self._leaf_base:
+                break
+            nodes = np.concatenate((nodes * 2, nodes * 2 + 1))
+
+        order = np.argsort(t_enter, kind="stable")
+        return t_enter[order], nodes[order] - self._leaf_base
+
+    def _slab_test(self, nodes: np.ndarray, origin: np.ndarray, inv_dir: np.ndarray):
+        lo = self._node_lo[nodes]
+        hi = self._node_hi[nodes]
+        with np.errstate(invalid="ignore"):
+            t1 = (lo - origin) * inv_dir
+            t2 = (hi - origin) * inv_dir
+        # 方向成分が0でスラブ境界上にある場合の NaN は fmin/fmax で無視する
+        t_min = np.fmax(np.fmin(t1, t2).max(axis=1), 0.0)
+        t_max = np.fmax(t1, t2).min(axis=1)
+        valid = lo[:, 0] <= hi[:, 0]
+        return valid & (t_max >= t_min), t_min
+
+    # @intent:operation 指定した葉に含まれる面とレイの交差をベクトル化カーネルで一括判定し、(t, row) を近い順に返します。
+    def _intersect_leaves(self, origin, direction, leaves: np.ndarray) -> List[Tuple[float, int]]:
+        rows = self._leaf_rows[leaves].ravel()
+        rows = np.sort(rows[rows >= 0])
+        if metrics.enabled:
+            metrics.count("bvh.faces_tested", len(rows))
+        t = ray_quad_distances(origin, direction, self._model.face_coordinates(rows))
+        hit = np.isfinite(t)
+        rows, t = rows[hit], t[hit]
+        order = np.argsort(t, kind="stable")
+        return list(zip(t[order].tolist(), rows[order].tolist()))
+
+    # @intent:operation DirtyTracker に蓄積された変更を取り込みます。
+    def _sync(self):
+        topology_changed, lo, hi = self._tracker.take()
+        if topology_changed:
+            self._build()
+        elif lo < hi and self._leaf_rows is not None:
+            if hi - lo > self._model.vertex_count // 4:
+                self._refit_all()
+            else:
+                offsets, adjacent = self._model.vertex_face_adjacency()
+                self._refit_rows(np.unique(adjacent[offsets[lo]:offsets[hi]]))
+
+    def _build(self):
+        face_count = len(self._model.face_indices)
+        if face_count == 0:
+            self._leaf_rows = None
+            return
+        with metrics.span("bvh.build", "core", faces=face_count):
+            self._build_tree(face_count)
+
+    def _build_tree(self, face_count: int):
+        self._compute_face_bounds()
+        centroids = (self._face_lo[:-1] + self._face_hi[:-1]) * 0.5
+        order = np.argsort(_morton_codes(centroids), kind="stable")
+
+        leaf_count = -(-face_count // self._leaf_size)
+        self._leaf_base = 1 << (leaf_count - 1).bit_length()
+        leaf_rows = np.full(self._leaf_base * self._leaf_size, -1, dtype=np.int64)
+        leaf_rows[:face_count] = order
+        self._leaf_rows = leaf_rows.reshape(self._leaf_base, self._leaf_size)
+        self._leaf_of_row = np.empty(face_count, dtype=np.int64)
+        self._leaf_of_row[order] = np.arange(face_count) // self._leaf_size
+
+        self._node_lo = np.full((2 * self._leaf_base, 3), np.inf)
+        self._node_hi = np.full((2 * self._leaf_base, 3), -np.inf)
+        self._refit_nodes()
+
+    def _compute_face_bounds(self, rows: Optional[np.ndarray] = None):
+        if rows is None:
+            corners = self._model.face_coordinates()
+            self._face_lo = np.vstack((corners.min(axis=1) - _AABB_PADDING, np.full((1, 3), np.inf)))
+            self._face_hi = np.vstack((corners.max(axis=1) + _AABB_PADDING, np.full((1, 3), -np.inf)))
+        else:
+            corners = self._model.face_coordinates(rows)
+            self._face_lo[rows] = corners.min(axis=1) - _AABB_PADDING
+            self._face_hi[rows] = corners.max(axis=1) + _AABB_PADDING
+
+    def _refit_all(self):
+        self._compute_face_bounds()
+        self._refit_nodes()
+
+    # @intent:operation 全ての葉のAABBを面のAABBから求め、レベルごとに親へ集約します。
+    def _refit_nodes(self):
+        base = self._leaf_base
+        # 空きスロット (-1) は番兵行を参照するため、集約結果に影響しない
+        self._node_lo[base:] = self._face_lo[self._leaf_rows].min(axis=1)
+        self._node_hi[base:] = self._face_hi[self._leaf_rows].max(axis=1)
+        level = base // 2
+        while level >= 1:
+            self._node_lo[level:2 * level] = np.minimum(self._node_lo[2 * level:4 * level:2],
+                                                        self._node_lo[2 * level + 1:4 * level:2])
+            self._node_hi[level:2 * level] = np.maximum(self._node_hi[2 * level:4 * level:2],
+                                                        self._node_hi[2 * level + 1:4 * level:2])
+            level //= 2
+
+    # @intent:operation 指定した面を含む葉から根までの経路だけを再フィットします。
+    def _refit_rows(self, rows: np.ndarray):
+        if rows.size == 0:
+            return
+        self._compute_face_bounds(rows)
+        leaves = np.unique(self._leaf_of_row[rows])
+        nodes = leaves + self._leaf_base
+        self._node_lo[nodes] = self._face_lo[self._leaf_rows[leaves]].min(axis=1)
+        self._node_hi[nodes] = self._face_hi[self._leaf_rows[leaves]].max(axis=1)
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            self._node_lo[nodes] = np.minimum(self._node_lo[2 * nodes], self._node_lo[2 * nodes + 1])
+            self._node_hi[nodes] = np.maximum(self._node_hi[2 * nodes], self._node_hi[2 * nodes + 1])
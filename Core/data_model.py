@@ -1,73 +1,267 @@
-from typing import List, Callable, Optional
+from typing import Dict, Iterable, List, Callable, Optional, Tuple
+from contextlib import contextmanager
+import gc
 import uuid
+import weakref
+import numpy as np
+from Core.vertex_store import VertexStore
+from Core.dirty_tracker import DirtyTracker
+from Core.model_change import ModelChange
+from Core.topology import build_vertex_face_adjacency, weld_coordinates
+from Core.metrics import metrics
+from Core.transform import as_matrix
+
+# 登録された Observer がこの数以下の間はタプルで保持し、超えた場合は dict（挿入順を保つ集合）に切り替える
+_SMALL_OBSERVER_LIMIT = 8
+
+# @intent:responsibility 弱参照で登録された Observer。参照先が破棄されると、登録元の Observable から自動的に外れます。
+# @intent:rationale 元のコールバックと等価（==, hash）に振る舞うため、remove_observer には元のコールバックをそのまま渡せます。
+class _WeakObserver:
+    __slots__ = ("_ref", "_hash", "__weakref__")
+
+    def __init__(self, callback: Callable, owner: "Observable"):
+        owner_ref = weakref.ref(owner)
+
+        def on_dead(_, entry_ref=weakref.ref(self)):
+            observable, entry = owner_ref(), entry_ref()
+            if observable is not None and entry is not None:
+                observable._discard_observer(entry)
+
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            self._ref = weakref.WeakMethod(callback, on_dead)
+        else:
+            self._ref = weakref.ref(callback, on_dead)
+        self._hash = hash(callback)
+
+    def __call__(self, *args, **kwargs):
+        callback = self._ref()
+        if callback is not None:
+            callback(*args, **kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, _WeakObserver):
+            return self is other
+        callback = self._ref()
+        return callback is not None and callback == other
+
+    def __hash__(self):
+        return self._hash
 
 # @intent:responsibility データ変更を監視するための基底クラス。UIフレームワークに依存しないObserverパターンを提供します。
-# @intent:warning 循環参照（Observer <-> Subject）に注意してください。Observerは自身のライフサイクル終了時に必ず remove_observer を呼び出す責務があります。
+# @intent:warning 循環参照（Observer <-> Subject）に注意してください。強参照で登録した Observer は、自身のライフサイクル終了時に remove_observer を呼び出す責務があります。
+# 寿命を管理できない Observer は `add_observer(callback, weak=True)` で登録すると、破棄された時点で自動的に外れます。
+# @intent:rationale 数百万の Vertex / Face が Observable となるため、登録先はインスタンスごとに遅延して確保します（Observer がなければ何も確保しない）。
+# 少数（`_SMALL_OBSERVER_LIMIT` 以下）の間は不変のタプル、それを超えると dict として保持し、登録・解除はいずれも O(1) です。
+# 配送中の登録・解除は、配送中の呼び出しには影響しません（タプルは置き換えのみ、dict は配送前に複製する）。
+# 通知は `Model.batch()` のトランザクション中は即時配送されず、所属する Model に保留されます。
+# `_notify_rank` は保留された通知の配送順（Vertex -> Face -> Model）を表し、連鎖通知を1回に集約するために使われます。
 class Observable:
-    def __init__(self):
-        self._observers: List[Callable] = []
+    _notify_rank = 0
+    # None（Observer なし） / tuple / dict {callback: None}
+    _observers = None
 
-    def add_observer(self, callback: Callable):
-        self._observers.append(callback)
+    # @intent:operation Observer を登録します。weak=True の場合は弱参照で保持し、参照先が破棄されると自動的に登録が外れます。
+    # 同じコールバックの二重登録は無視されます。
+    # @intent:pre-condition weak=True に渡せるのは関数・バウンドメソッドなど弱参照を作成できるコールバックのみ（一時的な lambda は即座に外れる）。
+    def add_observer(self, callback: Callable, weak: bool = False):
+        entry = _WeakObserver(callback, self) if weak else callback
+        observers = self._observers
+        if observers is None:
+            self._observers = (entry,)
+        elif type(observers) is tuple:
+            if callback in observers:
+                return
+            if len(observers) < _SMALL_OBSERVER_LIMIT:
+                self._observers = observers + (entry,)
+            else:
+                registry = dict.fromkeys(observers)
+                registry[entry] = None
+                self._observers = registry
+        elif callback not in observers:
+            observers[entry] = None
 
     def remove_observer(self, callback: Callable):
-        if callback in self._observers:
-            self._observers.remove(callback)
+        self._discard_observer(callback)
+
+    # @intent:operation 登録されている Observer の数（破棄済みの弱参照は含まない）。
+    @property
+    def observer_count(self) -> int:
+        return len(self._observers) if self._observers is not None else 0
+
+    def _discard_observer(self, callback: Callable):
+        observers = self._observers
+        if observers is None:
+            return
+        if type(observers) is tuple:
+            if callback in observers:
+                remaining = tuple(entry for entry in observers if not entry == callback)
+                self._observers = remaining or None
+        elif callback in observers:
+            del observers[callback]
+            if not observers:
+                self._observers = None
 
     def notify_observers(self, *args, **kwargs):
-        for callback in self._observers:
+        batch = self._notification_batch()
+        if batch is not None:
+            if metrics.enabled:
+                metrics.count("notify.deferred." + type(self).__name__)
+            batch._defer(self, args, kwargs)
+            return
+        self._dispatch(args, kwargs)
+
+    # @intent:operation 登録された Observer を呼び出します。計測が有効な場合は型ごとの呼び出し数（fan-out）を数えます。
+    def _dispatch(self, args: tuple, kwargs: dict):
+        observers = self._observers
+        if observers is None:
+            if metrics.enabled:
+                metrics.count("notify." + type(self).__name__, 0)
+            return
+        if type(observers) is not tuple:
+            observers = tuple(observers)
+        if metrics.enabled:
+            metrics.count("notify." + type(self).__name__, len(observers))
+        for callback in observers:
             callback(*args, **kwargs)
 
+    # @intent:operation 通知を保留すべきトランザクション中の Model を返します。即時配送する場合は None。
+    def _notification_batch(self) -> Optional["Model"]:
+        return None
+
 # @intent:responsibility 3D空間上の1点を表現します。
 # @intent:lifecycle ModelまたはFaceに所有されますが、実体は共有される可能性があります。
+# @intent:rationale Modelに追加された頂点は座標を自身では持たず、Modelが所有する VertexStore の1行を指すインデックスビューになります。
+# Modelに属さない（Detached）間だけ、座標を自身のリスト `_local` に保持します。
+# 配列から一括構築した Model の頂点は、`Model.vertex(index)` や面から最初に参照された時点で生成されます。
 class Vertex(Observable):
+    _notify_rank = 0
+
     def __init__(self, x: float, y: float, z: float):
         super().__init__()
-        self._x = x
-        self._y = y
-        self._z = z
+        self._model: Optional["Model"] = None
+        self._store: Optional[VertexStore] = None
+        self._index = -1
+        self._local: Optional[List[float]] = [float(x), float(y), float(z)]
+
+    def _get(self, axis: int) -> float:
+        if self._store is None:
+            return self._local[axis]
+        return self._store.get(self._index, axis)
+
+    def _set(self, axis: int, value: float):
+        value = float(value)
+        if self._store is None:
+            if self._local[axis] == value:
+                return
+            self._local[axis] = value
+        else:
+            previous = self._store.get_xyz(self._index)
+            if previous[axis] == value:
+                return
+            self._store.set(self._index, axis, value)
+            self._model._on_vertex_written(self._index, previous)
+        self._notify_changed()
 
     # @intent:rationale プロパティ経由でのアクセスにより、変更時に自動的に通知を発火させます。
     @property
-    def x(self) -> float: return self._x
+    def x(self) -> float: return self._get(0)
     @x.setter
-    def x(self, value: float):
-        if self._x != value:
-            self._x = value
-            self.notify_observers(self)
+    def x(self, value: float): self._set(0, value)
 
     @property
-    def y(self) -> float: return self._y
+    def y(self) -> float: return self._get(1)
     @y.setter
-    def y(self, value: float):
-        if self._y != value:
-            self._y = value
-            self.notify_observers(self)
+    def y(self, value: float): self._set(1, value)
 
     @property
-    def z(self) -> float: return self._z
+    def z(self) -> float: return self._get(2)
     @z.setter
-    def z(self, value: float):
-        if self._z != value:
-            self._z = value
-            self.notify_observers(self)
+    def z(self, value: float): self._set(2, value)
+
+    # @intent:operation 3軸の座標をまとめて更新します。
+    # @intent:rationale 軸ごとのプロパティ代入では最大3回の通知が発生するため、書き込みを1回の通知に集約します。
+    def set(self, x: float, y: float, z: float):
+        new = [float(x), float(y), float(z)]
+        if self._store is None:
+            if self._local == new:
+                return
+            self._local = new
+        else:
+            previous = self._store.get_xyz(self._index)
+            if previous == new:
+                return
+            self._store.set_xyz(self._index, *new)
+            self._model._on_vertex_written(self._index, previous)
+        self._notify_changed()
+
+    # @intent:operation 自身の Observer に通知し、Model に属する場合は Model にも通知します。
+    # @intent:rationale Model への通知は面を経由せずに直接行います。面が頂点を監視するのは、その面に Observer がある間だけです。
+    def _notify_changed(self):
+        self.notify_observers(self)
+        if self._model is not None:
+            self._model.notify_observers()
+
+    # @intent:operation Model内での頂点インデックス（VertexStoreの行番号）。Modelに属さない場合は -1。
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def _notification_batch(self) -> Optional["Model"]:
+        return self._model._notification_batch() if self._model is not None else None
+
+    def _attach(self, model: "Model", index: int):
+        self._model = model
+        self._store = model._store
+        self._index = index
+        self._local = None
+
+    def _detach(self):
+        self._local = self._store.get_xyz(self._index)
+        self._model = None
+        self._store = None
+        self._index = -1
 
     def __repr__(self):
-        return f"Vertex({self._x}, {self._y}, {self._z})"
+        return f"Vertex({self.x}, {self.y}, {self.z})"
 
 # @intent:responsibility 4つの頂点からなる「面」を定義します。
 # @intent:invariant 常に4つの頂点を持ち、反時計回りの順序（左下->右下->右上->左上）であることを期待します。
+# @intent:rationale Modelに追加された面は、Modelのインデックス配列 `face_indices` の1行 (`row`) に対応するビューとなります。
+# 頂点の変更を面の Observer へ伝えるための頂点の監視は、面に Observer が登録されている間だけ行います（Observer のない面は頂点に何も登録しない）。
 class Face(Observable):
+    _notify_rank = 1
+
     def __init__(self, vertices: List[Vertex], face_id: Optional[str] = None):
         super().__init__()
         if len(vertices) != 4:
             raise ValueError("A Face must consist of exactly 4 vertices.")
         self._vertices = vertices
         self._id = face_id or str(uuid.uuid4())
-        
-        # 頂点の変更もFaceの変更として通知する
-        for v in self._vertices:
-            v.add_observer(self._on_vertex_changed)
+        self._model: Optional["Model"] = None
+        self._row = -1
+
+    # @intent:operation 最初の Observer の登録時に、頂点の監視を開始します。
+    def add_observer(self, callback: Callable, weak: bool = False):
+        watching = self._observers is not None
+        super().add_observer(callback, weak)
+        if not watching:
+            self._watch_vertices(self._vertices, True)
+
+    # @intent:operation 最後の Observer が外れた時点で、頂点の監視を解除します（弱参照の自動解除を含む）。
+    def _discard_observer(self, callback: Callable):
+        watching = self._observers is not None
+        super()._discard_observer(callback)
+        if watching and self._observers is None:
+            self._watch_vertices(self._vertices, False)
+
+    def _watch_vertices(self, vertices: List[Vertex], watch: bool):
+        # バウンドメソッドは1つを4頂点で共有する
+        handler = self._on_vertex_changed
+        for v in vertices:
+            if watch:
+                v.add_observer(handler)
+            else:
+                v.remove_observer(handler)
 
     def _on_vertex_changed(self, vertex: Vertex):
         self.notify_observers(self)
@@ -80,69 +274,714 @@ class Face(Observable):
     def vertices(self) -> List[Vertex]:
         return self._vertices
 
+    def _notification_batch(self) -> Optional["Model"]:
+        return self._model._notification_batch() if self._model is not None else None
+
+    # @intent:operation 所属するModel。Modelに属さない場合は None。
+    @property
+    def model(self) -> Optional["Model"]:
+        return self._model
+
+    # @intent:operation Model内での行番号（`Model.face_indices` の行）。Modelに属さない場合は -1。
+    @property
+    def row(self) -> int:
+        return self._row
+
     # @intent:operation 頂点リストを更新します。数は4つでなければなりません。
     def update_vertices(self, new_vertices: List[Vertex]):
         if len(new_vertices) != 4:
             raise ValueError("A Face must consist of exactly 4 vertices.")
-        
-        # 古い監視を解除
-        for v in self._vertices:
-            v.remove_observer(self._on_vertex_changed)
-            
+        if self._model is not None:
+            self._model._check_vertices(new_vertices)
+
+        # 監視中であれば、古い頂点の監視を新しい頂点へ付け替える
+        watching = self._observers is not None
+        if watching:
+            self._watch_vertices(self._vertices, False)
+
+        old_vertices = self._vertices
         self._vertices = new_vertices
-        
-        # 新しい監視を追加
-        for v in self._vertices:
-            v.add_observer(self._on_vertex_changed)
-            
+        if self._model is not None:
+            self._model._rebind_face(self, old_vertices)
+
+        if watching:
+            self._watch_vertices(self._vertices, True)
+
         self.notify_observers(self)
+        if self._model is not None:
+            self._model.notify_observers()
 
 # @intent:responsibility 3Dモデリング空間全体の状態（全ての面）を管理します。
 # @intent:role Single Source of Truth. アプリケーション全体で唯一のモデルインスタンスとして扱われることを想定しています。
+# @intent:rationale 頂点座標は VertexStore の連続バッファ (N, 3)、面は (F, 4) の頂点インデックス配列として保持します。
+# モデル全体に対する操作はこれらの配列に対する単一のベクトル演算として実行し、要素ごとのプロパティアクセスを避けます。
+# 面は ID でも引けます。面の削除はスワップ削除（末尾の面が空いた行へ移る）のため、行番号は削除のたびに変わり得ますが、ID は変わりません。
+# @intent:lifecycle 配列から一括構築した Model（`from_arrays`）の Vertex / Face は、最初に参照された時点で生成されます（遅延生成）。
+# @intent:contract Model の Observer は、変更内容を表す `ModelChange`（Core.model_change）を唯一の引数として受け取ります。
 class Model(Observable):
+    _notify_rank = 2
+
     def __init__(self):
         super().__init__()
-        self._faces: List[Face] = []
+        self._store = VertexStore()
+        # 行番号順の面。未生成の面は None（face(row) で生成する）
+        self._faces: List[Optional[Face]] = []
+        self._unmaterialized_faces = 0
+        # 行番号順の面ID と、ID -> 行番号の索引（get_face・ID の重複検査で初めて必要になった時点で構築する）
+        self._face_ids: List[str] = []
+        self._face_rows: Optional[Dict[str, int]] = None
+        self._quads = np.zeros((16, 4), dtype=np.int64)
+        # 頂点→面の隣接関係 (offsets, rows)。位相が変わるたびに破棄し、参照時に再構築する。
+        self._adjacency = None
+        # 重心と境界ボックスの増分管理: 参照カウントで重み付けした座標の総和と参照の総数、
+        # 境界ボックス (最小, 最大)。境界ボックスは縮む可能性のある変更で破棄 (None) し、参照時に再計算する。
+        self._coordinate_sum = [0.0, 0.0, 0.0]
+        self._reference_count = 0
+        self._bounds: Optional[Tuple[List[float], List[float]]] = None
+        # 変更範囲を蓄積する Pull 型利用者（レンダラー等）のトラッカー
+        self._dirty_trackers: List[DirtyTracker] = []
+        # batch() のネスト深度と、配送順（rank）ごとの保留通知 {Observable: (args, kwargs)}
+        self._batch_depth = 0
+        self._pending_notifications = [{}, {}, {}]
+        # 次の通知で配送する変更集合（最初の変更の記録時に生成する）
+        self._change: Optional[ModelChange] = None
 
+    # @intent:operation 頂点座標 (N, 3) と面の頂点インデックス (F, 4) から Model を構築します。
+    # ids を省略した場合、面IDは行番号の文字列 ("0", "1", ...) になります。配列は複製して取り込みます。
+    # @intent:rationale Vertex / Face を1つずつ生成して add_face する代わりに配列をそのまま取り込み、
+    # 要素のオブジェクトと Observer の登録は、要素が参照・監視されるまで作りません。
+    @classmethod
+    def from_arrays(cls, vertices, quads, ids: Optional[Iterable[str]] = None) -> "Model":
+        coordinates = np.array(vertices, dtype=np.float64).reshape(-1, 3)
+        quads = np.array(quads, dtype=np.int64).reshape(-1, 4)
+        if quads.size and (quads.min() < 0 or quads.max() >= len(coordinates)):
+            raise ValueError("Face indices refer to vertices outside the coordinate array.")
+        model = cls()
+        if ids is None:
+            model._load_arrays(coordinates, quads, list(map(str, range(len(quads)))))
+        else:
+            model._load_arrays(coordinates, quads, list(ids))
+        return model
+
+    # @intent:operation モデルの内容を (頂点座標 (N, 3), 面の頂点インデックス (F, 4), 面IDの一覧) の複製として返します。`from_arrays` の逆変換です。
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        return self._store.coordinates.copy(), self.face_indices.copy(), list(self._face_ids)
+
+    # @intent:operation 全ての面（行番号順）。未生成の面はこの時点で全て生成されます。
+    # @intent:warning 大規模なモデルでは、面数だけが必要な場合は `face_count`、特定の面は `face(row)` を用いること。
     @property
     def faces(self) -> List[Face]:
+        if self._unmaterialized_faces:
+            self._materialize_all_faces()
         return self._faces
 
+    @property
+    def face_count(self) -> int:
+        return len(self._faces)
+
+    # @intent:operation 行番号から面を返します（未生成であれば生成します）。
+    def face(self, row: int) -> Face:
+        face = self._faces[row]
+        return face if face is not None else self._materialize_face(row)
+
+    # @intent:operation 行番号順の面IDの一覧（読み取り専用として扱うこと）。面を生成せずに参照できます。
+    @property
+    def face_ids(self) -> List[str]:
+        return self._face_ids
+
+    # @intent:operation 全頂点の座標バッファ (N, 3) を読み取り専用ビューとして返します。
+    @property
+    def coordinates(self) -> np.ndarray:
+        return self._store.coordinates
+
+    # @intent:operation 面ごとの頂点インデックス配列 (F, 4) を読み取り専用ビューとして返します。行番号は `faces` の並びと一致します。
+    @property
+    def face_indices(self) -> np.ndarray:
+        view = self._quads[:len(self._faces)]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def vertex_count(self) -> int:
+        return self._store.count
+
+    # @intent:operation 頂点インデックス（VertexStore の行番号）から Vertex を返します（未生成であれば生成します）。
+    def vertex(self, index: int) -> Vertex:
+        vertex = self._store.owner(index)
+        if vertex is None:
+            vertex = Vertex.__new__(Vertex)
+            vertex._attach(self, index)
+            self._store.set_owner(index, vertex)
+        return vertex
+
+    # @intent:operation 指定行（省略時は全面）の頂点座標を (F, 4, 3) の配列として収集します。
+    def face_coordinates(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        quads = self.face_indices
+        if rows is not None:
+            quads = quads[rows]
+        return self._store.coordinates[quads]
+
+    # @intent:operation 面IDから面を返します。このモデルに属さない場合は None。
+    def get_face(self, face_id: str) -> Optional[Face]:
+        row = self._face_index().get(face_id)
+        return self.face(row) if row is not None else None
+
     # @intent:operation 新しい面を追加します。
     def add_face(self, face: Face):
-        self._faces.append(face)
-        face.add_observer(self._on_face_changed)
-        self.notify_observers(self)
+        self.add_faces([face])
+
+    # @intent:operation 複数の面をまとめて追加します。位相の変更と Model の通知は1回です。
+    # @intent:warning 他のモデルに属する面・頂点、同じ ID の面がモデル内（または faces の中）に既にある場合は、何も追加せずに ValueError を送出します。
+    def add_faces(self, faces: Iterable[Face]):
+        faces = list(faces)
+        ids = self._check_new_faces(faces)
+        if not faces:
+            return
+        row = len(self._faces)
+        self._reserve_faces(row + len(faces))
+        for face in faces:
+            self._quads[row] = [self._attach_vertex(v) for v in face._vertices]
+            face._model = self
+            face._row = row
+            row += 1
+        self._faces.extend(faces)
+        self._face_ids.extend(ids)
+        self._face_index().update(ids)
+        self._on_topology_changed()
+        self._changes()._mark_added(faces)
+        self.notify_observers()
 
     # @intent:operation 面を削除します。
     def remove_face(self, face: Face):
-        if face in self._faces:
-            face.remove_observer(self._on_face_changed)
-            self._faces.remove(face)
-            self.notify_observers(self)
+        self.remove_faces([face])
 
-    def _on_face_changed(self, face: Face):
-        self.notify_observers(self)
+    # @intent:operation 複数の面をまとめて削除します。このモデルに属さない面は無視します。位相の変更と Model の通知は1回です。
+    # @intent:rationale 空いた行には末尾の面を移し（スワップ削除）、行番号が変わるのは移動した面のみとします。
+    # 削除する面の数 k に対して O(k) で、残りの面の行番号を振り直す必要がありません。
+    def remove_faces(self, faces: Iterable[Face]):
+        removed = [face for face in dict.fromkeys(faces) if face._model is self]
+        if not removed:
+            return
+        removed_rows = {face._row for face in removed}
+        # 削除後の範囲 [0, remaining) にある空き行を、範囲外に残る面で埋める
+        count = len(self._faces)
+        remaining = count - len(removed)
+        holes = sorted(row for row in removed_rows if row < remaining)
+        movers = [row for row in range(remaining, count) if row not in removed_rows]
+        index = self._face_rows
+        for face in removed:
+            if index is not None:
+                del index[face._id]
+            face._model = None
+            face._row = -1
+        for hole, row in zip(holes, movers):
+            mover = self._faces[row]
+            self._faces[hole] = mover
+            self._face_ids[hole] = self._face_ids[row]
+            self._quads[hole] = self._quads[row]
+            if mover is not None:
+                mover._row = hole
+            if index is not None:
+                index[self._face_ids[hole]] = hole
+        del self._faces[remaining:]
+        del self._face_ids[remaining:]
+        self._release_vertices([v for face in removed for v in face._vertices])
+        self._on_topology_changed()
+        self._changes()._mark_removed(removed)
+        self.notify_observers()
+
+    # @intent:operation 追加する面を検査し、面ID -> 追加後の行番号を返します。モデルは変更しません。
+    def _check_new_faces(self, faces: List[Face]) -> Dict[str, int]:
+        index = self._face_index()
+        ids = {}
+        for face in faces:
+            if face._model is not None:
+                raise ValueError("The Face already belongs to a model.")
+            if face._id in index or face._id in ids:
+                raise ValueError(f"A Face with ID {face._id!r} already exists in the model.")
+            self._check_vertices(face._vertices)
+            ids[face._id] = len(self._faces) + len(ids)
+        return ids
+
+    # @intent:operation 削除した面を、削除で取り除かれた頂点を削除前のインデックス（indices、面の頂点の順）に戻してから再追加します。
+    # @intent:rationale 削除時のスワップ削除をインデックスの昇順に逆にたどり、頂点インデックスを削除前と一致させる。
+    # 編集履歴は頂点をインデックスで記録するため、面の削除の取り消しをまたいでも同じ頂点を指す必要がある。
+    # @intent:pre-condition モデルが面の削除直後と同じ頂点の並びであること（取り消しの順序で保証される）。
+    # 記録と一致しない頂点は通常の追加と同様に末尾に置きます。
+    def _restore_face(self, face: Face, indices: List[int]):
+        self._check_new_faces([face])
+        detached = sorted({index: vertex for vertex, index in zip(face._vertices, indices)
+                           if vertex._store is None}.items())
+        # 移動した頂点の 現在のインデックス -> 移動前のインデックス
+        origin = {}
+        for index, vertex in detached:
+            if index > self._store.count:
+                break
+            xyz = vertex._local
+            moved_to = self._store.insert(index, xyz, owner=vertex)
+            vertex._attach(self, index)
+            if moved_to >= 0:
+                origin[moved_to] = origin.pop(index, index)
+                owner = self._store.owner(moved_to)
+                if owner is not None:
+                    owner._index = moved_to
+            self._include_in_bounds(xyz)
+        if origin:
+            remap = np.arange(self._store.count, dtype=np.int64)
+            remap[list(origin.values())] = list(origin.keys())
+            quads = self._quads[:len(self._faces)]
+            quads[:] = remap[quads]
+        self.add_faces([face])
+
+    # @intent:operation ID -> 行番号の索引を返します。未構築であれば面IDの一覧から構築します。
+    def _face_index(self) -> Dict[str, int]:
+        if self._face_rows is None:
+            self._face_rows = {face_id: row for row, face_id in enumerate(self._face_ids)}
+        return self._face_rows
+
+    # @intent:operation 未生成の面を、インデックス配列の行と面IDから生成します（頂点も必要に応じて生成されます）。
+    def _materialize_face(self, row: int) -> Face:
+        face = Face.__new__(Face)
+        face._vertices = [self.vertex(i) for i in self._quads[row].tolist()]
+        face._id = self._face_ids[row]
+        face._model = self
+        face._row = row
+        self._faces[row] = face
+        self._unmaterialized_faces -= 1
+        return face
+
+    # @intent:operation 未生成の面と頂点を全て生成します。
+    # @intent:rationale 大量のオブジェクト生成中に世代別GCが繰り返し走るのを避ける（生成するオブジェクトはいずれも不要にならない）。
+    def _materialize_all_faces(self):
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            vertices = [self.vertex(index) for index in range(self._store.count)]
+            faces = self._faces
+            face_ids = self._face_ids
+            for row, quad in enumerate(self._quads[:len(faces)].tolist()):
+                if faces[row] is None:
+                    face = Face.__new__(Face)
+                    face._vertices = [vertices[i] for i in quad]
+                    face._id = face_ids[row]
+                    face._model = self
+                    face._row = row
+                    faces[row] = face
+            self._unmaterialized_faces = 0
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    # @intent:operation 複数の編集を1つのトランザクションにまとめます。ネスト可能です。
+    # @intent:rationale トランザクション中、Model に属する Vertex / Face / Model 自身の通知は保留され、
+    # 同一の Observable への通知は1回（最後の引数）に重複排除されます。最も外側の with を抜けた時点で配送します。
+    # 配送は Vertex -> Face -> Model の順に行い、配送中に発生した連鎖通知も集約するため、
+    # 数千頂点のスクリプト編集でも Model の通知（再描画・パネル更新）は1回になります。
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush_notifications()
+
+    def _notification_batch(self) -> Optional["Model"]:
+        return self if self._batch_depth > 0 else None
+
+    # @intent:operation 蓄積した変更集合を取り出し、Observer へ引数として配送します。
+    # @intent:rationale 変更集合は配送の直前に新しいものへ切り替えるため、配送中（Observer 内）の変更は次の通知の変更集合に記録されます。
+    # batch() 中の通知は Model ごとに1回へ集約されるため、トランザクション内の全ての変更が1つの変更集合として届きます。
+    def _dispatch(self, args: tuple, kwargs: dict):
+        change = self._change
+        self._change = None
+        super()._dispatch((change if change is not None else ModelChange(self),), kwargs)
+
+    # @intent:operation 記録中の変更集合を返します。未生成であれば生成します。
+    def _changes(self) -> ModelChange:
+        change = self._change
+        if change is None:
+            change = self._change = ModelChange(self)
+        return change
+
+    def _defer(self, observable: Observable, args: tuple, kwargs: dict):
+        self._pending_notifications[observable._notify_rank][observable] = (args, kwargs)
+
+    def _flush_notifications(self):
+        # 配送中の連鎖通知も保留して集約するため、配送の間はトランザクション状態を維持する
+        # @intent:rationale 保留中の通知は配送順（rank）ごとに dict ごと取り出して順に配送する。
+        # 先頭から1件ずつ pop すると、削除済みの領域を毎回読み飛ばすため通知数に対して二乗の時間がかかる。
+        # 配送中に同じ rank へ再び保留された Observable は、今回は配送せず最新の引数で次の周回に1回だけ配送する。
+        self._batch_depth += 1
+        try:
+            pending = self._pending_notifications
+            while True:
+                rank = next((r for r, bucket in enumerate(pending) if bucket), None)
+                if rank is None:
+                    break
+                bucket = pending[rank]
+                pending[rank] = {}
+                for observable, (args, kwargs) in bucket.items():
+                    if observable not in pending[rank]:
+                        observable._dispatch(args, kwargs)
+        finally:
+            self._batch_depth -= 1
 
     # @intent:operation 全てのデータをクリアします。
     def clear(self):
         for face in self._faces:
-            face.remove_observer(self._on_face_changed)
+            if face is not None:
+                face._model = None
+                face._row = -1
+        for index in range(self._store.count):
+            owner = self._store.owner(index)
+            if owner is not None:
+                owner._detach()
         self._faces.clear()
-        self.notify_observers(self)
+        self._unmaterialized_faces = 0
+        self._face_ids.clear()
+        self._face_rows = None
+        self._store.clear()
+        self._recompute_extent()
+        self._on_topology_changed()
+        self._changes().reset = True
+        self.notify_observers()
+
+    # @intent:operation モデルの内容を、座標配列 (N, 3)・面インデックス配列 (F, 4)・面IDの一覧で一括して置き換えます。
+    # @intent:rationale 面を1つずつ add_face すると頂点ごとに登録・参照カウント処理が走るため、ファイル読み込み向けに配列を直接取り込みます。
+    # 座標配列はコピーせずに VertexStore のバッファとして採用します（メモリマップした配列をそのまま渡せます）。
+    # Vertex / Face は生成せず、最初に参照された時点で生成します（`vertex(index)` / `face(row)`）。
+    # 空の面ID（None / ""）には新しい ID を割り当てます。面IDが重複している場合は、モデルを変更せずに ValueError を送出します。
+    # @intent:warning 呼び出し側は quads が [0, N) の範囲の頂点を参照していることを保証する責務を負います。
+    def _load_arrays(self, coordinates: np.ndarray, quads: np.ndarray, face_ids: List[str]):
+        if len(face_ids) != len(quads):
+            raise ValueError("The number of face IDs does not match the number of faces.")
+        face_ids = [face_id or str(uuid.uuid4()) for face_id in face_ids]
+        if len(set(face_ids)) != len(face_ids):
+            raise ValueError("Face IDs must be unique within a model.")
+        quads = np.asarray(quads, dtype=np.int64)
+        with self.batch():
+            self.clear()
+            self._store.adopt(coordinates, [None] * len(coordinates),
+                              np.bincount(quads.ravel(), minlength=len(coordinates)))
+            self._recompute_extent()
+            self._reserve_faces(len(quads))
+            self._quads[:len(quads)] = quads
+            self._faces = [None] * len(quads)
+            self._unmaterialized_faces = len(quads)
+            self._face_ids = face_ids
+            self._on_topology_changed()
+            self._changes().reset = True
+            self.notify_observers()
 
     # @intent:operation 全ての頂点を指定された量だけ移動させます。
-    # @intent:rationale パフォーマンスとUIの応答性を維持するため、このメソッドはObserver通知の最適化に責任を持つ。
-    # 個々のVertex.setter経由で更新すると、頂点の数だけ通知が飛び、UIの再描画が大量に発生する。
-    # このメソッドは、全頂点の内部変数を直接更新し、最後にModelとして一度だけ通知することで、これを回避する。
-    # このアプローチはVertexのカプセル化を意図的に破るが、許容可能なトレードオフと判断した。
+    # @intent:rationale 座標はVertexStoreの連続バッファに集約されているため、全頂点の移動は単一のベクトル加算で完了する。
+    # 個々のVertex.setter経由の更新（頂点数分の通知）は発生せず、最後にModelとして一度だけ通知する。
     def translate_all(self, dx: float, dy: float, dz: float):
-        # 頂点の内部変数を直接更新することで、個別の通知を抑制する。
-        for face in self._faces:
-            for v in face.vertices:
-                v._x += dx
-                v._y += dy
-                v._z += dz
-                
-        # モデル全体としての変更を一度だけ通知する。
-        self.notify_observers(self)
+        self._store.translate(dx, dy, dz)
+        delta = (float(dx), float(dy), float(dz))
+        for axis in range(3):
+            self._coordinate_sum[axis] += self._reference_count * delta[axis]
+        if self._bounds is not None:
+            for bound in self._bounds:
+                for axis in range(3):
+                    bound[axis] += delta[axis]
+        for tracker in self._dirty_trackers:
+            tracker.mark_vertices(0, self._store.count)
+        change = self._changes()
+        change.transform = True
+        change._mark_all_vertices()
+        self.notify_observers()
+
+    # @intent:operation 4x4 のアフィン変換行列（`Core.transform` で生成）を、モデル全体または指定した面の頂点に適用します。
+    # @intent:rationale translate_all と同様に、座標バッファへの単一のベクトル演算として適用し、Model として一度だけ通知します。
+    # 個々の Vertex / Face への通知は発生しません。
+    # @intent:warning 頂点は面の間で共有されるため、faces を指定した場合も、それらの面と頂点を共有する他の面は共有頂点の分だけ変形します。
+    def apply_transform(self, matrix, faces: Optional[List[Face]] = None):
+        matrix = as_matrix(matrix)
+        if faces is None:
+            if self._store.count == 0:
+                return
+            self._store.transform(matrix)
+            lo, hi = 0, self._store.count
+            self._recompute_extent()
+            change = self._changes()
+            change.transform = True
+            change._mark_all_vertices()
+        else:
+            if any(face._model is not self for face in faces):
+                raise ValueError("The Face does not belong to this model.")
+            rows = np.fromiter((face._row for face in faces), dtype=np.int64, count=len(faces))
+            indices = np.unique(self.face_indices[rows])
+            if indices.size == 0:
+                return
+            previous = self._store.coordinates[indices]
+            self._store.transform(matrix, indices)
+            delta = self._store.refcounts[indices] @ (self._store.coordinates[indices] - previous)
+            for axis in range(3):
+                self._coordinate_sum[axis] += float(delta[axis])
+            self._bounds = None
+            lo, hi = int(indices[0]), int(indices[-1]) + 1
+            self._changes()._mark_vertices(indices)
+        for tracker in self._dirty_trackers:
+            tracker.mark_vertices(lo, hi)
+        self.notify_observers()
+
+    # @intent:operation 頂点座標を配列から一括で書き込みます。indices を省略した場合は全ての頂点 (N, 3)、指定した場合はその行 (len(indices), 3)。
+    # @intent:rationale apply_transform と同様に座標バッファへの単一の配列代入として書き込み、Model として一度だけ通知します。
+    # `Vertex` を生成しないため、取り消し・やり直しで多数の頂点の座標を戻しても未生成の要素は生成されません。
+    def set_coordinates(self, coordinates, indices: Optional[np.ndarray] = None):
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        if indices is None:
+            if coordinates.shape != (self._store.count, 3):
+                raise ValueError("Coordinates must be an (N, 3) array matching the vertex count.")
+            if self._store.count == 0:
+                return
+            self._store.write(coordinates)
+            lo, hi = 0, self._store.count
+            self._recompute_extent()
+            self._changes()._mark_all_vertices()
+        else:
+            indices = np.asarray(indices, dtype=np.int64)
+            if coordinates.shape != (len(indices), 3):
+                raise ValueError("Coordinates must be an (len(indices), 3) array.")
+            if indices.size == 0:
+                return
+            previous = self._store.coordinates[indices]
+            self._store.write(coordinates, indices)
+            delta = self._store.refcounts[indices] @ (coordinates - previous)
+            for axis in range(3):
+                self._coordinate_sum[axis] += float(delta[axis])
+            self._bounds = None
+            lo, hi = int(indices.min()), int(indices.max()) + 1
+            self._changes()._mark_vertices(indices)
+        for tracker in self._dirty_trackers:
+            tracker.mark_vertices(lo, hi)
+        self.notify_observers()
+
+    # @intent:operation 全ての面が参照する頂点の重心を返します。
+    # @intent:rationale `calculate_center(self.faces)` と同じく「面ごとの頂点出現」を単位とした平均であり、
+    # 共有頂点は参照カウントで重み付けします。総和は頂点の書き込み・面の追加削除・translate_all のたびに O(1) で更新済みのため、
+    # 頂点数によらず定数時間で返ります（Object モードのパネルが通知・スピンボックス操作ごとに参照する）。
+    # @intent:warning 総和は差分の累積であり、丸め誤差を含みます。一括読み込み・clear・weld_vertices の時点で配列から再計算されます。
+    def center(self) -> tuple:
+        if self._reference_count == 0:
+            return (0.0, 0.0, 0.0)
+        return tuple(total / self._reference_count for total in self._coordinate_sum)
+
+    # @intent:operation 全頂点の軸平行境界ボックスを ((min_x, min_y, min_z), (max_x, max_y, max_z)) として返します。頂点がない場合は None。
+    # @intent:rationale 拡大する変更は O(1) で反映し、境界上の頂点が内側へ移動・削除された場合のみ破棄して、次の参照時にバッファから一括で再計算します。
+    def bounds(self) -> Optional[tuple]:
+        if self._store.count == 0:
+            return None
+        if self._bounds is None:
+            coords = self._store.coordinates
+            self._bounds = (coords.min(axis=0).tolist(), coords.max(axis=0).tolist())
+        return tuple(self._bounds[0]), tuple(self._bounds[1])
+
+    # @intent:operation 頂点→面の隣接関係を CSR 形式 (offsets, rows) で返します。頂点 i の隣接面の行番号は rows[offsets[i]:offsets[i+1]]。
+    # 頂点インデックスの連続範囲 [lo, hi) に隣接する面は rows[offsets[lo]:offsets[hi]] として一括で取得できます。
+    def vertex_face_adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = build_vertex_face_adjacency(self.face_indices, self._store.count)
+        return self._adjacency
+
+    # @intent:operation 指定した頂点を共有している面の一覧を返します。
+    # @intent:rationale 隣接関係はインデックス配列から CSR 形式で一括構築してキャッシュし、位相変更時のみ再構築します。
+    def faces_of_vertex(self, vertex: Vertex) -> List[Face]:
+        if vertex._store is not self._store:
+            return []
+        offsets, rows = self.vertex_face_adjacency()
+        adjacent = rows[offsets[vertex._index]:offsets[vertex._index + 1]]
+        return [self.face(row) for row in dict.fromkeys(adjacent.tolist())]
+
+    # @intent:operation 同一座標（許容誤差内）の頂点を1つの共有頂点に統合し、頂点プールの重複を取り除きます。
+    # @intent:return 統合によって取り除かれた頂点の数。
+    # @intent:rationale 各グループで最初に登録された Vertex を代表として残し、他の Vertex を参照していた面を代表へ付け替えます。
+    # 統合された Vertex は座標を保持したまま Model から切り離されます。通知は最後に一度だけ発行します。
+    def weld_vertices(self, tolerance: float = 0.0) -> int:
+        count = self._store.count
+        representatives, inverse = weld_coordinates(self._store.coordinates, tolerance)
+        merged = count - len(representatives)
+        if merged == 0:
+            return 0
+
+        quads = self.face_indices
+        new_quads = inverse[quads]
+        affected_rows = np.nonzero((representatives[new_quads] != quads).any(axis=1))[0]
+        for row in affected_rows.tolist():
+            # 未生成の面は、インデックス配列の付け替えだけでよい
+            face = self._faces[row]
+            if face is None:
+                continue
+            watching = face._observers is not None
+            if watching:
+                face._watch_vertices(face._vertices, False)
+            face._vertices = [self.vertex(i) for i in representatives[new_quads[row]].tolist()]
+            if watching:
+                face._watch_vertices(face._vertices, True)
+
+        dropped = np.ones(count, dtype=bool)
+        dropped[representatives] = False
+        for index in np.nonzero(dropped)[0].tolist():
+            owner = self._store.owner(index)
+            if owner is not None:
+                owner._detach()
+
+        self._store.compact(representatives)
+        for index in range(self._store.count):
+            owner = self._store.owner(index)
+            if owner is not None:
+                owner._index = index
+        self._quads[:len(self._faces)] = new_quads
+        self._store.set_refcounts(np.bincount(new_quads.ravel(), minlength=self._store.count))
+        self._recompute_extent()
+        self._on_topology_changed()
+        self.notify_observers()
+        return merged
+
+    # @intent:operation 変更範囲を蓄積する DirtyTracker を作成して登録します。
+    # @intent:warning 利用者は不要になった時点で release_dirty_tracker を呼び出す責務があります。
+    def create_dirty_tracker(self) -> DirtyTracker:
+        tracker = DirtyTracker()
+        self._dirty_trackers.append(tracker)
+        return tracker
+
+    def release_dirty_tracker(self, tracker: DirtyTracker):
+        if tracker in self._dirty_trackers:
+            self._dirty_trackers.remove(tracker)
+
+    # @intent:operation 頂点の書き込みを変更範囲・重心・境界ボックスに反映します。previous は書き込み前の座標。
+    def _on_vertex_written(self, index: int, previous: List[float]):
+        for tracker in self._dirty_trackers:
+            tracker.mark_vertex(index)
+        change = self._change
+        if change is None:
+            change = self._change = ModelChange(self)
+        change._mark_vertex(index)
+        current = self._store.get_xyz(index)
+        weight = self._store.refcount(index)
+        for axis in range(3):
+            self._coordinate_sum[axis] += weight * (current[axis] - previous[axis])
+        if self._bounds is not None:
+            lower, upper = self._bounds
+            for axis in range(3):
+                if (previous[axis] == lower[axis] and current[axis] > lower[axis]) or \
+                        (previous[axis] == upper[axis] and current[axis] < upper[axis]):
+                    self._bounds = None
+                    return
+            self._extend_bounds(current)
+
+    # @intent:operation 参照カウント付きの座標総和と境界ボックスを、ストアの内容から再計算します。
+    def _recompute_extent(self):
+        refcounts = self._store.refcounts
+        self._reference_count = int(refcounts.sum())
+        self._coordinate_sum = (refcounts @ self._store.coordinates).tolist() if self._store.count else [0.0, 0.0, 0.0]
+        self._bounds = None
+
+    # @intent:operation 新しく登録した頂点を境界ボックスに含めます（最初の頂点であれば境界ボックスを作ります）。
+    def _include_in_bounds(self, xyz: List[float]):
+        if self._store.count == 1:
+            self._bounds = ([*xyz], [*xyz])
+        elif self._bounds is not None:
+            self._extend_bounds(xyz)
+
+    def _extend_bounds(self, xyz: List[float]):
+        lower, upper = self._bounds
+        for axis in range(3):
+            if xyz[axis] < lower[axis]:
+                lower[axis] = xyz[axis]
+            if xyz[axis] > upper[axis]:
+                upper[axis] = xyz[axis]
+
+    # @intent:operation 面の追加・削除や頂点の並び替えの後に、位相に依存するキャッシュを破棄します。
+    def _on_topology_changed(self):
+        self._adjacency = None
+        for tracker in self._dirty_trackers:
+            tracker.mark_topology()
+        self._changes().topology = True
+
+    # @intent:operation 頂点が他のモデルに属していないことを検査します。
+    # @intent:rationale 登録の途中で失敗すると、登録済みの頂点がどの面からも参照されないままストアに残るため、登録を始める前に全ての頂点を検査する。
+    def _check_vertices(self, vertices: List[Vertex]):
+        for vertex in vertices:
+            if vertex._store is not None and vertex._store is not self._store:
+                raise ValueError("The Vertex already belongs to another model.")
+
+    # @intent:operation 頂点をストアに登録し、そのインデックスを返します。既に登録済みの共有頂点は参照カウントのみ増やします。
+    # @intent:pre-condition 他のモデルに属する頂点でないこと（呼び出し側が `_check_vertices` で事前に検査する）。
+    def _attach_vertex(self, vertex: Vertex) -> int:
+        if vertex._store is None:
+            xyz = vertex._local
+            index = self._store.append(xyz, owner=vertex)
+            vertex._attach(self, index)
+            self._include_in_bounds(xyz)
+        elif vertex._store is not self._store:
+            raise ValueError("The Vertex already belongs to another model.")
+        self._store.acquire(vertex._index)
+        self._accumulate(self._store.get_xyz(vertex._index), 1)
+        return vertex._index
+
+    # @intent:operation 頂点の参照を1つずつ解放し（共有頂点は出現回数分）、どの面からも参照されなくなった頂点をストアから取り除きます。
+    # @intent:rationale ストアはスワップ削除で詰められるため、移動した末尾頂点を参照する面インデックスを付け替えます。
+    # 取り除く頂点はインデックスの降順に処理し（移動元の末尾頂点が取り除く対象にならない）、付け替えは最後に1回の配列参照でまとめて行います。
+    def _release_vertices(self, vertices: List[Vertex]):
+        freed = []
+        for vertex in vertices:
+            index = vertex._index
+            xyz = self._store.get_xyz(index)
+            self._accumulate(xyz, -1)
+            if self._store.release(index) > 0:
+                continue
+            if self._bounds is not None:
+                lower, upper = self._bounds
+                if any(xyz[axis] == lower[axis] or xyz[axis] == upper[axis] for axis in range(3)):
+                    self._bounds = None
+            freed.append(index)
+        if not freed:
+            return
+        freed.sort(reverse=True)
+        count = self._store.count
+        for index in freed:
+            self._store.owner(index)._detach()
+        # 移動した頂点の 現在のインデックス -> 移動前のインデックス
+        origin = {}
+        for index in freed:
+            moved_from = self._store.swap_remove(index)
+            if moved_from >= 0:
+                origin[index] = origin.pop(moved_from, moved_from)
+                owner = self._store.owner(index)
+                if owner is not None:
+                    owner._index = index
+        if origin:
+            remap = np.arange(count, dtype=np.int64)
+            remap[list(origin.values())] = list(origin.keys())
+            quads = self._quads[:len(self._faces)]
+            quads[:] = remap[quads]
+
+    # @intent:operation 1つの参照の追加 (sign=1) または解放 (sign=-1) を座標総和に反映します。
+    def _accumulate(self, xyz: List[float], sign: int):
+        self._reference_count += sign
+        if self._reference_count == 0:
+            # 参照がなくなった時点で累積した丸め誤差を捨てる
+            self._coordinate_sum = [0.0, 0.0, 0.0]
+            return
+        for axis in range(3):
+            self._coordinate_sum[axis] += sign * xyz[axis]
+
+    # @intent:operation Face.update_vertices の結果をインデックス配列と参照カウントに反映します。
+    # @intent:pre-condition 新しい頂点は `Face.update_vertices` が面を変更する前に `_check_vertices` で検査済みであること。
+    def _rebind_face(self, face: Face, old_vertices: List[Vertex]):
+        indices = [self._attach_vertex(v) for v in face.vertices]
+        self._quads[face._row] = indices
+        self._release_vertices(old_vertices)
+        self._on_topology_changed()
+
+    def _reserve_faces(self, required: int):
+        capacity = self._quads.shape[0]
+        if required <= capacity:
+            return
+        quads = np.zeros((max(required, capacity * 2), 4), dtype=np.int64)
+        quads[:len(self._faces)] = self._quads[:len(self._faces)]
+        self._quads = quads
@@ -0,0 +1,51 @@
+from typing import Tuple
+
+# @intent:responsibility Model の変更のうち「どの頂点範囲が書き換わったか」「位相が変わったか」を利用者ごとに蓄積します。
+# @intent:role GPUバッファや空間索引のように、変更を毎回処理せず必要な時点でまとめて取り込む（Pull型の）利用者のための仕組み。
+# @intent:rationale 変更範囲は単一の区間 [lo, hi) に丸めて保持します。個別インデックスの集合を持つより粗くなりますが、
+# 書き込みごとのコストが O(1) で一定となり、GPUへの部分転送（連続範囲）とも相性が良いためです。
+class DirtyTracker:
+    def __init__(self):
+        # 作成直後は全体が未取り込みの状態
+        self._topology_changed = True
+        self._lo = 0
+        self._hi = 0
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._topology_changed or self._lo < self._hi
+
+    # @intent:operation 1頂点の座標変更を記録します。
+    def mark_vertex(self, index: int):
+        if self._lo < self._hi:
+            if index < self._lo:
+                self._lo = index
+            elif index >= self._hi:
+                self._hi = index + 1
+        else:
+            self._lo = index
+            self._hi = index + 1
+
+    # @intent:operation 頂点範囲 [lo, hi) の座標変更を記録します。
+    def mark_vertices(self, lo: int, hi: int):
+        if lo >= hi:
+            return
+        if self._lo < self._hi:
+            self._lo = min(self._lo, lo)
+            self._hi = max(self._hi, hi)
+        else:
+            self._lo = lo
+            self._hi = hi
+
+    # @intent:operation 面の追加・削除や頂点の並び替えなど、インデックスが無効になる変更を記録します。
+    def mark_topology(self):
+        self._topology_changed = True
+
+    # @intent:operation 蓄積した変更を取り出してリセットします。
+    # @intent:return (topology_changed, lo, hi)。topology_changed が True の場合、利用者は全体を取り込み直す必要があります。
+    def take(self) -> Tuple[bool, int, int]:
+        result = (self._topology_changed, self._lo, self._hi)
+        self._topology_changed = False
+        self._lo = 0
+        self._hi = 0
+        return result
@@ -1,5 +1,6 @@
 import math
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
+import numpy as np
 from Core.data_model import Vertex, Face
 
 # @intent:responsibility 幾何学的な計算ロジックを提供します。
@@ -55,21 +56,19 @@ def ray_intersects_triangle(
         return t
     return None
 
-# @intent:operation レイとFace(四角形)の交差判定を行います。
-# Faceは2つの三角形(0-1-2, 0-2-3)として扱います。
+# @intent:operation レイと四角形（4頂点の座標タプル）の交差判定を行います。
+# 四角形は2つの三角形(0-1-2, 0-2-3)として扱います。
 # 最も近い交点までの距離を返します。交差しない場合はNone。
-def ray_intersects_face(
+def ray_intersects_quad(
     origin: Tuple[float, float, float],
     direction: Tuple[float, float, float],
-    face: Face
+    corners: Sequence[Tuple[float, float, float]]
 ) -> Optional[float]:
-    vs = [(v.x, v.y, v.z) for v in face.vertices]
-    
     # Triangle 1: 0-1-2
-    t1 = ray_intersects_triangle(origin, direction, vs[0], vs[1], vs[2])
+    t1 = ray_intersects_triangle(origin, direction, corners[0], corners[1], corners[2])
     
     # Triangle 2: 0-2-3
-    t2 = ray_intersects_triangle(origin, direction, vs[0], vs[2], vs[3])
+    t2 = ray_intersects_triangle(origin, direction, corners[0], corners[2], corners[3])
     
     if t1 is not None and t2 is not None:
         return min(t1, t2)
@@ -79,9 +78,102 @@ def ray_intersects_face(
         return t2
     return None
 
+# @intent:operation レイとFace(四角形)の交差判定を行います。
+# Faceは2つの三角形(0-1-2, 0-2-3)として扱います。
+# 最も近い交点までの距離を返します。交差しない場合はNone。
+def ray_intersects_face(
+    origin: Tuple[float, float, float],
+    direction: Tuple[float, float, float],
+    face: Face
+) -> Optional[float]:
+    vs = [(v.x, v.y, v.z) for v in face.vertices]
+    return ray_intersects_quad(origin, direction, vs)
+
+# @intent:operation ベクトル化版の内積・外積（最終軸が xyz）。演算の順序はスカラー版と同一にしてあり、結果はビット単位で一致します。
+def _dot_arrays(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0]*b[..., 0] + a[..., 1]*b[..., 1] + a[..., 2]*b[..., 2]
+
+def _cross_arrays(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.stack((
+        a[..., 1]*b[..., 2] - a[..., 2]*b[..., 1],
+        a[..., 2]*b[..., 0] - a[..., 0]*b[..., 2],
+        a[..., 0]*b[..., 1] - a[..., 1]*b[..., 0],
+    ), axis=-1)
+
+# @intent:algorithm ray_intersects_triangle のベクトル化版（Möller–Trumbore）。
+# origins / directions と v0, v1, v2 はブロードキャスト可能な (..., 3) 配列。交差しない要素は inf を返します。
+def _ray_triangle_distances(origins, directions, v0, v1, v2) -> np.ndarray:
+    epsilon = 1e-6
+    edge1 = v1 - v0
+    edge2 = v2 - v0
+    h = _cross_arrays(directions, edge2)
+    a = _dot_arrays(edge1, h)
+    parallel = (-epsilon < a) & (a < epsilon)  # レイと並行
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = 1.0 / a
+        s = origins - v0
+        u = f * _dot_arrays(s, h)
+        q = _cross_arrays(s, edge1)
+        v = f * _dot_arrays(directions, q)
+        t = f * _dot_arrays(edge2, q)
+
+    hit = ~parallel & (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t > epsilon)
+    return np.where(hit, t, np.inf)
+
+# @intent:operation 1本のレイと複数の四角形 (F, 4, 3) の交差距離を一括で求めます。
+# @intent:return (F,) の距離配列。交差しない面は inf。判定規則（epsilon・境界の扱い）はスカラー版 `ray_intersects_quad` と同一です。
+# @intent:pre-condition `direction` ベクトルは正規化（長さ1）されている必要があります。
+def ray_quad_distances(origin, direction, quads: np.ndarray) -> np.ndarray:
+    quads = np.asarray(quads, dtype=np.float64)
+    origin = np.asarray(origin, dtype=np.float64)
+    direction = np.asarray(direction, dtype=np.float64)
+    v0, v1, v2, v3 = quads[..., 0, :], quads[..., 1, :], quads[..., 2, :], quads[..., 3, :]
+    # Triangle 1: 0-1-2 / Triangle 2: 0-2-3
+    t1 = _ray_triangle_distances(origin, direction, v0, v1, v2)
+    t2 = _ray_triangle_distances(origin, direction, v0, v2, v3)
+    return np.minimum(t1, t2)
+
+# 1回のベクトル演算で扱う (レイ数 x 面数) の上限。中間配列のメモリ使用量を抑えるため、これを超える場合はレイを分割して処理する。
+_MAX_PAIRS_PER_CHUNK = 1 << 20
+
+# @intent:operation 複数のレイ (R, 3) と複数の四角形 (F, 4, 3) の交差判定を一括で行い、レイごとに最も近い交差面を求めます。
+# @intent:return (distances, face_indices)。いずれも (R,)。交差しないレイは距離 inf、面インデックス -1。
+# origin / direction に1本分 (3,) を渡した場合は R=1 として扱います。
+# @intent:rationale スカラー版 `ray_intersects_face` を参照実装として残し、本関数はピッキング・可視判定・ヘッドレスツール向けの一括処理の基本演算とします。
+def ray_intersects_quads(origins, directions, quads: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))
+    directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))
+    origins, directions = np.broadcast_arrays(origins, directions)
+    quads = np.asarray(quads, dtype=np.float64).reshape(-1, 4, 3)
+
+    ray_count = len(origins)
+    distances = np.full(ray_count, np.inf)
+    face_indices = np.full(ray_count, -1, dtype=np.int64)
+    if ray_count == 0 or len(quads) == 0:
+        return distances, face_indices
+
+    chunk = max(1, _MAX_PAIRS_PER_CHUNK // len(quads))
+    for start in range(0, ray_count, chunk):
+        stop = min(start + chunk, ray_count)
+        t = ray_quad_distances(origins[start:stop, None, :], directions[start:stop, None, :], quads[None, :, :, :])
+        nearest = np.argmin(t, axis=1)
+        best = t[np.arange(stop - start), nearest]
+        hit = np.isfinite(best)
+        distances[start:stop] = best
+        face_indices[start:stop] = np.where(hit, nearest, -1)
+    return distances, face_indices
+
 # @intent:operation 指定されたFaceリストに含まれる全頂点の重心（平均座標）を計算します。
 # @intent:return (x, y, z) のタプル。頂点が存在しない場合は (0.0, 0.0, 0.0) を返します。
+# @intent:rationale 全ての面が同一Modelに属する場合は、座標バッファから行単位で一括収集してベクトル演算で平均を求めます。
 def calculate_center(faces: list[Face]) -> Tuple[float, float, float]:
+    model = faces[0].model if faces else None
+    if model is not None and all(face.model is model for face in faces):
+        rows = np.fromiter((face.row for face in faces), dtype=np.int64, count=len(faces))
+        points = model.face_coordinates(rows).reshape(-1, 3)
+        return tuple(points.mean(axis=0).tolist())
+
     total_x, total_y, total_z = 0.0, 0.0, 0.0
     count = 0
     
@@ -96,3 +188,107 @@ def calculate_center(faces: list[Face]) -> Tuple[float, float, float]:
         return (0.0, 0.0, 0.0)
         
     return (total_x / count, total_y / count, total_z / count)
+
+# @intent:operation 全ての面の重心 (F, 3) を座標バッファとインデックス配列から一括で求めます。
+def face_centroids(model) -> np.ndarray:
+    return model.face_coordinates().mean(axis=1)
+
+# @intent:operation 点（(3,) または (N, 3)）を、原点を通る間隔 spacing の格子の最も近い格子点へ丸めます。
+def snap_to_grid(points, spacing: float) -> np.ndarray:
+    if spacing <= 0.0:
+        raise ValueError("Grid spacing must be positive.")
+    return np.round(np.asarray(points, dtype=np.float64) / spacing) * spacing
+
+# @intent:operation ワールド座標の点 (N, 3) をウィンドウ座標へ一括で投影します（gluProject のベクトル化版）。
+# @intent:return (window, visible)。window は (N, 3) のウィンドウ座標（x, y はピクセル、z は深度 0〜1）、
+# visible は視点の前方かつ near / far 平面の間にある点の真偽値 (N,)。
+# @intent:pre-condition modelview / projection は glGetDoublev が返す列優先（column-major）の 4x4 配列、viewport は (x, y, 幅, 高さ)。
+def project_points(points: np.ndarray, modelview, projection, viewport) -> Tuple[np.ndarray, np.ndarray]:
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    homogeneous = np.empty((len(points), 4))
+    homogeneous[:, :3] = points
+    homogeneous[:, 3] = 1.0
+    # 列優先の行列を行として読んだ配列は転置行列に等しいため、行ベクトルに右から掛ける
+    clip = homogeneous @ np.asarray(modelview, dtype=np.float64).reshape(4, 4) \
+                       @ np.asarray(projection, dtype=np.float64).reshape(4, 4)
+    w = clip[:, 3]
+    in_front = w > 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndc = clip[:, :3] / w[:, None]
+    vx, vy, vw, vh = (float(v) for v in viewport)
+    window = np.empty_like(ndc)
+    window[:, 0] = vx + vw * (ndc[:, 0] + 1.0) * 0.5
+    window[:, 1] = vy + vh * (ndc[:, 1] + 1.0) * 0.5
+    window[:, 2] = (ndc[:, 2] + 1.0) * 0.5
+    visible = in_front & (window[:, 2] >= 0.0) & (window[:, 2] <= 1.0)
+    return window, visible
+
+# @intent:operation ウィンドウ座標 (N, 3)（x, y はピクセル、z は深度 0〜1）をワールド座標へ一括で逆投影します（gluUnProject のベクトル化版）。
+# @intent:pre-condition 行列・viewport の形式は project_points と同じ。
+def unproject_points(window: np.ndarray, modelview, projection, viewport) -> np.ndarray:
+    window = np.asarray(window, dtype=np.float64).reshape(-1, 3)
+    vx, vy, vw, vh = (float(v) for v in viewport)
+    ndc = np.empty((len(window), 4))
+    ndc[:, 0] = (window[:, 0] - vx) / vw * 2.0 - 1.0
+    ndc[:, 1] = (window[:, 1] - vy) / vh * 2.0 - 1.0
+    ndc[:, 2] = window[:, 2] * 2.0 - 1.0
+    ndc[:, 3] = 1.0
+    inverse = np.linalg.inv(np.asarray(modelview, dtype=np.float64).reshape(4, 4)
+                            @ np.asarray(projection, dtype=np.float64).reshape(4, 4))
+    world = ndc @ inverse
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return world[:, :3] / world[:, 3:]
+
+# @intent:operation 2次元の点 (N, 2) が矩形（2つの角 corner_a, corner_b。向きは問わない）の内側にあるかを一括で判定します。
+def points_in_rect(points: np.ndarray, corner_a: Sequence[float], corner_b: Sequence[float]) -> np.ndarray:
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    lower = np.minimum(corner_a, corner_b)
+    upper = np.maximum(corner_a, corner_b)
+    return np.all((points >= lower) & (points <= upper), axis=1)
+
+# @intent:operation 2次元の点 (N, 2) が多角形（頂点列 (M, 2)。閉じていなくてよい）の内側にあるかを一括で判定します。
+# @intent:algorithm 偶奇規則（点から +x 方向へ伸ばした半直線が辺と交わる回数）。辺ごとのループで、点についてはベクトル化して処理します。
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    inside = np.zeros(len(points), dtype=bool)
+    if len(polygon) < 3:
+        return inside
+    px, py = points[:, 0], points[:, 1]
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        crosses = (y1 > py) != (y2 > py)
+        if not crosses.any():
+            continue
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (px < x_at)
+    return inside
+
+# @intent:operation 視錐台の6平面 (6, 4) を求めます（Gribb–Hartmann 法）。各行 (a, b, c, d) は a*x + b*y + c*z + d >= 0 が内側。
+# 順序は left, right, bottom, top, near, far。法線は単位長に正規化します。
+# @intent:pre-condition modelview / projection は glGetDoublev が返す列優先（column-major）の 4x4 配列。
+def frustum_planes(modelview, projection) -> np.ndarray:
+    clip = np.asarray(projection, dtype=np.float64).reshape(4, 4).T @ np.asarray(modelview, dtype=np.float64).reshape(4, 4).T
+    planes = np.array([clip[3] + clip[0], clip[3] - clip[0],
+                       clip[3] + clip[1], clip[3] - clip[1],
+                       clip[3] + clip[2], clip[3] - clip[2]])
+    norms = np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+    return planes / np.where(norms > 0.0, norms, 1.0)
+
+# 視錐台に対する AABB の判定結果
+OUTSIDE, INTERSECTING, INSIDE = 0, 1, 2
+
+# @intent:operation AABB (lo, hi) 群 (N, 3) を視錐台の平面群に対して一括で判定し、OUTSIDE / INTERSECTING / INSIDE を返します。
+# @intent:algorithm 各平面について箱の中心の符号付き距離と、法線方向への箱の半径を比較します。
+# 外側と判定されるのは、ある1つの平面の完全に外側にある箱のみです（保守的な判定であり、見えている箱を外側と判定することはない）。
+# lo > hi の箱（空の箱）は OUTSIDE とします。
+def classify_boxes(lo: np.ndarray, hi: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        center = (lo + hi) * 0.5
+        half = (hi - lo) * 0.5
+        distance = center @ planes[:, :3].T + planes[:, 3]
+        radius = half @ np.abs(planes[:, :3]).T
+    result = np.full(len(lo), INTERSECTING, dtype=np.int8)
+    result[np.all(distance - radius >= 0.0, axis=1)] = INSIDE
+    result[np.any(distance + radius < 0.0, axis=1) | np.any(lo > hi, axis=1)] = OUTSIDE
+    return result
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# @intent:responsibility 計測用のカウンター・スパン（区間）・インスタントイベントを記録する軽量な計装モジュール。
+# @intent:role Core / Service / UI のいずれからも利用できる（UI に依存しない）。記録は固定長のリングバッファに保持され、
+# Chrome のトレース形式（chrome://tracing / Perfetto で表示可能な JSON）として書き出せます。
+# @intent:rationale 計装は通知の配送など頻繁に呼ばれる経路に置かれるため、無効時のコストを最小にします。
+# 呼び出し側は `if metrics.enabled:` で分岐してから記録し、`span()` は無効時に共有の空コンテキストを返します。
+
+# 無効時に span() が返す共有の空コンテキスト（生成コストをなくすため再利用する）
+_NULL_SPAN = nullcontext()
+
+# @intent:responsibility 1つの区間の計測。終了時に Complete イベント ("ph": "X") としてリングバッファへ記録します。
+class _Span:
+    __slots__ = ("_metrics", "_name", "_category", "_args", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str, category: str, args: dict):
+        self._metrics = metrics
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def __enter__(self) -> dict:
+        self._start = time.perf_counter_ns()
+        return self._args
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._metrics._record("X", self._name, self._category, self._start, end - self._start, self._args)
+        return False
+
+# @intent:responsibility 計測の状態（有効フラグ・リングバッファ・カウンター）を保持します。
+# @intent:role アプリケーション全体で唯一のインスタンス `metrics` を共有する。logging と同様の横断的関心事であり、
+# 通知の配送経路に依存性注入のための引数を追加しないよう、例外的にモジュールレベルのインスタンスとする。
+class Metrics:
+    DEFAULT_CAPACITY = 65536
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.enabled = False
+        self._events: deque = deque(maxlen=capacity)
+        self._counters: Dict[str, int] = {}
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    # @intent:operation 計測を有効にします。capacity を指定するとリングバッファの長さを変更します（記録済みのイベントは新しいものから保持）。
+    def enable(self, capacity: Optional[int] = None):
+        if capacity is not None and capacity != self._events.maxlen:
+            self._events = deque(self._events, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    # @intent:operation 記録済みのイベントとカウンターを破棄し、時刻の原点を現在にします。
+    def reset(self):
+        with self._lock:
+            self._events.clear()
+            self._counters.clear()
+            self._origin = time.perf_counter_ns()
+
+    # @intent:operation カウンターに value を加算します。計測が無効の場合は何もしません。
+    def count(self, name: str, value: int = 1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    # @intent:operation 区間を計測するコンテキストを返します。with の値はイベントの引数 (args) の辞書で、区間内で結果を追記できます。
+    # 計測が無効の場合は何も記録しない共有のコンテキストを返し、with の値は None となります。
+    def span(self, name: str, category: str = "relabs", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    # @intent:operation 時間幅を持たない出来事（クリック位置、ピッキング結果など）を記録します。
+    def instant(self, name: str, category: str = "relabs", **args):
+        if self.enabled:
+            self._record("i", name, category, time.perf_counter_ns(), 0, args)
+
+    def _record(self, phase: str, name: str, category: str, start_ns: int, duration_ns: int, args: dict):
+        event = (phase, name, category, start_ns, duration_ns, threading.get_ident(), args)
+        with self._lock:
+            self._events.append(event)
+
+    # @intent:operation リングバッファの内容を Chrome トレース形式の辞書として返します。
+    # カウンターは書き出し時点の累計値を Counter イベント ("ph": "C") として末尾に付加します。
+    def chrome_trace(self) -> dict:
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+            origin = self._origin
+        pid = os.getpid()
+        trace: List[dict] = []
+        last_ts = 0.0
+        for phase, name, category, start_ns, duration_ns, tid, args in events:
+            ts = (start_ns - origin) / 1000.0
+            event = {"name": name, "cat": category, "ph": phase, "ts": ts, "pid": pid, "tid": tid,
+                     "args": {key: _json_value(value) for key, value in args.items()}}
+            if phase == "X":
+                event["dur"] = duration_ns / 1000.0
+            elif phase == "i":
+                event["s"] = "t"
+            trace.append(event)
+            last_ts = max(last_ts, ts + duration_ns / 1000.0)
+        for name, value in sorted(counters.items()):
+            trace.append({"name": name, "cat": "counter", "ph": "C", "ts": last_ts, "pid": pid, "tid": 0,
+                          "args": {"value": value}})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    # @intent:operation Chrome トレース形式の JSON をファイルへ書き出します。
+    def dump_chrome_trace(self, filepath: str):
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+def _json_value(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+# アプリケーション全体で共有する計測インスタンス
+metrics = Metrics()
@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# @intent:responsibility Model の1回の通知で配送される変更内容（変更集合）。
+# どの頂点が動いたか、どの面が追加・削除されたか、モデル全体の変換か、内容の置き換えかを型付きで保持します。
+# @intent:role Push 型の利用者（UI のパネル・ビューポート）が、変更に関係のない更新を省くための情報。
+# 変更を必要な時点でまとめて取り込む Pull 型の利用者（GPUバッファ・空間索引）は、従来通り DirtyTracker を用います。
+# @intent:rationale Model は `batch()` 中の変更を1つの変更集合に蓄積し、通知の配送時に利用者へ渡して新しい集合に切り替えます。
+# 頂点の書き込みごとのコストを O(1) に保つため、個々の頂点インデックスはリストに追記するだけとし、
+# 重複の除去と配列への変換は `vertices` の参照時に行います。
+# 変更集合は即時通知される頂点の書き込みごとに生成されるため、既定値はクラス属性とし、生成時には model のみを設定します。
+# @intent:warning topology が True の場合、面の追加・削除による頂点インデックスの詰め直しが起きている可能性があります。
+# その場合 `vertices` / `face_rows()` は変更後のインデックスとして厳密ではないため、利用者は全体を更新すること。
+class ModelChange:
+    # モデル全体への変換（translate_all / 全体の apply_transform）
+    transform = False
+    # 面の追加・削除・頂点の付け替え・頂点の統合など、インデックスが変わる変更
+    topology = False
+    # モデルの内容の置き換え（clear / 一括読み込み）
+    reset = False
+    # 追加・削除された面（挿入順を保つ集合）
+    _added: Optional[Dict] = None
+    _removed: Optional[Dict] = None
+    # 座標が変わった頂点: 個別のインデックスと、一括変換のインデックス配列
+    _indices: Optional[List[int]] = None
+    _arrays: Optional[List[np.ndarray]] = None
+    _all_vertices = False
+
+    def __init__(self, model):
+        self.model = model
+
+    # --- 読み取り ---
+
+    # @intent:operation 何も変更されていない場合は True。
+    @property
+    def is_empty(self) -> bool:
+        return not (self.transform or self.topology or self.reset or self._added or self._removed
+                    or self._indices or self._arrays or self._all_vertices)
+
+    @property
+    def added_faces(self) -> Tuple:
+        return tuple(self._added) if self._added else ()
+
+    @property
+    def removed_faces(self) -> Tuple:
+        return tuple(self._removed) if self._removed else ()
+
+    # @intent:operation 座標が変わった頂点のインデックス（昇順・重複なし）。全ての頂点が変わった場合は [0, N) の全て。
+    @property
+    def vertices(self) -> np.ndarray:
+        if self._all_vertices:
+            return np.arange(self.model.vertex_count, dtype=np.int64)
+        parts = list(self._arrays or ())
+        if self._indices:
+            parts.append(np.array(self._indices, dtype=np.int64))
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    # @intent:operation 座標が変わった頂点を包む範囲 [lo, hi)。頂点が変わっていない場合は None。
+    # @intent:rationale GPUバッファの部分転送のように、連続範囲で扱う利用者向け。
+    @property
+    def vertex_range(self) -> Optional[Tuple[int, int]]:
+        if self._all_vertices:
+            return (0, self.model.vertex_count) if self.model.vertex_count else None
+        vertices = self.vertices
+        return (int(vertices[0]), int(vertices[-1]) + 1) if len(vertices) else None
+
+    # @intent:operation 座標が変わった頂点を参照する面の行番号（昇順・重複なし）。
+    def face_rows(self) -> np.ndarray:
+        if self._all_vertices:
+            return np.arange(self.model.face_count, dtype=np.int64)
+        vertices = self.vertices
+        if len(vertices) == 0:
+            return np.zeros(0, dtype=np.int64)
+        offsets, rows = self.model.vertex_face_adjacency()
+        return np.unique(np.concatenate([rows[offsets[i]:offsets[i + 1]] for i in vertices.tolist()]))
+
+    # @intent:operation 指定した面の形状・所属に影響する変更かを返します（パネルの更新の要否の判定用）。
+    # 位相の変更・内容の置き換え・全体の変換は、全ての面に影響するものとして扱います。
+    def affects_face(self, face) -> bool:
+        if self.topology or self.reset or self._all_vertices:
+            return True
+        if face.model is not self.model:
+            return False
+        indices = [v.index for v in face.vertices]
+        if self._indices and any(index in indices for index in self._indices):
+            return True
+        return any(np.isin(indices, array).any() for array in self._arrays or ())
+
+    def __repr__(self):
+        flags = [name for name in ("transform", "topology", "reset") if getattr(self, name)]
+        return (f"ModelChange(vertices={len(self.vertices)}, added={len(self.added_faces)}, "
+                f"removed={len(self.removed_faces)}{''.join(', ' + f for f in flags)})")
+
+    # --- 記録（Model のみが呼び出す） ---
+
+    def _mark_vertex(self, index: int):
+        if self._indices is None:
+            self._indices = [index]
+        else:
+            self._indices.append(index)
+
+    def _mark_vertices(self, indices: np.ndarray):
+        if self._arrays is None:
+            self._arrays = [indices]
+        else:
+            self._arrays.append(indices)
+
+    def _mark_all_vertices(self):
+        self._all_vertices = True
+
+    def _mark_added(self, faces):
+        if self._added is None:
+            self._added = {}
+        for face in faces:
+            # 同じ変更集合の中で削除された面の再追加は、削除の取り消しとして扱う
+            if self._removed and face in self._removed:
+                del self._removed[face]
+            else:
+                self._added[face] = None
+
+    def _mark_removed(self, faces):
+        if self._removed is None:
+            self._removed = {}
+        for face in faces:
+            if self._added and face in self._added:
+                del self._added[face]
+            else:
+                self._removed[face] = None
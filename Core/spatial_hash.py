@@ -0,0 +1,188 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+import numpy as np
+from Core.data_model import Model
+from Core.metrics import metrics
+
+# セル座標を 21bit ずつ詰めて1つの int64 キーにする。範囲外のセルは端のセルに丸める
+# （丸めで同じキーに集まった頂点も距離で判定し直すため、結果は変わらない）。
+_AXIS_BITS = 21
+_AXIS_OFFSET = 1 << (_AXIS_BITS - 1)
+_AXIS_MAX = (1 << _AXIS_BITS) - 1
+
+# 1回の問い合わせで列挙するセル数の上限。これを超える半径では全頂点を直接判定する
+_MAX_QUERY_CELLS = 4096
+
+# 構築後にセルを移った頂点がこの割合を超えた場合は、差分表で補わずに再構築する
+_REBUILD_FRACTION = 0.125
+
+# セルの大きさを推定するために調べる面の最大数
+_EDGE_SAMPLE_FACES = 65536
+
+# @intent:responsibility Model の頂点に対する一様グリッド（空間ハッシュ）索引。半径内の頂点と k 近傍の頂点を求めます。
+# @intent:rationale 頂点を整数のセル座標から作ったキーの昇順に並べ（CSR に相当する配列2本）、問い合わせでは
+# 点の周囲のセルのキーを二分探索して候補を集め、実際の座標で距離を判定します。Python の dict にセルを持つ方式と比べ、
+# 10^6 頂点規模でも構築が配列演算のみで済み、メモリも頂点あたり 16 バイトに収まります。
+# @intent:lifecycle Model の DirtyTracker を購読し、変更は次回の問い合わせ時に取り込みます。頂点の移動のうちセルが変わったものは
+# 差分表（セル -> 頂点の集合）で補い、セルを移った頂点が多い場合と位相の変更（頂点の追加・削除）の場合は再構築します。
+# 不要になった時点で release() を呼び出すこと。
+class VertexHash:
+    def __init__(self, model: Model, cell_size: Optional[float] = None):
+        self._model = model
+        self._requested_cell_size = cell_size
+        self._tracker = model.create_dirty_tracker()
+        self._cell_size = 1.0
+        self._origin = np.zeros(3)
+        self._keys = np.zeros(0, dtype=np.int64)         # (N,) 構築時の頂点ごとのセルキー
+        self._sorted_keys = np.zeros(0, dtype=np.int64)  # (N,) キーの昇順
+        self._order = np.zeros(0, dtype=np.int64)        # (N,) キーの昇順に並べた頂点インデックス
+        self._moved = np.zeros(0, dtype=bool)            # (N,) 構築時のセルを離れた頂点
+        self._moved_cells: Dict[int, Set[int]] = {}      # 差分表: セルキー -> そのセルへ移った頂点
+        self._moved_key: Dict[int, int] = {}             # 差分表に載っている頂点 -> 現在のセルキー
+
+    def release(self):
+        self._model.release_dirty_tracker(self._tracker)
+
+    # @intent:operation セルの一辺の長さ。省略時は構築時に面の辺の長さの中央値から決めます。
+    @property
+    def cell_size(self) -> float:
+        self._sync()
+        return self._cell_size
+
+    # @intent:operation point から radius 以内にある頂点を距離の近い順に返します。
+    # @intent:return (頂点インデックス, 距離)。いずれも同じ長さの配列。exclude に指定した頂点は含みません。
+    def within(self, point, radius: float, exclude: Iterable[int] = ()) -> Tuple[np.ndarray, np.ndarray]:
+        self._sync()
+        point = np.asarray(point, dtype=np.float64)
+        candidates, _ = self._candidates(point, radius)
+        return self._closest(point, candidates, radius, exclude)
+
+    # @intent:operation point に近い順に最大 k 個の頂点を返します（max_distance より遠い頂点は含みません）。
+    # @intent:rationale 探索半径をセル1つ分から倍々に広げ、半径内に k 個の頂点が見つかった時点で打ち切ります。
+    # 半径内の頂点は全て候補に含まれるため、見つかった k 個は正確な k 近傍です。
+    def nearest(self, point, k: int = 1, max_distance: float = np.inf,
+                exclude: Iterable[int] = ()) -> Tuple[np.ndarray, np.ndarray]:
+        self._sync()
+        point = np.asarray(point, dtype=np.float64)
+        exclude = list(exclude)
+        radius = self._cell_size
+        while True:
+            radius = min(radius, max_distance)
+            candidates, exhaustive = self._candidates(point, radius)
+            if exhaustive:
+                # 全頂点を判定する場合は、半径に関係なく最も近い k 個を求めれば良い
+                indices, distances = self._closest(point, candidates, max_distance, exclude)
+                return indices[:k], distances[:k]
+            indices, distances = self._closest(point, candidates, radius, exclude)
+            if len(indices) >= k or radius >= max_distance:
+                return indices[:k], distances[:k]
+            radius *= 2.0
+
+    # @intent:operation 候補を実際の座標で判定し、radius 以内の頂点を近い順（同じ距離はインデックス順）に並べます。
+    def _closest(self, point: np.ndarray, candidates: np.ndarray, radius: float,
+                 exclude: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        if metrics.enabled:
+            metrics.count("spatial_hash.vertices_tested", len(candidates))
+        exclude = list(exclude)
+        if exclude:
+            candidates = candidates[~np.isin(candidates, exclude)]
+        distances = np.linalg.norm(self._model.coordinates[candidates] - point, axis=1)
+        hit = distances <= radius
+        candidates, distances = candidates[hit], distances[hit]
+        order = np.lexsort((candidates, distances))
+        return candidates[order], distances[order]
+
+    # @intent:operation point を中心とする一辺 2 * radius の立方体と重なるセルに属する頂点を集めます。
+    # @intent:return (候補の頂点インデックス, 全頂点を候補としたか)
+    def _candidates(self, point: np.ndarray, radius: float) -> Tuple[np.ndarray, bool]:
+        count = self._model.vertex_count
+        if count == 0:
+            return np.zeros(0, dtype=np.int64), True
+        lower = self._cell_coords(point - radius)
+        upper = self._cell_coords(point + radius)
+        extent = np.maximum(upper - lower + 1, 1)
+        if not np.isfinite(radius) or int(np.prod(extent)) > _MAX_QUERY_CELLS:
+            return np.arange(count), True
+
+        axes = [np.arange(lower[axis], upper[axis] + 1) for axis in range(3)]
+        cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+        keys = np.unique(self._encode(cells))
+
+        starts = np.searchsorted(self._sorted_keys, keys, side="left")
+        lengths = np.searchsorted(self._sorted_keys, keys, side="right") - starts
+        total = int(lengths.sum())
+        # 各セルの区間 [start, start + length) を連結した添字列
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        candidates = self._order[positions]
+        if self._moved_key:
+            candidates = candidates[~self._moved[candidates]]
+            extra = [index for key in keys.tolist() for index in self._moved_cells.get(key, ())]
+            if extra:
+                candidates = np.concatenate((candidates, np.array(extra, dtype=np.int64)))
+        return candidates, False
+
+    def _cell_coords(self, points: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", over="ignore"):
+            cells = np.floor((points - self._origin) / self._cell_size)
+        return np.clip(np.nan_to_num(cells), -_AXIS_OFFSET, _AXIS_OFFSET - 1).astype(np.int64)
+
+    @staticmethod
+    def _encode(cells: np.ndarray) -> np.ndarray:
+        cells = np.clip(cells + _AXIS_OFFSET, 0, _AXIS_MAX)
+        return (cells[..., 0] << (2 * _AXIS_BITS)) | (cells[..., 1] << _AXIS_BITS) | cells[..., 2]
+
+    # @intent:operation DirtyTracker に蓄積された変更を取り込みます。
+    def _sync(self):
+        topology_changed, lo, hi = self._tracker.take()
+        if topology_changed:
+            self._build()
+        elif lo < hi:
+            self._update_range(lo, hi)
+
+    # @intent:operation 頂点範囲 [lo, hi) の移動を取り込みます。セルが変わった頂点だけを差分表へ移します。
+    def _update_range(self, lo: int, hi: int):
+        keys = self._encode(self._cell_coords(self._model.coordinates[lo:hi]))
+        changed = np.flatnonzero((keys != self._keys[lo:hi]) | self._moved[lo:hi])
+        if len(self._moved_key) + len(changed) > self._model.vertex_count * _REBUILD_FRACTION:
+            self._build()
+            return
+        for offset, key in zip(changed.tolist(), keys[changed].tolist()):
+            index = lo + offset
+            previous = self._moved_key.pop(index, None)
+            if previous is not None:
+                self._moved_cells[previous].discard(index)
+                if not self._moved_cells[previous]:
+                    del self._moved_cells[previous]
+            if key == self._keys[index]:
+                # 構築時のセルへ戻った
+                self._moved[index] = False
+            else:
+                self._moved[index] = True
+                self._moved_key[index] = key
+                self._moved_cells.setdefault(key, set()).add(index)
+
+    def _build(self):
+        count = self._model.vertex_count
+        with metrics.span("spatial_hash.build", "core", vertices=count):
+            coordinates = self._model.coordinates
+            self._cell_size = self._requested_cell_size or self._estimate_cell_size()
+            self._origin = coordinates.min(axis=0) if count else np.zeros(3)
+            self._keys = self._encode(self._cell_coords(coordinates))
+            self._order = np.argsort(self._keys, kind="stable")
+            self._sorted_keys = self._keys[self._order]
+            self._moved = np.zeros(count, dtype=bool)
+            self._moved_cells = {}
+            self._moved_key = {}
+
+    # @intent:operation セルの大きさを面の辺の長さの中央値とします（1セルあたり数個の頂点になる）。
+    # 面の数が多い場合は等間隔に抜き出した面から推定します。
+    def _estimate_cell_size(self) -> float:
+        quads = self._model.face_indices
+        if len(quads) > _EDGE_SAMPLE_FACES:
+            quads = quads[::len(quads) // _EDGE_SAMPLE_FACES]
+        if len(quads):
+            corners = self._model.coordinates[quads]
+            lengths = np.linalg.norm(corners - np.roll(corners, 1, axis=1), axis=2)
+            size = float(np.median(lengths))
+            if np.isfinite(size) and size > 0.0:
+                return size
+        return 1.0
@@ -0,0 +1,35 @@
+from typing import Tuple
+import numpy as np
+
+# @intent:responsibility インデックス形式の四角形メッシュ（頂点プール + (F, 4) インデックス配列）に対する位相計算を提供します。
+# @intent:role geometry_utils と同様にステートレスな関数群。Model はここで得た配列をキャッシュとして保持します。
+
+# @intent:operation 頂点→面の隣接関係を CSR 形式で構築します。
+# @intent:return (offsets, rows)。頂点 i に隣接する面の行番号は rows[offsets[i]:offsets[i+1]]。
+# 同じ頂点を2回参照する退化面は、その頂点の隣接リストに2回現れます。
+def build_vertex_face_adjacency(quads: np.ndarray, vertex_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    flat = np.asarray(quads, dtype=np.int64).ravel()
+    order = np.argsort(flat, kind="stable")
+    rows = order // 4
+    counts = np.bincount(flat, minlength=vertex_count)
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, rows
+
+# @intent:operation 同一座標（許容誤差内）の頂点をまとめた重複のない頂点プールを求めます。
+# @intent:return (representatives, inverse)。representatives は各グループで最初に現れた頂点のインデックス（出現順）、
+# inverse は元の頂点ごとの所属グループ番号（representatives 上の位置）。
+# @intent:warning tolerance > 0 の場合は tolerance 幅の格子に量子化して比較するため、格子境界を跨ぐ近接点は統合されません。
+def weld_coordinates(coords: np.ndarray, tolerance: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    if len(coords) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keys = np.round(coords / tolerance) if tolerance > 0 else coords
+    _, first_index, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    # np.unique はソート順で返すため、最初の出現順に並べ直す
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first_index[order], rank[inverse]
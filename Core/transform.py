@@ -0,0 +1,85 @@
+import math
+from typing import Sequence, Union
+import numpy as np
+
+# @intent:responsibility 4x4 の同次変換行列の生成と、座標配列への一括適用を提供します。
+# @intent:rationale 行列は列ベクトルの規約（p' = M @ [x, y, z, 1]）で表し、OpenGL の固定機能パイプラインと同じ向きとします。
+# 合成は `compose(a, b, ...)` で「a を適用した後に b を適用する」順に行い、行列の積の順序を呼び出し側が意識しなくてよいようにします。
+
+_AXES = {'x': (1.0, 0.0, 0.0), 'y': (0.0, 1.0, 0.0), 'z': (0.0, 0.0, 1.0)}
+
+Axis = Union[str, Sequence[float]]
+
+def identity() -> np.ndarray:
+    return np.identity(4)
+
+def translation(dx: float, dy: float, dz: float) -> np.ndarray:
+    matrix = np.identity(4)
+    matrix[:3, 3] = (dx, dy, dz)
+    return matrix
+
+# @intent:operation 拡大縮小行列。sy, sz を省略した場合は sx による等倍の拡大縮小となります。
+def scaling(sx: float, sy: float = None, sz: float = None) -> np.ndarray:
+    sy = sx if sy is None else sy
+    sz = sx if sz is None else sz
+    return np.diag([float(sx), float(sy), float(sz), 1.0])
+
+# @intent:operation 原点を通る軸まわりの回転行列（右手系で反時計回りが正）。axis は 'x' / 'y' / 'z' または方向ベクトル。
+def rotation(axis: Axis, degrees: float) -> np.ndarray:
+    x, y, z = _unit_axis(axis)
+    if degrees % 90 == 0:
+        # 90度の倍数は丸め誤差のない値を使う（90度回転を繰り返しても座標が格子点からずれないように）
+        c, s = ((1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0))[int(degrees // 90) % 4]
+    else:
+        theta = math.radians(degrees)
+        c, s = math.cos(theta), math.sin(theta)
+    t = 1.0 - c
+    # Rodrigues の回転公式
+    matrix = np.identity(4)
+    matrix[:3, :3] = [[t * x * x + c,     t * x * y - s * z, t * x * z + s * y],
+                      [t * x * y + s * z, t * y * y + c,     t * y * z - s * x],
+                      [t * x * z - s * y, t * y * z + s * x, t * z * z + c]]
+    return matrix
+
+# @intent:operation 原点を通り axis に垂直な平面に対する鏡映行列。
+def mirroring(axis: Axis) -> np.ndarray:
+    n = np.array(_unit_axis(axis))
+    matrix = np.identity(4)
+    matrix[:3, :3] -= 2.0 * np.outer(n, n)
+    return matrix
+
+# @intent:operation 行列を pivot を中心とする変換に置き換えます（pivot を原点へ移動 -> 変換 -> 元の位置へ戻す）。
+def about_pivot(matrix: np.ndarray, pivot: Sequence[float]) -> np.ndarray:
+    px, py, pz = pivot
+    return translation(px, py, pz) @ np.asarray(matrix, dtype=np.float64) @ translation(-px, -py, -pz)
+
+# @intent:operation 複数の変換を、引数の順に適用する1つの行列に合成します。
+def compose(*matrices: np.ndarray) -> np.ndarray:
+    result = np.identity(4)
+    for matrix in matrices:
+        result = np.asarray(matrix, dtype=np.float64) @ result
+    return result
+
+# @intent:operation 座標配列 (N, 3) に変換を一括で適用した新しい配列を返します。
+def transform_points(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    matrix = as_matrix(matrix)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+# @intent:operation 4x4 の float64 配列として検証して返します。
+# @intent:warning 射影成分（最下行が (0, 0, 0, 1) でない行列）はアフィン変換ではないため受け付けません。
+def as_matrix(matrix) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape != (4, 4):
+        raise ValueError("A transform must be a 4x4 matrix.")
+    if not np.array_equal(matrix[3], (0.0, 0.0, 0.0, 1.0)):
+        raise ValueError("A transform must be affine (last row 0, 0, 0, 1).")
+    return matrix
+
+def _unit_axis(axis: Axis):
+    if isinstance(axis, str):
+        return _AXES[axis.lower()]
+    x, y, z = (float(c) for c in axis)
+    length = math.sqrt(x * x + y * y + z * z)
+    if length == 0.0:
+        raise ValueError("The axis must not be a zero vector.")
+    return x / length, y / length, z / length
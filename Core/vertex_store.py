@@ -0,0 +1,165 @@
+from typing import List, Optional, Sequence
+import numpy as np
+
+# @intent:responsibility 頂点座標を連続した (N, 3) の float64 バッファとして保持する構造体配列（SoA）ストア。
+# @intent:role Model が所有する頂点データの実体。Vertex はこのバッファ内の1行を指すインデックスビューとなります。
+# @intent:invariant 有効な頂点は常に先頭 [0, count) に詰めて配置されます（削除はスワップ削除で穴を作らない）。
+class VertexStore:
+    def __init__(self, capacity: int = 16):
+        capacity = max(1, capacity)
+        self._data = np.zeros((capacity, 3), dtype=np.float64)
+        self._refcounts = np.zeros(capacity, dtype=np.int32)
+        self._owners: List[Optional[object]] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    # @intent:operation 有効範囲の座標配列を読み取り専用ビューとして返します。
+    # @intent:rationale レンダラーやエクスポーターがコピーなしでバッファを直接参照できるようにするため。
+    # 書き込みは必ずModel経由で行い、通知の整合性を保ちます。
+    @property
+    def coordinates(self) -> np.ndarray:
+        view = self._data[:self._count]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def refcounts(self) -> np.ndarray:
+        view = self._refcounts[:self._count]
+        view.flags.writeable = False
+        return view
+
+    def refcount(self, index: int) -> int:
+        return int(self._refcounts[index])
+
+    def owner(self, index: int) -> Optional[object]:
+        return self._owners[index]
+
+    def set_owner(self, index: int, owner: object):
+        self._owners[index] = owner
+
+    def get(self, index: int, axis: int) -> float:
+        return float(self._data[index, axis])
+
+    def set(self, index: int, axis: int, value: float):
+        self._data[index, axis] = value
+
+    def get_xyz(self, index: int) -> List[float]:
+        return self._data[index].tolist()
+
+    def set_xyz(self, index: int, x: float, y: float, z: float):
+        self._data[index] = (x, y, z)
+
+    # @intent:operation 頂点を末尾に追加し、割り当てたスロット番号を返します。
+    def append(self, xyz: Sequence[float], owner: Optional[object] = None) -> int:
+        self._reserve(self._count + 1)
+        index = self._count
+        self._data[index] = xyz
+        self._refcounts[index] = 0
+        self._owners.append(owner)
+        self._count += 1
+        return index
+
+    # @intent:operation スロットの参照カウントを増減します。減算後の値を返します。
+    def acquire(self, index: int):
+        self._refcounts[index] += 1
+
+    def release(self, index: int) -> int:
+        self._refcounts[index] -= 1
+        return int(self._refcounts[index])
+
+    def set_refcounts(self, refcounts: np.ndarray):
+        self._refcounts[:self._count] = refcounts
+
+    # @intent:operation スロットを削除し、末尾のスロットをその位置へ移動（スワップ削除）します。
+    # @intent:return 移動元となった旧末尾インデックス。移動が発生しなかった場合は -1。
+    # 呼び出し側は、旧末尾インデックスを参照しているトポロジーを付け替える責務を負います。
+    def swap_remove(self, index: int) -> int:
+        last = self._count - 1
+        moved_from = -1
+        if index != last:
+            self._data[index] = self._data[last]
+            self._refcounts[index] = self._refcounts[last]
+            self._owners[index] = self._owners[last]
+            moved_from = last
+        self._owners.pop()
+        self._count -= 1
+        return moved_from
+
+    # @intent:operation スワップ削除の逆操作。指定したスロットの内容を末尾へ移し、空いたスロットに新しい頂点を置きます（参照カウントは 0）。
+    # @intent:return 移動先となった末尾インデックス。index が末尾（追加と同じ）の場合は -1。
+    # 呼び出し側は、移動したスロットを参照しているトポロジーを付け替える責務を負います。
+    def insert(self, index: int, xyz: Sequence[float], owner: Optional[object] = None) -> int:
+        last = self.append(xyz, owner)
+        if index == last:
+            return -1
+        self._data[[index, last]] = self._data[[last, index]]
+        self._refcounts[[index, last]] = self._refcounts[[last, index]]
+        self._owners[index], self._owners[last] = self._owners[last], self._owners[index]
+        return last
+
+    # @intent:operation 指定したスロットだけを指定順に残してストアを詰め直します。
+    # @intent:return 旧インデックス -> 新インデックスの対応配列。取り除かれたスロットは -1。
+    def compact(self, keep: np.ndarray) -> np.ndarray:
+        keep = np.asarray(keep, dtype=np.int64)
+        remap = np.full(self._count, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        count = len(keep)
+        self._data[:count] = self._data[keep]
+        self._refcounts[:count] = self._refcounts[keep]
+        self._owners = [self._owners[i] for i in keep.tolist()]
+        self._count = count
+        return remap
+
+    # @intent:operation 既存の (N, 3) 配列をそのままバッファとして採用し、ストアの内容を置き換えます（コピーしません）。
+    # @intent:rationale ファイルをメモリマップした配列（np.memmap の copy-on-write）を直接参照させ、読み込み時の変換・コピーをなくすため。
+    # 容量は N ちょうどとなり、以降の追加で拡張される時点で通常のメモリ上の配列にコピーされます。
+    def adopt(self, coordinates: np.ndarray, owners: List[object], refcounts: np.ndarray):
+        if coordinates.ndim != 2 or coordinates.shape[1] != 3 or coordinates.dtype != np.float64:
+            raise ValueError("Coordinates must be an (N, 3) float64 array.")
+        count = len(coordinates)
+        self._data = coordinates if count > 0 else np.zeros((1, 3), dtype=np.float64)
+        self._refcounts = np.zeros(max(1, count), dtype=np.int32)
+        self._refcounts[:count] = refcounts
+        self._owners = list(owners)
+        self._count = count
+
+    # @intent:operation 全ての有効頂点に同じ移動量を一括で加算します（単一のベクトル演算）。
+    def translate(self, dx: float, dy: float, dz: float):
+        self._data[:self._count] += (dx, dy, dz)
+
+    # @intent:operation 指定したスロット（省略時は全ての有効頂点）に 4x4 のアフィン変換を一括で適用します（単一のベクトル演算）。
+    def transform(self, matrix: np.ndarray, indices: Optional[np.ndarray] = None):
+        if indices is None:
+            points = self._data[:self._count]
+            points[...] = points @ matrix[:3, :3].T + matrix[:3, 3]
+        else:
+            self._data[indices] = self._data[indices] @ matrix[:3, :3].T + matrix[:3, 3]
+
+    # @intent:operation 指定したスロット（省略時は全ての有効頂点）の座標を配列で一括して書き込みます。
+    def write(self, coordinates: np.ndarray, indices: Optional[np.ndarray] = None):
+        if indices is None:
+            self._data[:self._count] = coordinates
+        else:
+            self._data[indices] = coordinates
+
+    def clear(self):
+        self._owners.clear()
+        self._count = 0
+
+    def _reserve(self, required: int):
+        capacity = self._data.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        data = np.zeros((new_capacity, 3), dtype=np.float64)
+        data[:self._count] = self._data[:self._count]
+        refcounts = np.zeros(new_capacity, dtype=np.int32)
+        refcounts[:self._count] = self._refcounts[:self._count]
+        self._data = data
+        self._refcounts = refcounts
@@ -0,0 +1,61 @@
+from typing import NamedTuple
+import numpy as np
+from Core.bvh import FaceBVH
+from Core.geometry_utils import frustum_planes
+
+# 葉（leaf_size 個の面のまとまり）全体の画面上の直径がこのピクセル数未満の場合、葉を1つの点で代用する
+POINT_LOD_PIXELS = 1.5
+# 面1つあたりの画面上の大きさがこのピクセル数未満の場合、ワイヤーフレームを描画しない（線で面が塗りつぶされるため）
+WIREFRAME_MIN_PIXELS = 4.0
+
+# @intent:responsibility 1フレーム分の描画計画。視錐台の外にある面は含まれません。
+class VisibilityPlan(NamedTuple):
+    # 塗りつぶしで描画する面の行番号
+    fill_rows: np.ndarray
+    # ワイヤーフレームも描画する面の行番号（fill_rows の部分集合）
+    wire_rows: np.ndarray
+    # 面の代わりに点として描画する葉の中心座標 (K, 3)
+    points: np.ndarray
+    # 視錐台と交差する葉に含まれる面の総数（点で代用した面を含む）
+    visible_faces: int
+
+# @intent:operation カメラの行列から、視錐台カリングと詳細度（LOD）を適用した描画計画を作成します。
+# @intent:rationale 判定の単位は `FaceBVH` の葉（空間的に近い面のまとまり）とし、葉の AABB は BVH がキャッシュ・再フィットしたものを使う。
+# 視錐台の外の部分木は BVH の上位レベルで打ち切るため、計画の作成と描画のコストは画面に見えている部分の複雑さに比例する。
+# 詳細度は葉の外接球の画面上の直径から決める。遠く密な領域では、面1つが数ピクセル未満ならワイヤーフレームを省き、
+# 葉全体が POINT_LOD_PIXELS 未満なら葉を1つの点に置き換える。
+# @intent:pre-condition modelview / projection は glGetDoublev が返す列優先の 4x4 配列、viewport は (x, y, 幅, 高さ)。
+def plan_visibility(bvh: FaceBVH, modelview, projection, viewport,
+                    point_pixels: float = POINT_LOD_PIXELS,
+                    wire_pixels: float = WIREFRAME_MIN_PIXELS) -> VisibilityPlan:
+    leaves = bvh.visible_leaves(frustum_planes(modelview, projection))
+    if leaves.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return VisibilityPlan(empty, empty, np.zeros((0, 3)), 0)
+
+    lo, hi = bvh.leaf_bounds(leaves)
+    rows = bvh.leaf_rows(leaves)
+    counts = (rows >= 0).sum(axis=1)
+    center = (lo + hi) * 0.5
+    diameter = np.linalg.norm(hi - lo, axis=1)
+
+    # 葉の中心のクリップ座標 w（透視投影では視点からの奥行き）から、1単位長あたりの画面上のピクセル数を求める
+    projection_math = np.asarray(projection, dtype=np.float64).reshape(4, 4).T
+    clip = projection_math @ np.asarray(modelview, dtype=np.float64).reshape(4, 4).T
+    w = center @ clip[3, :3] + clip[3, 3]
+    pixels_per_unit = abs(projection_math[1, 1]) * float(viewport[3]) * 0.5
+    if projection_math[3, 3] == 0.0:
+        # 透視投影: 視点の平面をまたぐ（または近すぎる）葉は常に詳細に描画する
+        with np.errstate(divide="ignore"):
+            leaf_pixels = np.where(w > diameter * 0.5, diameter * pixels_per_unit / w, np.inf)
+    else:
+        leaf_pixels = diameter * pixels_per_unit / w
+
+    face_pixels = leaf_pixels / np.sqrt(np.maximum(counts, 1))
+    as_point = leaf_pixels < point_pixels
+    with_wire = ~as_point & (face_pixels >= wire_pixels)
+
+    fill_rows = rows[~as_point].ravel()
+    wire_rows = rows[with_wire].ravel()
+    return VisibilityPlan(fill_rows[fill_rows >= 0], wire_rows[wire_rows >= 0], center[as_point],
+                          int(counts.sum()))
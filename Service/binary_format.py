@@ -0,0 +1,104 @@
+import json
+import struct
+from typing import List, Optional, Tuple
+import numpy as np
+from Core.data_model import Model
+
+# @intent:responsibility Relabs バイナリモデル形式 (.rlb) の読み書き。
+# @intent:rationale XML は座標を10進文字列の属性として保持するため、ファイルが大きく解析も遅い。
+# 本形式は座標・面インデックスをリトルエンディアンの連続ブロックとして格納し、読み込み時は座標ブロックをメモリマップして
+# そのまま Model の頂点バッファとして採用する（頂点ごとの解析・変換は行わない）。
+#
+# レイアウト（各ブロックの先頭は BLOCK_ALIGNMENT バイト境界）:
+#   ヘッダー    : HEADER 構造体（magic, version, 頂点数, 面数, 各ブロックのオフセットとサイズ）
+#   座標        : (N, 3) float64
+#   面インデックス: (F, 4) int64（座標ブロックの頂点番号）
+#   面ID        : UTF-8 文字列を NUL 区切りで連結
+#   メタデータ  : UTF-8 JSON（scope, coordinate_mode, reference_point）
+
+MAGIC = b"RLBM"
+VERSION = 1
+BLOCK_ALIGNMENT = 64
+
+# magic, version, reserved, vertex_count, face_count,
+# coords_offset, quads_offset, ids_offset, ids_size, metadata_offset, metadata_size
+HEADER = struct.Struct("<4sHHQQQQQQQQ")
+
+_COORD_DTYPE = np.dtype("<f8")
+_INDEX_DTYPE = np.dtype("<i8")
+
+def _align(offset: int) -> int:
+    return -(-offset // BLOCK_ALIGNMENT) * BLOCK_ALIGNMENT
+
+# @intent:operation 座標配列・面インデックス配列・面ID・メタデータをバイナリ形式で書き出します。
+def write_binary(filepath: str, coordinates: np.ndarray, quads: np.ndarray,
+                 face_ids: List[str], metadata: dict):
+    coordinates = np.ascontiguousarray(coordinates, dtype=_COORD_DTYPE)
+    quads = np.ascontiguousarray(quads, dtype=_INDEX_DTYPE)
+    if coordinates.ndim != 2 or coordinates.shape[1] != 3:
+        raise ValueError("Coordinates must be an (N, 3) array.")
+    if quads.ndim != 2 or quads.shape[1] != 4 or len(quads) != len(face_ids):
+        raise ValueError("Face indices must be an (F, 4) array with one ID per face.")
+    if any("\0" in face_id for face_id in face_ids):
+        raise ValueError("Face IDs must not contain NUL characters.")
+
+    ids = "\0".join(face_ids).encode("utf-8")
+    meta = json.dumps(metadata).encode("utf-8")
+
+    coords_offset = _align(HEADER.size)
+    quads_offset = _align(coords_offset + coordinates.nbytes)
+    ids_offset = _align(quads_offset + quads.nbytes)
+    meta_offset = _align(ids_offset + len(ids))
+
+    with open(filepath, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(coordinates), len(quads),
+                            coords_offset, quads_offset, ids_offset, len(ids), meta_offset, len(meta)))
+        for offset, block in ((coords_offset, coordinates), (quads_offset, quads),
+                              (ids_offset, ids), (meta_offset, meta)):
+            # 空の配列は memoryview の cast ができないため書き出さない（ブロックのサイズは 0）
+            if len(block) == 0:
+                continue
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(memoryview(block).cast("B"))
+
+# @intent:operation バイナリ形式のファイルを読み込みます。
+# @intent:return (座標, 面インデックス, 面ID, メタデータ)。座標と面インデックスは copy-on-write のメモリマップで、
+# 書き換えてもファイルには反映されません。
+def read_binary(filepath: str) -> Tuple[np.ndarray, np.ndarray, List[str], dict]:
+    with open(filepath, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size or header[:4] != MAGIC:
+            raise ValueError(f"Not a Relabs binary model file: {filepath}")
+        (_, version, _, vertex_count, face_count, coords_offset, quads_offset,
+         ids_offset, ids_size, meta_offset, meta_size) = HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary model version: {version}")
+        f.seek(ids_offset)
+        ids = f.read(ids_size).decode("utf-8")
+        f.seek(meta_offset)
+        metadata = json.loads(f.read(meta_size).decode("utf-8"))
+
+    coordinates = _map_block(filepath, coords_offset, (vertex_count, 3), _COORD_DTYPE)
+    quads = _map_block(filepath, quads_offset, (face_count, 4), _INDEX_DTYPE)
+    face_ids = ids.split("\0") if face_count > 0 else []
+    if len(face_ids) != face_count:
+        raise ValueError("Corrupted face ID table.")
+    if face_count > 0 and (quads.min() < 0 or quads.max() >= vertex_count):
+        raise ValueError("Face indices refer to vertices outside the coordinate block.")
+    return coordinates, quads, face_ids, metadata
+
+def _map_block(filepath: str, offset: int, shape: Tuple[int, int], dtype: np.dtype) -> np.ndarray:
+    if shape[0] == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(filepath, dtype=dtype, mode="c", offset=offset, shape=shape)
+
+# @intent:operation バイナリ形式のファイルを既存の Model に読み込み、その内容を置き換えます。
+# @intent:return 出力時のエクスポート設定（scope, coordinate_mode, reference_point）。
+# @intent:rationale Model は常に絶対座標を保持するため、相対座標で出力されたファイルは基準点を加算して復元します（この場合のみ座標はメモリ上にコピーされます）。
+def load_binary(filepath: str, model: Model) -> dict:
+    coordinates, quads, face_ids, metadata = read_binary(filepath)
+    reference_point: Optional[List[float]] = metadata.get("reference_point")
+    if metadata.get("coordinate_mode") == "relative" and reference_point:
+        coordinates = np.asarray(coordinates + reference_point, dtype=np.float64)
+    model._load_arrays(coordinates, quads, face_ids)
+    return metadata
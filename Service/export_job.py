@@ -0,0 +1,70 @@
+import threading
+from typing import Callable, Optional, Tuple
+from Service.exporter import ExportSnapshot, ExportCancelled
+
+# @intent:responsibility エクスポートのファイル書き出しをバックグラウンドスレッドで実行し、その進捗と結果を保持します。
+# @intent:rationale 書き出し中も GUI スレッドが再描画と編集を継続できるようにするため。ジョブはモデルに触れず、
+# 作成済みの ExportSnapshot のみを読み取ります。UIフレームワークに依存しないよう、進捗と結果は GUI 側からの問い合わせ（ポーリング）で取得します。
+# @intent:lifecycle start() で開始し、is_running が False になった時点で state と error が確定します。
+class ExportJob:
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    # write は Exporter.write_xml / Exporter.write_binary と同じシグネチャの関数
+    def __init__(self, write: Callable, snapshot: ExportSnapshot, filepath: str):
+        self._write = write
+        self._snapshot = snapshot
+        self._filepath = filepath
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._progress = (0, snapshot.face_count)
+        self._state = self.RUNNING
+        self._error: Optional[str] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ExportJob", daemon=True)
+        self._thread.start()
+
+    # @intent:operation 中止を要求します。次のチャンクの書き込み前に中止され、出力先には何も残りません。
+    def cancel(self):
+        self._cancel_event.set()
+
+    # @intent:operation 書き出しの完了（成功・中止・失敗）を待ちます。
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # @intent:operation (書き込み済みの面数, 総面数)
+    @property
+    def progress(self) -> Tuple[int, int]:
+        return self._progress
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    def _on_progress(self, done: int, total: int):
+        self._progress = (done, total)
+
+    def _run(self):
+        try:
+            self._write(self._snapshot, self._filepath,
+                        progress=self._on_progress, is_cancelled=self._cancel_event.is_set)
+        except ExportCancelled:
+            self._state = self.CANCELLED
+        except Exception as e:
+            self._error = str(e)
+            self._state = self.FAILED
+        else:
+            self._state = self.SUCCEEDED
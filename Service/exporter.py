@@ -1,11 +1,110 @@
-import xml.etree.ElementTree as ET
-from typing import List, Optional
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 from Core.data_model import Model, Face, Vertex
+from Core.metrics import metrics
+from Service.binary_format import write_binary
+
+# ET.indent(space="    ") と同じ1階層あたりのインデント
+_INDENT = "    "
+
+# ElementTree と同じ規則で属性値・テキストをエスケープする
+def _escape_attribute(value: str) -> str:
+    if any(c in value for c in '&<>"\n\r\t'):
+        value = (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                 .replace('"', "&quot;").replace("\r", "&#13;").replace("\n", "&#10;").replace("\t", "&#09;"))
+    return value
+
+def _escape_text(value: str) -> str:
+    if any(c in value for c in "&<>"):
+        value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return value
+
+# @intent:operation 子要素を持たない要素を、指定した階層のインデント付きの1行として整形します。
+def _element(level: int, tag: str, text: Optional[str] = None, **attributes: str) -> str:
+    attrs = "".join(f' {name}="{_escape_attribute(value)}"' for name, value in attributes.items())
+    if text:
+        return f"{_INDENT * level}<{tag}{attrs}>{_escape_text(text)}</{tag}>\n"
+    return f"{_INDENT * level}<{tag}{attrs} />\n"
+
+# @intent:operation 一時ファイルに書き出し、成功した場合のみ出力先へ置き換えます。
+# @intent:rationale 中止・失敗時に書きかけのファイルを残さず、既存のファイルも壊さないため。
+@contextmanager
+def _replacing(filepath: str):
+    temp_path = filepath + ".part"
+    try:
+        yield temp_path
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, filepath)
+
+# @intent:operation 1つの面（Face要素と4つのVertex要素）を整形します。
+def _format_face(face_id: str, face_coords) -> str:
+    lines = [f'{_INDENT * 3}<Face id="{_escape_attribute(face_id)}">\n']
+    for v_idx, (x, y, z) in enumerate(face_coords):
+        lines.append(f'{_INDENT * 4}<Vertex index="{v_idx}" x="{x}" y="{y}" z="{z}" />\n')
+    lines.append(_INDENT * 3 + "</Face>\n")
+    return "".join(lines)
+
+# @intent:operation 面の並びを整形します。face_coords は (F, 4, 3) の変換済み座標。
+def _format_faces(face_ids: List[str], face_coords: np.ndarray) -> str:
+    return "".join(_format_face(face_id, corners) for face_id, corners in zip(face_ids, face_coords.tolist()))
+
+# ワーカープロセスが共有メモリから参照する配列 {名前: (SharedMemory, ndarray)}
+_worker_arrays: Dict[str, tuple] = {}
+
+# @intent:operation ワーカープロセスの初期化。親プロセスが作成した共有メモリに接続します（コピーしない）。
+# @intent:warning 共有メモリの解放（unlink）は作成した親プロセスの責務。spawn で起動したワーカーは親の resource_tracker を共有するため、
+# ワーカー側で登録を解除してはならない（親の unlink 時に二重解除となる）。
+def _init_format_worker(specs: Dict[str, tuple]):
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_arrays[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+def _format_shared_chunk(start: int, end: int, face_ids: List[str]) -> str:
+    coordinates = _worker_arrays["coordinates"][1]
+    quads = _worker_arrays["quads"][1]
+    return _format_faces(face_ids, coordinates[quads[start:end]])
+
+# @intent:responsibility エクスポートが利用者によって中止されたことを表す例外。出力先には何も残りません。
+class ExportCancelled(Exception):
+    pass
+
+# @intent:responsibility エクスポート開始時点の出力内容（設定・対象面の座標・インデックス・ID）の複製。
+# @intent:rationale 書き出しをワーカースレッドで行う間もモデルの編集を続けられるよう、モデルとは独立した配列として保持します。
+class ExportSnapshot:
+    def __init__(self, scope: str, coordinate_mode: str, reference: Optional[Tuple[float, float, float]],
+                 coordinates: np.ndarray, quads: np.ndarray, face_ids: List[str]):
+        self.scope = scope
+        self.coordinate_mode = coordinate_mode
+        # 相対座標モードの基準点。絶対座標モードでは None
+        self.reference = reference
+        # 対象面が参照する頂点の絶対座標 (N, 3) と、面ごとの頂点インデックス (F, 4)
+        self.coordinates = coordinates
+        self.quads = quads
+        self.face_ids = face_ids
+
+    @property
+    def face_count(self) -> int:
+        return len(self.face_ids)
 
 # @intent:responsibility モデルデータをXML形式でエクスポートするサービス。
 # @intent:role 座標系の変換やフィルタリングのロジックをカプセル化します。
 # @intent:rationale モデルの純粋性を保つため、座標変換ロジックはCoreではなく本クラス（出力境界）に配置しています。Coreは常に絶対座標のみを扱います。
+# @intent:lifecycle 出力は snapshot()（モデルを参照するため GUI スレッドで呼び出す）と write_xml / write_binary（任意のスレッドで実行可能）の2段階で行います。
+# export_xml / export_binary は両者をまとめて同期的に実行します。
 class Exporter:
+    # 1回の座標収集・書き込みでまとめて処理する面の数（メモリ使用量と進捗通知の粒度を決める）
+    FACES_PER_CHUNK = 4096
+    # 並列整形を使う最小の面数。これ未満ではワーカーの起動コストが整形時間を上回る
+    PARALLEL_MIN_FACES = 200000
+
     def __init__(self, model: Model):
         self._model = model
 
@@ -14,51 +113,166 @@ class Exporter:
                    scope: str = 'all', # 'all' or 'selection'
                    coordinate_mode: str = 'absolute', # 'absolute' or 'relative'
                    reference_point: Vertex = None,
-                   selected_face: Optional[Face] = None):
-        
-        root = ET.Element("ModelingData")
-        
-        # エクスポート設定のメタデータ記録
-        settings_elem = ET.SubElement(root, "ExportSettings")
-        ET.SubElement(settings_elem, "Scope").text = scope
-        ET.SubElement(settings_elem, "CoordinateMode").text = coordinate_mode
-        
-        ref_x, ref_y, ref_z = 0.0, 0.0, 0.0
-        if coordinate_mode == 'relative' and reference_point:
-            ref_elem = ET.SubElement(settings_elem, "ReferencePoint")
-            ref_elem.set("x", str(reference_point.x))
-            ref_elem.set("y", str(reference_point.y))
-            ref_elem.set("z", str(reference_point.z))
-            ref_x, ref_y, ref_z = reference_point.x, reference_point.y, reference_point.z
-
-        models_elem = ET.SubElement(root, "Models")
-        
-        # 出力対象の面を決定
-        target_faces = []
-        if scope == 'selection' and selected_face:
-            target_faces = [selected_face]
-        else:
-            target_faces = self._model.faces
-
-        # モデルデータの構築
-        # 今回は単一のModelコンテナとして出力する構造とする
-        model_elem = ET.SubElement(models_elem, "Model", id="main_model")
-
-        for i, face in enumerate(target_faces):
-            face_elem = ET.SubElement(model_elem, "Face", id=face.id)
-            
-            for v_idx, v in enumerate(face.vertices):
-                # 座標変換ロジック
-                # 絶対座標モードならそのまま、相対座標モードなら基準点を引く
-                x = v.x - ref_x
-                y = v.y - ref_y
-                z = v.z - ref_z
-                
-                ET.SubElement(face_elem, "Vertex", 
-                              index=str(v_idx), 
-                              x=str(x), y=str(y), z=str(z))
-
-        # XML書き出し
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="    ", level=0)
-        tree.write(filepath, encoding="utf-8", xml_declaration=True)
+                   selected_faces: Optional[Sequence[Face]] = None):
+        self.write_xml(self.snapshot(scope, coordinate_mode, reference_point, selected_faces), filepath)
+
+    # @intent:operation 指定された条件に基づいてモデルをバイナリ形式 (.rlb) で保存します。引数の意味は export_xml と同じです。
+    def export_binary(self, filepath: str,
+                      scope: str = 'all',
+                      coordinate_mode: str = 'absolute',
+                      reference_point: Vertex = None,
+                      selected_faces: Optional[Sequence[Face]] = None):
+        self.write_binary(self.snapshot(scope, coordinate_mode, reference_point, selected_faces), filepath)
+
+    # @intent:operation 出力対象の面を決定し、その時点の座標・インデックス・IDを複製します。
+    # scope が 'selection' の場合は selected_faces のうちこのモデルに属する面を、モデル内の並び順で出力します。
+    # @intent:warning selected_faces を指定したが、どれもこのモデルに属さない（削除済みの面の選択が残っている等）場合は、
+    # 空のファイルを書き出す代わりに ValueError を送出します。
+    def snapshot(self, scope: str = 'all', coordinate_mode: str = 'absolute',
+                 reference_point: Vertex = None, selected_faces: Optional[Sequence[Face]] = None) -> ExportSnapshot:
+        with metrics.span("export.snapshot", "service", scope=scope):
+            reference = None
+            if coordinate_mode == 'relative' and reference_point:
+                reference = (reference_point.x, reference_point.y, reference_point.z)
+
+            # 出力対象の面を決定（全ての面を出力する場合は Model のバッファと面IDの一覧をそのまま使い、面を生成しない）
+            if scope == 'selection' and selected_faces:
+                target_faces = [self._model.face(row) for row in sorted(face.row for face in selected_faces
+                                                                        if face.model is self._model)]
+                if not target_faces:
+                    raise ValueError("None of the selected faces belong to the model.")
+                coordinates, quads = self._collect_topology(target_faces)
+                face_ids = [face.id for face in target_faces]
+            else:
+                coordinates, quads = self._model.coordinates, self._model.face_indices
+                face_ids = list(self._model.face_ids)
+
+            return ExportSnapshot(scope, coordinate_mode, reference, np.array(coordinates), np.array(quads), face_ids)
+
+    # @intent:operation スナップショットをXMLとして書き出します。
+    # @intent:rationale 文書全体を ElementTree として構築すると出力サイズの数倍のメモリを消費し、最後まで何も書き出されないため、
+    # 面を FACES_PER_CHUNK 個ずつ整形して逐次ファイルへ書き込みます。出力は従来の ET.indent + ElementTree.write とバイト単位で一致します。
+    # progress(書き込み済みの面数, 総面数) はチャンクごとに呼び出されます。is_cancelled() が True を返した場合は ExportCancelled を送出します。
+    # processes > 1 の場合、チャンクの整形を複数のプロセスで並列に行います（出力は同一）。
+    @classmethod
+    def write_xml(cls, snapshot: ExportSnapshot, filepath: str,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None,
+                  processes: int = 1):
+        with metrics.span("export.write_xml", "service", faces=snapshot.face_count, processes=processes):
+            # エクスポート設定のメタデータ記録
+            settings = [_element(2, "Scope", text=snapshot.scope),
+                        _element(2, "CoordinateMode", text=snapshot.coordinate_mode)]
+            ref = (0.0, 0.0, 0.0)
+            if snapshot.reference is not None:
+                ref = snapshot.reference
+                settings.append(_element(2, "ReferencePoint", x=str(ref[0]), y=str(ref[1]), z=str(ref[2])))
+
+            total = snapshot.face_count
+            if processes > 1 and total > cls.FACES_PER_CHUNK:
+                fragments = cls._format_parallel(snapshot, ref, processes)
+            else:
+                fragments = cls._format_serial(snapshot, ref)
+
+            # ElementTree.write(filepath, encoding="utf-8") と同じ開き方をする
+            with _replacing(filepath) as temp_path, \
+                    open(temp_path, "w", encoding="utf-8", errors="xmlcharrefreplace") as f:
+                f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+                f.write("<ModelingData>\n" + _INDENT + "<ExportSettings>\n")
+                f.write("".join(settings))
+                f.write(_INDENT + "</ExportSettings>\n" + _INDENT + "<Models>\n")
+
+                # 今回は単一のModelコンテナとして出力する構造とする
+                if total == 0:
+                    f.write(_INDENT * 2 + '<Model id="main_model" />\n')
+                else:
+                    f.write(_INDENT * 2 + '<Model id="main_model">\n')
+                    try:
+                        for end, text in fragments:
+                            if is_cancelled is not None and is_cancelled():
+                                raise ExportCancelled()
+                            f.write(text)
+                            if progress is not None:
+                                progress(end, total)
+                    finally:
+                        fragments.close()
+                    f.write(_INDENT * 2 + "</Model>\n")
+
+                f.write(_INDENT + "</Models>\n</ModelingData>")
+
+    # @intent:operation 面を FACES_PER_CHUNK 個ずつ整形し、(書き込み済みの面数, 断片) を順に返します。
+    @classmethod
+    def _format_serial(cls, snapshot: ExportSnapshot, ref) -> Iterator[Tuple[int, str]]:
+        for start in range(0, snapshot.face_count, cls.FACES_PER_CHUNK):
+            end = min(start + cls.FACES_PER_CHUNK, snapshot.face_count)
+            # 座標変換ロジック
+            # 絶対座標モードならそのまま、相対座標モードなら基準点を引く
+            coords = snapshot.coordinates[snapshot.quads[start:end]] - ref
+            yield end, _format_faces(snapshot.face_ids[start:end], coords)
+
+    # @intent:operation チャンクの整形をプロセスプールで並列に行い、断片を元の順序で返します。
+    # @intent:rationale 整形（float の文字列化）は Python の処理で GIL に律速されるため、スレッドではなくプロセスで並列化する。
+    # 基準点を引いた座標とインデックス配列は共有メモリに一度だけ置き、各タスクには範囲と面IDのみを渡す。
+    # 先行して投入するタスクを processes * 2 個までに抑え、メモリ上の断片の量を一定に保つ。
+    # @intent:warning GUI を含むマルチスレッドのプロセスから fork するのは安全でないため、spawn でワーカーを起動する。
+    @classmethod
+    def _format_parallel(cls, snapshot: ExportSnapshot, ref, processes: int) -> Iterator[Tuple[int, str]]:
+        arrays = {"coordinates": snapshot.coordinates - ref, "quads": snapshot.quads}
+        blocks = []
+        try:
+            specs = {}
+            for key, array in arrays.items():
+                shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+                blocks.append(shm)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+                specs[key] = (shm.name, array.shape, array.dtype.str)
+
+            total = snapshot.face_count
+            ranges = [(start, min(start + cls.FACES_PER_CHUNK, total))
+                      for start in range(0, total, cls.FACES_PER_CHUNK)]
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_format_worker, initargs=(specs,)) as executor:
+                pending = []
+                try:
+                    for start, end in ranges:
+                        pending.append((end, executor.submit(_format_shared_chunk, start, end,
+                                                             snapshot.face_ids[start:end])))
+                        if len(pending) >= processes * 2:
+                            end_of_chunk, future = pending.pop(0)
+                            yield end_of_chunk, future.result()
+                    for end_of_chunk, future in pending:
+                        yield end_of_chunk, future.result()
+                finally:
+                    for _, future in pending:
+                        future.cancel()
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    # @intent:operation スナップショットをバイナリ形式で書き出します。
+    # @intent:rationale XMLと異なり共有頂点を保ったまま、座標バッファとインデックス配列をそのまま書き出します。
+    @classmethod
+    def write_binary(cls, snapshot: ExportSnapshot, filepath: str,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None):
+        with metrics.span("export.write_binary", "service", faces=snapshot.face_count):
+            metadata = {"scope": snapshot.scope, "coordinate_mode": snapshot.coordinate_mode,
+                        "reference_point": list(snapshot.reference) if snapshot.reference is not None else None}
+            coordinates = snapshot.coordinates
+            if snapshot.reference is not None:
+                coordinates = coordinates - snapshot.reference
+            if is_cancelled is not None and is_cancelled():
+                raise ExportCancelled()
+            with _replacing(filepath) as temp_path:
+                write_binary(temp_path, coordinates, snapshot.quads, snapshot.face_ids, metadata)
+            if progress is not None:
+                progress(snapshot.face_count, snapshot.face_count)
+
+    # @intent:operation 出力対象の面が参照する頂点の座標 (N, 3) と、それを参照する面インデックス (F, 4) を取得します。
+    # 参照される頂点だけに詰め直します。
+    # @intent:pre-condition faces は全てこのモデルに属すること（snapshot が選択を絞り込んでから渡す）。
+    def _collect_topology(self, faces: List[Face]):
+        rows = np.fromiter((face.row for face in faces), dtype=np.int64, count=len(faces))
+        used, inverse = np.unique(self._model.face_indices[rows], return_inverse=True)
+        return self._model.coordinates[used], inverse.reshape(-1, 4)
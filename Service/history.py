@@ -0,0 +1,365 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Hashable, List, Optional
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.transform import as_matrix, translation
+
+# 履歴の記録が参照するオブジェクト（Vertex / Face）1つあたりの見積もりバイト数。
+# Python オブジェクトの実サイズは取得が不正確なため、記録の大きさは配列の nbytes とこの定数から見積もる。
+_VERTEX_REF_BYTES = 64
+# 削除された面は Vertex 4つ（座標を保持したまま独立する）とともに履歴に残るため、その分を含めて見積もる
+_FACE_RECORD_BYTES = 1024
+_STEP_OVERHEAD_BYTES = 256
+
+# @intent:responsibility 頂点座標の変更の記録。頂点ごとに変更前後の座標のみを保持します（モデルの複製は持たない）。
+# @intent:rationale 頂点はインデックスではなく Vertex（インデックスビュー）への参照で保持する。
+# 面の削除によるスワップ削除で頂点インデックスは変わるが、Vertex の参照は常に同じ頂点を指すため。
+class _VertexEdit:
+    def __init__(self, vertices: List[Vertex], old: np.ndarray, new: np.ndarray):
+        self.vertices = vertices
+        self.old = old
+        self.new = new
+
+    @property
+    def nbytes(self) -> int:
+        return self.old.nbytes + self.new.nbytes + _VERTEX_REF_BYTES * len(self.vertices)
+
+    def undo(self, model: Model):
+        for vertex, xyz in zip(self.vertices, self.old.tolist()):
+            vertex.set(*xyz)
+
+    def redo(self, model: Model):
+        for vertex, xyz in zip(self.vertices, self.new.tolist()):
+            vertex.set(*xyz)
+
+    def merge(self, other) -> bool:
+        if not isinstance(other, _VertexEdit) or len(other.vertices) != len(self.vertices) or \
+                any(a is not b for a, b in zip(self.vertices, other.vertices)):
+            return False
+        self.new = other.new
+        return True
+
+# @intent:responsibility 頂点座標の一括の変更の記録。頂点インデックスの配列（モデル全体の場合は None）と変更前後の座標配列のみを保持します。
+# @intent:rationale 多数の頂点に及ぶ変更（逆行列を持たない変換）を、`Vertex` を生成せずに記録し、単一の配列代入で戻すため。
+# インデックスで保持できるのは、取り消し・やり直しが記録の逆順に行われ、面の削除の取り消しが頂点を削除前のインデックスに戻すため
+# （`Model._restore_face`）、この記録を戻す時点の頂点の並びが記録した時点と一致するためである。
+class _CoordinateEdit:
+    def __init__(self, indices: Optional[np.ndarray], old: np.ndarray, new: np.ndarray):
+        self.indices = indices
+        self.old = old
+        self.new = new
+
+    @property
+    def nbytes(self) -> int:
+        return self.old.nbytes + self.new.nbytes + (self.indices.nbytes if self.indices is not None else 0)
+
+    def undo(self, model: Model):
+        model.set_coordinates(self.old, self.indices)
+
+    def redo(self, model: Model):
+        model.set_coordinates(self.new, self.indices)
+
+    def merge(self, other) -> bool:
+        if not isinstance(other, _CoordinateEdit) or (self.indices is None) != (other.indices is None):
+            return False
+        if self.indices is not None and not np.array_equal(self.indices, other.indices):
+            return False
+        self.new = other.new
+        return True
+
+# @intent:responsibility アフィン変換の記録。頂点数によらず変換行列とその逆行列（4x4）のみを保持します。
+# @intent:warning 取り消しは逆行列の適用で行うため、回転・拡大縮小の取り消しでは浮動小数点の丸め誤差が残り得ます。
+# 逆行列を持たない変換（拡大率 0 など）は EditHistory 側で頂点座標の記録（_CoordinateEdit）として扱います。
+class _TransformEdit:
+    nbytes = 2 * 16 * 8
+
+    def __init__(self, matrix: np.ndarray, faces: Optional[List[Face]]):
+        self.matrix = matrix
+        self.inverse = np.linalg.inv(matrix)
+        self.faces = faces
+
+    def undo(self, model: Model):
+        self._apply(model, self.inverse)
+
+    def redo(self, model: Model):
+        self._apply(model, self.matrix)
+
+    def _apply(self, model: Model, matrix: np.ndarray):
+        if self.faces is None and np.array_equal(matrix[:3, :3], np.identity(3)):
+            # 全体の平行移動は translate_all（重心・境界ボックスを O(1) で更新する）で適用する
+            model.translate_all(*matrix[:3, 3].tolist())
+        else:
+            model.apply_transform(matrix, self.faces)
+
+    def merge(self, other) -> bool:
+        if not isinstance(other, _TransformEdit) or (self.faces is None) != (other.faces is None):
+            return False
+        if self.faces is not None and (len(self.faces) != len(other.faces) or
+                                       any(a is not b for a, b in zip(self.faces, other.faces))):
+            return False
+        self.matrix = other.matrix @ self.matrix
+        self.inverse = self.inverse @ other.inverse
+        return True
+
+# @intent:responsibility 面の追加・削除の記録。面（と、その頂点）への参照と、削除の場合は削除前の頂点インデックスを保持します。
+# @intent:warning 削除の取り消しで再追加された面は、モデルの面の並びの末尾に置かれます（頂点インデックスは削除前に戻ります）。
+class _FaceEdit:
+    nbytes = _FACE_RECORD_BYTES
+
+    def __init__(self, face: Face, added: bool, indices: Optional[List[int]] = None):
+        self.face = face
+        self.added = added
+        self.indices = indices
+
+    def undo(self, model: Model):
+        self._set_present(model, not self.added)
+
+    def redo(self, model: Model):
+        self._set_present(model, self.added)
+
+    def _set_present(self, model: Model, present: bool):
+        if present and self.indices is not None:
+            model._restore_face(self.face, self.indices)
+        elif present:
+            model.add_face(self.face)
+        else:
+            model.remove_face(self.face)
+
+    def merge(self, other) -> bool:
+        return False
+
+# @intent:responsibility 取り消し・やり直しの単位（1回の操作）。複数の記録を順に保持します。
+class _Step:
+    def __init__(self, label: str, coalesce_key: Optional[Hashable] = None):
+        self.label = label
+        self.records = []
+        self.coalesce_key = coalesce_key
+        self.timestamp = time.monotonic()
+        self.nbytes = _STEP_OVERHEAD_BYTES
+
+    def add(self, record):
+        self.records.append(record)
+        self.nbytes += record.nbytes
+
+    def merge(self, records) -> bool:
+        if len(self.records) != 1 or len(records) != 1:
+            return False
+        before = self.records[0].nbytes
+        if not self.records[0].merge(records[0]):
+            return False
+        self.nbytes += self.records[0].nbytes - before
+        self.timestamp = time.monotonic()
+        return True
+
+# @intent:responsibility モデルに対する編集を実行し、取り消し・やり直しのための差分を記録する履歴サービス。
+# @intent:role UI からのモデル編集の窓口（Command パターン）。ここを経由しない編集（ファイルの読み込みなど）の後は clear() を呼び出すこと。
+# @intent:rationale 記録するのは差分のみ（頂点ごとの変更前後の座標、変換行列、面への参照）で、モデルの複製は持たない。
+# 履歴全体の見積もりサイズが budget_bytes を超えた場合は古い操作から破棄するため、長時間の編集でもメモリ使用量は上限内に収まる。
+# @intent:lifecycle 編集・取り消し・やり直しのたびに登録された Observer へ自身を通知します（メニューの有効状態の更新用）。
+class EditHistory:
+    DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+    # 同じ coalesce_key を持つ編集がこの秒数以内に続いた場合、1つの操作にまとめる
+    COALESCE_SECONDS = 1.0
+
+    def __init__(self, model: Model, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self._model = model
+        self._budget_bytes = budget_bytes
+        self._undo: deque = deque()
+        self._redo: List[_Step] = []
+        self._memory_usage = 0
+        # transaction() 中に記録を集める操作（ネスト時は最も外側）
+        self._open_step: Optional[_Step] = None
+        self._transaction_depth = 0
+        self._observers: List[Callable] = []
+
+    # --- 編集操作 ---
+
+    # @intent:operation 頂点の座標を変更します。coalesce_key が直前の操作と同じ場合（スピンボックスのドラッグなど）は1つの操作にまとめます。
+    def set_vertex(self, vertex: Vertex, x: float, y: float, z: float,
+                   coalesce_key: Optional[Hashable] = None):
+        old = np.array([[vertex.x, vertex.y, vertex.z]])
+        new = np.array([[float(x), float(y), float(z)]])
+        if np.array_equal(old, new):
+            return
+        with self._model.batch():
+            vertex.set(x, y, z)
+        self._record("Edit Vertex", _VertexEdit([vertex], old, new), coalesce_key)
+
+    # @intent:operation モデル全体を平行移動します（`Model.translate_all`）。
+    def translate_all(self, dx: float, dy: float, dz: float, coalesce_key: Optional[Hashable] = None):
+        self._model.translate_all(dx, dy, dz)
+        self._record("Move Object", _TransformEdit(translation(dx, dy, dz), None), coalesce_key)
+
+    # @intent:operation アフィン変換をモデル全体または指定した面に適用します（`Model.apply_transform`）。
+    def apply_transform(self, matrix, faces: Optional[List[Face]] = None, label: str = "Transform",
+                        coalesce_key: Optional[Hashable] = None):
+        matrix = as_matrix(matrix)
+        faces = list(faces) if faces is not None else None
+        if abs(np.linalg.det(matrix[:3, :3])) > 1e-12:
+            self._model.apply_transform(matrix, faces)
+            self._record(label, _TransformEdit(matrix, faces), coalesce_key)
+            return
+        # 逆行列を持たない変換は、影響を受ける頂点（全体の場合は全ての頂点）の変更前後の座標配列として記録する
+        indices = self._affected_indices(faces)
+        coordinates = self._model.coordinates
+        old = coordinates.copy() if indices is None else coordinates[indices]
+        self._model.apply_transform(matrix, faces)
+        coordinates = self._model.coordinates
+        new = coordinates.copy() if indices is None else coordinates[indices]
+        self._record(label, _CoordinateEdit(indices, old, new), coalesce_key)
+
+    def add_face(self, face: Face):
+        self._model.add_face(face)
+        self._record("Add Face", _FaceEdit(face, added=True))
+
+    def remove_face(self, face: Face):
+        if face.model is not self._model:
+            return
+        indices = [v.index for v in face.vertices]
+        self._model.remove_face(face)
+        self._record("Remove Face", _FaceEdit(face, added=False, indices=indices))
+
+    # @intent:operation with ブロック内の編集を1つの操作（label）として記録します。モデルの通知も1回に集約されます。ネスト可能です。
+    @contextmanager
+    def transaction(self, label: str):
+        if self._transaction_depth == 0:
+            self._open_step = _Step(label)
+        self._transaction_depth += 1
+        try:
+            with self._model.batch():
+                yield self
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                step, self._open_step = self._open_step, None
+                if step.records:
+                    self._push(step)
+
+    # --- 取り消し・やり直し ---
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    # @intent:operation 直前の操作を取り消します。記録を逆順に戻し、モデルの通知は1回に集約されます。
+    def undo(self) -> bool:
+        if not self._undo or self._transaction_depth > 0:
+            return False
+        step = self._undo.pop()
+        with self._model.batch():
+            for record in reversed(step.records):
+                record.undo(self._model)
+        self._redo.append(step)
+        # やり直し後の編集を取り消した操作にまとめないよう、まとめの対象から外す
+        step.coalesce_key = None
+        self._notify_observers()
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo or self._transaction_depth > 0:
+            return False
+        step = self._redo.pop()
+        with self._model.batch():
+            for record in step.records:
+                record.redo(self._model)
+        self._undo.append(step)
+        self._notify_observers()
+        return True
+
+    # @intent:operation 全ての履歴を破棄します。履歴を経由せずにモデルの内容を置き換えた場合に呼び出します。
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._memory_usage = 0
+        self._notify_observers()
+
+    # --- メモリ予算 ---
+
+    # @intent:operation 取り消し・やり直しの履歴が保持している記録の見積もりサイズ（バイト）。
+    @property
+    def memory_usage(self) -> int:
+        return self._memory_usage
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget_bytes
+
+    @budget_bytes.setter
+    def budget_bytes(self, value: int):
+        self._budget_bytes = value
+        self._enforce_budget()
+
+    @property
+    def undo_count(self) -> int:
+        return len(self._undo)
+
+    # --- 通知 ---
+
+    def add_observer(self, callback: Callable):
+        self._observers.append(callback)
+
+    def remove_observer(self, callback: Callable):
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def _notify_observers(self):
+        for callback in self._observers:
+            callback(self)
+
+    # --- 内部処理 ---
+
+    def _record(self, label: str, record, coalesce_key: Optional[Hashable] = None):
+        if self._open_step is not None:
+            self._open_step.add(record)
+            return
+        last = self._undo[-1] if self._undo else None
+        if coalesce_key is not None and last is not None and not self._redo and \
+                last.coalesce_key == coalesce_key and \
+                time.monotonic() - last.timestamp <= self.COALESCE_SECONDS:
+            before = last.nbytes
+            if last.merge([record]):
+                self._memory_usage += last.nbytes - before
+                self._enforce_budget()
+                self._notify_observers()
+                return
+        step = _Step(label, coalesce_key)
+        step.add(record)
+        self._push(step)
+
+    def _push(self, step: _Step):
+        for discarded in self._redo:
+            self._memory_usage -= discarded.nbytes
+        self._redo.clear()
+        self._undo.append(step)
+        self._memory_usage += step.nbytes
+        self._enforce_budget()
+        self._notify_observers()
+
+    # @intent:operation 見積もりサイズが予算を超えている間、最も古い操作から破棄します（やり直しの履歴を先に破棄する）。
+    def _enforce_budget(self):
+        while self._memory_usage > self._budget_bytes and self._redo:
+            self._memory_usage -= self._redo.pop(0).nbytes
+        while self._memory_usage > self._budget_bytes and self._undo:
+            self._memory_usage -= self._undo.popleft().nbytes
+
+    def _affected_indices(self, faces: Optional[List[Face]]) -> Optional[np.ndarray]:
+        if faces is None:
+            return None
+        if any(face.model is not self._model for face in faces):
+            raise ValueError("The Face does not belong to this model.")
+        rows = np.fromiter((face.row for face in faces), dtype=np.int64, count=len(faces))
+        return np.unique(self._model.face_indices[rows])
@@ -0,0 +1,72 @@
+import xml.etree.ElementTree as ET
+from array import array
+from typing import List
+import numpy as np
+from Core.data_model import Model
+from Core.topology import weld_coordinates
+
+# @intent:responsibility Exporter が出力した XML（ModelingData）を読み込み、Model を再構築するサービス。
+# @intent:role Exporter の逆変換。相対座標で出力されたファイルは基準点を加算して絶対座標に復元します（Coreは常に絶対座標のみを扱う）。
+# @intent:rationale 文書全体の木を構築せず iterparse で要素を逐次処理し、処理済みの要素をその場で破棄します。
+# 座標は float64 の配列に直接蓄積するため、ファイルサイズに比例する中間オブジェクト（要素・文字列）は残りません。
+# 面は最後に Model._load_arrays で一括構築し、通知は1回だけ発行します。
+class Importer:
+    def __init__(self, model: Model):
+        self._model = model
+
+    # @intent:operation XMLファイルを読み込み、モデルの内容を置き換えます。
+    # @intent:return 出力時のエクスポート設定 {"scope", "coordinate_mode", "reference_point"}。
+    # weld_vertices=True の場合、XML では失われる頂点の共有を同一座標の統合によって復元します。
+    def import_xml(self, filepath: str, weld_vertices: bool = False) -> dict:
+        settings = {"scope": None, "coordinate_mode": "absolute", "reference_point": None}
+        coordinates = array("d")
+        face_ids: List[str] = []
+        face_vertices = [None] * 4
+        container = None
+
+        context = ET.iterparse(filepath, events=("start", "end"))
+        _, root = next(context)
+        if root.tag != "ModelingData":
+            raise ValueError(f"Not a Relabs ModelingData file: {filepath}")
+
+        for event, elem in context:
+            if event == "start":
+                if elem.tag == "Face":
+                    face_vertices = [None] * 4
+                elif elem.tag == "Model":
+                    container = elem
+                continue
+
+            tag = elem.tag
+            if tag == "Vertex":
+                index = int(elem.get("index"))
+                if not 0 <= index < 4 or face_vertices[index] is not None:
+                    raise ValueError(f"Invalid vertex index {index} in a Face.")
+                face_vertices[index] = (float(elem.get("x")), float(elem.get("y")), float(elem.get("z")))
+            elif tag == "Face":
+                if any(v is None for v in face_vertices):
+                    raise ValueError(f"Face {elem.get('id')} does not have exactly 4 vertices.")
+                for xyz in face_vertices:
+                    coordinates.extend(xyz)
+                face_ids.append(elem.get("id"))
+                # 処理済みの面を親から切り離し、木が成長しないようにする
+                if container is not None:
+                    container.clear()
+            elif tag in ("Scope", "CoordinateMode"):
+                settings["scope" if tag == "Scope" else "coordinate_mode"] = elem.text or ""
+            elif tag == "ReferencePoint":
+                settings["reference_point"] = [float(elem.get(axis)) for axis in ("x", "y", "z")]
+
+        # 蓄積した配列のメモリをそのまま座標バッファとして使う（コピーしない）
+        coords = np.frombuffer(coordinates, dtype=np.float64).reshape(-1, 3)
+        if settings["coordinate_mode"] == "relative" and settings["reference_point"]:
+            coords += settings["reference_point"]
+        quads = np.arange(len(coords), dtype=np.int64).reshape(-1, 4)
+        if weld_vertices:
+            # Model.weld_vertices と同じ規則（最初に現れた頂点を代表とする）で、モデル構築前に配列上で統合する
+            representatives, inverse = weld_coordinates(coords)
+            coords = coords[representatives]
+            quads = inverse.reshape(-1, 4)
+
+        self._model._load_arrays(coords, quads, face_ids)
+        return settings
@@ -1,22 +1,92 @@
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Dict, Iterable, NamedTuple, Tuple
 from Core.data_model import Face
 
+# @intent:responsibility 選択状態の1回の変更（差分）。
+# added / removed は今回追加・解除された面のみを含み、primary は変更後の主選択（数値パネルで編集する面）です。
+class SelectionChange(NamedTuple):
+    added: Tuple[Face, ...]
+    removed: Tuple[Face, ...]
+    primary: Optional[Face]
+
 # @intent:responsibility アプリケーション内の「選択状態」を管理します。
 # @intent:role Mediator pattern. ViewportとControlPanelの間の同期を取ります。
+# @intent:rationale 選択は面の集合（挿入順を保つ dict）として保持し、所属の判定を O(1) で行います。
+# 通知は選択全体ではなく差分（SelectionChange）を配送するため、購読側は選択全体を走査し直す必要がありません。
 class SelectionManager:
     def __init__(self):
-        self._selected_face: Optional[Face] = None
+        # 選択中の面（値は使わない。挿入順 = 選択した順）
+        self._selected: Dict[Face, None] = {}
+        # 主選択。最後に選択に加えた面で、数値パネルの編集対象となる
+        self._primary: Optional[Face] = None
         self._observers: List[Callable] = []
 
+    # @intent:operation 主選択の面。選択がない場合は None。
     @property
     def selected_face(self) -> Optional[Face]:
-        return self._selected_face
+        return self._primary
+
+    # @intent:operation 選択中の全ての面（選択した順）。
+    @property
+    def selected_faces(self) -> List[Face]:
+        return list(self._selected)
+
+    @property
+    def count(self) -> int:
+        return len(self._selected)
+
+    def is_selected(self, face: Face) -> bool:
+        return face in self._selected
+
+    def __contains__(self, face: Face) -> bool:
+        return face in self._selected
 
-    # @intent:operation 面を選択します。Noneを渡すと選択解除になります。
+    def __len__(self) -> int:
+        return len(self._selected)
+
+    # @intent:operation 面を選択します（既存の選択は解除されます）。Noneを渡すと選択解除になります。
     def select_face(self, face: Optional[Face]):
-        if self._selected_face != face:
-            self._selected_face = face
-            self._notify_observers()
+        self.set_selection([face] if face is not None else [])
+
+    # @intent:operation 選択を faces に置き換えます。
+    def set_selection(self, faces: Iterable[Face], primary: Optional[Face] = None):
+        new = dict.fromkeys(faces)
+        removed = tuple(face for face in self._selected if face not in new)
+        added = tuple(face for face in new if face not in self._selected)
+        self._selected = new
+        self._update(added, removed, primary)
+
+    # @intent:operation 面を選択に加えます。primary を省略した場合は、新たに加えた最後の面が主選択となります。
+    def add_faces(self, faces: Iterable[Face], primary: Optional[Face] = None):
+        added = tuple(face for face in dict.fromkeys(faces) if face not in self._selected)
+        self._selected.update(dict.fromkeys(added))
+        self._update(added, (), primary if primary is not None else (added[-1] if added else None))
+
+    # @intent:operation 面を選択から外します。
+    def remove_faces(self, faces: Iterable[Face]):
+        removed = tuple(face for face in dict.fromkeys(faces) if face in self._selected)
+        for face in removed:
+            del self._selected[face]
+        self._update((), removed, None)
+
+    # @intent:operation 面の選択状態を反転します（Ctrl+クリック）。
+    def toggle_face(self, face: Face):
+        if face in self._selected:
+            self.remove_faces([face])
+        else:
+            self.add_faces([face])
+
+    def clear(self):
+        self.set_selection([])
+
+    # @intent:operation 主選択を決定し、選択または主選択が変化した場合のみ差分を通知します。
+    # 主選択が指定されない（または選択に含まれない）場合は、現在の主選択が残っていればそれを、なければ最後に選択した面を主選択とします。
+    def _update(self, added: Tuple[Face, ...], removed: Tuple[Face, ...], primary: Optional[Face]):
+        if primary is None or primary not in self._selected:
+            primary = self._primary if self._primary in self._selected else next(reversed(self._selected), None)
+        if not added and not removed and primary is self._primary:
+            return
+        self._primary = primary
+        self._notify_observers(SelectionChange(added, removed, primary))
 
     def add_observer(self, callback: Callable):
         self._observers.append(callback)
@@ -25,6 +95,6 @@ class SelectionManager:
         if callback in self._observers:
             self._observers.remove(callback)
 
-    def _notify_observers(self):
+    def _notify_observers(self, change: SelectionChange):
         for callback in self._observers:
-            callback(self._selected_face)
+            callback(change)
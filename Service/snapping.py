@@ -0,0 +1,95 @@
+from typing import Callable, Iterable, List, Optional, Tuple
+import numpy as np
+from Core.data_model import Model, Vertex
+from Core.geometry_utils import snap_to_grid
+from Core.spatial_hash import VertexHash
+
+# スナップの方式
+SNAP_OFF = "off"
+SNAP_GRID = "grid"
+SNAP_VERTEX = "vertex"
+SNAP_MODES = (SNAP_OFF, SNAP_GRID, SNAP_VERTEX)
+
+# @intent:responsibility 頂点編集時のスナップ（格子・既存の頂点への吸着）の設定と、座標の補正を担当します。
+# @intent:role Mediator pattern. ControlPanel（数値入力）と Viewport（ドラッグ）が同じ設定を共有します。
+# @intent:rationale `spacing` は格子スナップでは格子の間隔、頂点スナップでは吸着する距離として使います。
+# 頂点スナップの空間索引（`VertexHash`）は初めて頂点スナップを行う時点で作成し、スナップを使わない場合は索引の構築・更新のコストを負いません。
+class Snapper:
+    def __init__(self, model: Model, mode: str = SNAP_OFF, spacing: float = 0.5):
+        self._model = model
+        self._mode = SNAP_OFF
+        self._spacing = 0.5
+        self._index: Optional[VertexHash] = None
+        self._observers: List[Callable] = []
+        self.set_mode(mode)
+        self.set_spacing(spacing)
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def spacing(self) -> float:
+        return self._spacing
+
+    @property
+    def enabled(self) -> bool:
+        return self._mode != SNAP_OFF
+
+    def set_mode(self, mode: str):
+        if mode not in SNAP_MODES:
+            raise ValueError(f"Unknown snap mode: {mode}")
+        if mode != self._mode:
+            self._mode = mode
+            self._notify_observers()
+
+    def set_spacing(self, spacing: float):
+        if spacing <= 0.0:
+            raise ValueError("Snap spacing must be positive.")
+        if spacing != self._spacing:
+            self._spacing = float(spacing)
+            self._notify_observers()
+
+    # @intent:operation 頂点の空間索引（初回の参照時に作成）。
+    @property
+    def vertex_index(self) -> VertexHash:
+        if self._index is None:
+            self._index = VertexHash(self._model)
+        return self._index
+
+    # @intent:operation 座標を現在の方式で補正します。
+    # 頂点スナップでは spacing 以内で最も近い頂点の座標を返し、該当する頂点がなければ座標をそのまま返します。
+    # @intent:pre-condition exclude には編集中の頂点を指定する（自身への吸着を防ぐため）。
+    def snap(self, point, exclude: Iterable[Vertex] = ()) -> Tuple[float, float, float]:
+        if self._mode == SNAP_GRID:
+            return tuple(snap_to_grid(point, self._spacing).tolist())
+        if self._mode == SNAP_VERTEX:
+            target = self.nearest_vertex(point, exclude)
+            if target is not None:
+                return (target.x, target.y, target.z)
+        return tuple(float(value) for value in point)
+
+    # @intent:operation spacing 以内で point に最も近い頂点を返します。該当する頂点がなければ None。
+    def nearest_vertex(self, point, exclude: Iterable[Vertex] = ()) -> Optional[Vertex]:
+        count = self._model.vertex_count
+        skip = [vertex.index for vertex in exclude
+                if 0 <= vertex.index < count and self._model.vertex(vertex.index) is vertex]
+        indices, _ = self.vertex_index.nearest(np.asarray(point, dtype=np.float64), 1, self._spacing, skip)
+        return self._model.vertex(int(indices[0])) if len(indices) else None
+
+    # @intent:operation 空間索引を解放し、Model への登録を解除します。
+    def release(self):
+        if self._index is not None:
+            self._index.release()
+            self._index = None
+
+    def add_observer(self, callback: Callable):
+        self._observers.append(callback)
+
+    def remove_observer(self, callback: Callable):
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def _notify_observers(self):
+        for callback in self._observers:
+            callback(self)
@@ -0,0 +1,158 @@
+from typing import Optional, Sequence
+import numpy as np
+from OpenGL.GL import *
+from Core.data_model import Model
+
+# 面の角ごとに展開した座標バッファの、1面あたりのバイト数（4角 x float32 x 3）
+_FACE_STRIDE = 4 * 3 * 4
+
+# @intent:operation 面の行番号を 24bit の RGB 色に符号化します。0（背景色）と区別するため行番号 + 1 を符号化します。
+def encode_face_ids(face_count: int) -> np.ndarray:
+    ids = np.arange(1, face_count + 1, dtype=np.uint32)
+    return np.stack((ids & 0xFF, (ids >> 8) & 0xFF, (ids >> 16) & 0xFF), axis=-1).astype(np.uint8)
+
+# @intent:operation 読み取った RGB 色を面の行番号に復号します。背景の場合は -1。
+def decode_face_id(rgb: Sequence[int]) -> int:
+    return (int(rgb[0]) | (int(rgb[1]) << 8) | (int(rgb[2]) << 16)) - 1
+
+# @intent:responsibility 面ごとに固有の色（面ID）をオフスクリーンのフレームバッファに描画し、カーソル下の1ピクセルを読み取って面を特定する GPU ピッキング。
+# @intent:rationale 選択のコストを「シザーで1ピクセルに限定した1回の描画 + 1ピクセルの読み戻し」にし、モデルの規模に依存させないための方式。
+# 共有頂点には面ごとの色を割り当てられないため、面の角ごとに展開した（非インデックスの）頂点・色バッファを別途保持し、変更時のみ再転送します。
+# 座標のみの変更では、変更された頂点を参照する面の範囲だけを glBufferSubData で再転送します（ModelRenderer と同じ方式）。
+# @intent:warning 全てのメソッドは OpenGL コンテキストがカレントな状態で呼び出すこと。CPU によるレイキャストはヘッドレス環境・テスト用に併存させる。
+class ColorIdPicker:
+    def __init__(self, model: Model):
+        self._model = model
+        self._tracker = model.create_dirty_tracker()
+        self._available = False
+        self._framebuffer = None
+        self._color_buffer = None
+        self._depth_buffer = None
+        self._size = (0, 0)
+        self._position_buffer = None
+        self._id_color_buffer = None
+        self._vertex_count = 0
+
+    @property
+    def available(self) -> bool:
+        return self._available
+
+    # @intent:operation フレームバッファオブジェクトが利用可能か判定し、頂点バッファを作成します。
+    def initialize(self):
+        self._available = bool(glGenFramebuffers) and bool(glGenBuffers)
+        if self._available:
+            self._position_buffer, self._id_color_buffer = glGenBuffers(2)
+        self._tracker.mark_topology()
+
+    def release(self):
+        if self._available:
+            self._delete_framebuffer()
+            glDeleteBuffers(2, [self._position_buffer, self._id_color_buffer])
+            self._available = False
+        self._model.release_dirty_tracker(self._tracker)
+
+    # @intent:operation 物理ピクセル座標 (x, y)（OpenGL座標系、左下原点）にある面の行番号を返します。面がない場合は None。
+    # 行列とビューポートは paintGL でキャッシュしたものを渡します。
+    def pick(self, x: int, y: int, viewport, modelview, projection) -> Optional[int]:
+        width, height = int(viewport[2]), int(viewport[3])
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        self._sync_buffers()
+        if self._vertex_count == 0:
+            return None
+
+        previous_framebuffer = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        self._bind_framebuffer(width, height)
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+        try:
+            glViewport(0, 0, width, height)
+            glEnable(GL_SCISSOR_TEST)
+            glScissor(x, y, 1, 1)
+            glClearColor(0.0, 0.0, 0.0, 0.0)
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            glEnable(GL_DEPTH_TEST)
+            # CPU のレイキャストと同じく、面の向きに関係なく最も手前の面を選ぶ
+            glDisable(GL_CULL_FACE)
+            for cap in (GL_LIGHTING, GL_BLEND, GL_DITHER, GL_TEXTURE_2D):
+                glDisable(cap)
+            glShadeModel(GL_FLAT)
+
+            glMatrixMode(GL_PROJECTION)
+            glPushMatrix()
+            glLoadMatrixd(projection)
+            glMatrixMode(GL_MODELVIEW)
+            glPushMatrix()
+            glLoadMatrixd(modelview)
+
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_COLOR_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, self._position_buffer)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ARRAY_BUFFER, self._id_color_buffer)
+            glColorPointer(3, GL_UNSIGNED_BYTE, 0, None)
+            glDrawArrays(GL_QUADS, 0, self._vertex_count)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+
+            glPopMatrix()
+            glMatrixMode(GL_PROJECTION)
+            glPopMatrix()
+            glMatrixMode(GL_MODELVIEW)
+
+            glPixelStorei(GL_PACK_ALIGNMENT, 1)
+            pixel = np.frombuffer(glReadPixels(x, y, 1, 1, GL_RGB, GL_UNSIGNED_BYTE), dtype=np.uint8)
+        finally:
+            glPopAttrib()
+            glBindFramebuffer(GL_FRAMEBUFFER, int(previous_framebuffer))
+
+        row = decode_face_id(pixel[:3])
+        return row if 0 <= row < len(self._model.face_indices) else None
+
+    # @intent:operation 面の角ごとに展開した座標と面ID色を、モデルが変更されていた場合のみ再転送します。
+    # 位相の変更時は全体を、座標のみの変更時は変更範囲の頂点を参照する面の範囲 [first, last) だけを部分転送します。
+    def _sync_buffers(self):
+        topology_changed, lo, hi = self._tracker.take()
+        if topology_changed:
+            positions = np.ascontiguousarray(self._model.face_coordinates().reshape(-1, 3), dtype=np.float32)
+            colors = np.ascontiguousarray(np.repeat(encode_face_ids(len(self._model.face_indices)), 4, axis=0))
+            glBindBuffer(GL_ARRAY_BUFFER, self._position_buffer)
+            glBufferData(GL_ARRAY_BUFFER, positions.nbytes, positions if positions.nbytes else None, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, self._id_color_buffer)
+            glBufferData(GL_ARRAY_BUFFER, colors.nbytes, colors if colors.nbytes else None, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self._vertex_count = len(positions)
+        elif lo < hi:
+            offsets, adjacent = self._model.vertex_face_adjacency()
+            rows = adjacent[offsets[lo]:offsets[hi]]
+            if len(rows) == 0:
+                return
+            first, last = int(rows.min()), int(rows.max()) + 1
+            part = np.ascontiguousarray(
+                self._model.face_coordinates(np.arange(first, last)).reshape(-1, 3), dtype=np.float32)
+            glBindBuffer(GL_ARRAY_BUFFER, self._position_buffer)
+            glBufferSubData(GL_ARRAY_BUFFER, first * _FACE_STRIDE, part.nbytes, part)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _bind_framebuffer(self, width: int, height: int):
+        if self._size != (width, height):
+            self._delete_framebuffer()
+            self._framebuffer = glGenFramebuffers(1)
+            self._color_buffer, self._depth_buffer = glGenRenderbuffers(2)
+            glBindRenderbuffer(GL_RENDERBUFFER, self._color_buffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+            glBindRenderbuffer(GL_RENDERBUFFER, self._depth_buffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+            glBindRenderbuffer(GL_RENDERBUFFER, 0)
+            glBindFramebuffer(GL_FRAMEBUFFER, self._framebuffer)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self._color_buffer)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self._depth_buffer)
+            self._size = (width, height)
+        glBindFramebuffer(GL_FRAMEBUFFER, self._framebuffer)
+
+    def _delete_framebuffer(self):
+        if self._framebuffer is not None:
+            glDeleteFramebuffers(1, [self._framebuffer])
+            glDeleteRenderbuffers(2, [self._color_buffer, self._depth_buffer])
+            self._framebuffer = None
+            self._size = (0, 0)
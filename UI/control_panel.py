@@ -1,9 +1,12 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, 
                                QDoubleSpinBox, QFormLayout, QGroupBox, QHBoxLayout, QCheckBox, QSlider,
-                               QRadioButton, QButtonGroup, QStackedWidget)
+                               QRadioButton, QButtonGroup, QStackedWidget, QPushButton, QComboBox)
 from PySide6.QtCore import Qt, Signal
 from Core.data_model import Face
 from Core.geometry_utils import calculate_center
+from Core.transform import rotation, scaling, compose, about_pivot
+from Service.history import EditHistory
+from Service.snapping import Snapper, SNAP_OFF, SNAP_GRID, SNAP_VERTEX
 
 # @intent:responsibility 数値入力とプロパティ編集を担当するウィジェット。
 class ControlPanel(QWidget):
@@ -11,12 +14,22 @@ class ControlPanel(QWidget):
     grid_visibility_changed = Signal(bool)
     # @intent:notification ズームレベルの変更を通知するシグナル (値はカメラのZ位置)
     zoom_level_changed = Signal(float)
+    # @intent:notification ピッキング方式（GPU / CPU）の切り替えを通知するシグナル
+    gpu_picking_changed = Signal(bool)
+    # @intent:notification 視錐台カリング・詳細度（LOD）の切り替えを通知するシグナル
+    culling_changed = Signal(bool)
 
-    def __init__(self, model, selection_manager, parent=None):
+    def __init__(self, model, selection_manager, history=None, snapper=None, parent=None):
         super().__init__(parent)
         self._model = model
         self._selection_manager = selection_manager
         self._selection_manager.add_observer(self._on_selection_changed)
+        # モデルの編集は全て履歴を経由して行う（取り消し・やり直しのため）
+        self._history = history if history is not None else EditHistory(model)
+        # 表示の更新はモデルの変更集合で判断する（直接の編集・取り消し・やり直しのいずれも Model の通知を伴う）
+        self._model.add_observer(self._on_model_changed)
+        # スナップの設定（Viewport の頂点ドラッグと共有する）
+        self._snapper = snapper if snapper is not None else Snapper(model)
         
         self._current_face: Face = None
         self._spinboxes = [] # (vertex_index, axis_index, spinbox)
@@ -58,6 +71,17 @@ class ControlPanel(QWidget):
         self._check_grid = QCheckBox("Show Grid (Scale)")
         self._check_grid.toggled.connect(self.grid_visibility_changed.emit)
         view_layout.addWidget(self._check_grid)
+
+        # GPU Picking Checkbox
+        self._check_gpu_picking = QCheckBox("GPU Picking")
+        self._check_gpu_picking.toggled.connect(self.gpu_picking_changed.emit)
+        view_layout.addWidget(self._check_gpu_picking)
+
+        # Culling / LOD Checkbox
+        self._check_culling = QCheckBox("Frustum Culling / LOD")
+        self._check_culling.setChecked(True)
+        self._check_culling.toggled.connect(self.culling_changed.emit)
+        view_layout.addWidget(self._check_culling)
         
         # Zoom Slider
         zoom_layout = QHBoxLayout()
@@ -142,9 +166,57 @@ class ControlPanel(QWidget):
             obj_layout.addRow(label, spin)
             
         self._object_group.setLayout(obj_layout)
-        self._editor_stack.addWidget(self._object_group)
+
+        # 回転・拡大縮小（重心を中心とする変換。Apply で1回の変換として適用する）
+        self._transform_group = QGroupBox("Rotate / Scale (about Center)")
+        transform_layout = QVBoxLayout()
+
+        self._rotation_spinboxes = self._add_axis_row(transform_layout, "Rot°", axis_colors,
+                                                      -360.0, 360.0, 15.0, 0.0)
+        rotate_button = QPushButton("Rotate")
+        rotate_button.clicked.connect(self._on_rotate_clicked)
+        transform_layout.addWidget(rotate_button)
+
+        self._scale_spinboxes = self._add_axis_row(transform_layout, "Scale", axis_colors,
+                                                   0.01, 100.0, 0.1, 1.0)
+        scale_button = QPushButton("Scale")
+        scale_button.clicked.connect(self._on_scale_clicked)
+        transform_layout.addWidget(scale_button)
+
+        self._check_selection_only = QCheckBox("Selected faces only")
+        transform_layout.addWidget(self._check_selection_only)
+
+        self._transform_group.setLayout(transform_layout)
+
+        object_page = QWidget()
+        object_page_layout = QVBoxLayout(object_page)
+        object_page_layout.setContentsMargins(0, 0, 0, 0)
+        object_page_layout.addWidget(self._object_group)
+        object_page_layout.addWidget(self._transform_group)
+        self._editor_stack.addWidget(object_page)
         
         layout.addWidget(self._editor_stack)
+
+        # スナップ設定（Face Mode の数値入力と Viewport の頂点ドラッグに適用）
+        self._snap_group = QGroupBox("Snapping")
+        snap_layout = QFormLayout()
+        self._snap_combo = QComboBox()
+        for label, mode in (("Off", SNAP_OFF), ("Grid", SNAP_GRID), ("Vertex", SNAP_VERTEX)):
+            self._snap_combo.addItem(label, mode)
+        self._snap_combo.setCurrentIndex(self._snap_combo.findData(self._snapper.mode))
+        self._snap_combo.currentIndexChanged.connect(self._on_snap_mode_changed)
+        snap_layout.addRow("Mode:", self._snap_combo)
+        # 格子スナップでは格子の間隔、頂点スナップでは吸着する距離
+        self._snap_spacing = QDoubleSpinBox()
+        self._snap_spacing.setRange(0.01, 100.0)
+        self._snap_spacing.setSingleStep(0.1)
+        self._snap_spacing.setDecimals(2)
+        self._snap_spacing.setValue(self._snapper.spacing)
+        self._snap_spacing.valueChanged.connect(self._on_snap_spacing_changed)
+        snap_layout.addRow("Spacing:", self._snap_spacing)
+        self._snap_group.setLayout(snap_layout)
+        layout.addWidget(self._snap_group)
+        self._update_vertex_step()
         
         # 初期状態では無効化
         self._vertex_group.setEnabled(False)
@@ -152,6 +224,42 @@ class ControlPanel(QWidget):
         
         layout.addStretch()
 
+    # 軸ごとの数値入力（X / Y / Z）を1行に並べて追加し、スピンボックスの一覧を返します。
+    def _add_axis_row(self, layout, title, axis_colors, minimum, maximum, step, value):
+        row_layout = QHBoxLayout()
+        label = QLabel(title)
+        label.setStyleSheet("font-weight: bold;")
+        row_layout.addWidget(label)
+        spinboxes = []
+        for a_idx, axis in enumerate(['X', 'Y', 'Z']):
+            axis_label = QLabel(f"{axis}:")
+            axis_label.setStyleSheet(f"color: {axis_colors[a_idx]}; font-weight: bold;")
+            row_layout.addWidget(axis_label)
+            spin = QDoubleSpinBox()
+            spin.setRange(minimum, maximum)
+            spin.setSingleStep(step)
+            spin.setDecimals(2)
+            spin.setValue(value)
+            spin.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.NoButtons)
+            spinboxes.append(spin)
+            row_layout.addWidget(spin)
+        layout.addLayout(row_layout)
+        return spinboxes
+
+    def _on_snap_mode_changed(self, index):
+        self._snapper.set_mode(self._snap_combo.itemData(index))
+        self._update_vertex_step()
+
+    def _on_snap_spacing_changed(self, value):
+        self._snapper.set_spacing(value)
+        self._update_vertex_step()
+
+    # @intent:operation 格子スナップ中は、頂点のスピンボックスの増分を格子の間隔に合わせます（増分が間隔より小さいと丸めで元に戻るため）。
+    def _update_vertex_step(self):
+        step = self._snapper.spacing if self._snapper.mode == SNAP_GRID else 0.1
+        for spin in self._spinboxes:
+            spin.setSingleStep(step)
+
     # @intent:operation モード切り替え時のUI更新を行います。
     def _on_mode_changed(self):
         is_object_mode = self._radio_object.isChecked()
@@ -162,56 +270,54 @@ class ControlPanel(QWidget):
             self._header_label.setText("Whole Object")
         else:
             # Faceモードに戻ったら選択状態を復元表示
-            face = self._selection_manager.selected_face
-            if face:
-                self._header_label.setText(f"Face ID: {face.id[:8]}...")
-                self._vertex_group.setEnabled(True)
-                self._update_values_from_model()
-            else:
-                self._header_label.setText("No Selection")
-                self._vertex_group.setEnabled(False)
-
-    def _on_selection_changed(self, face):
-        # 古いFaceの監視解除
-        if self._current_face:
-            self._current_face.remove_observer(self._on_face_data_changed)
+            self._show_face_header(self._selection_manager.selected_face)
 
+    # @intent:operation 選択の差分を受け取り、主選択の面を編集対象にします。
+    def _on_selection_changed(self, change):
+        face = change.primary
         self._current_face = face
-        
-        # 新しいFaceの監視開始
-        if face:
-            face.add_observer(self._on_face_data_changed)
 
         # UI更新（モードによって振る舞いが違う）
         if self._radio_object.isChecked():
             self._update_object_values()
         else:
-            if face:
-                self._header_label.setText(f"Face ID: {face.id[:8]}...")
-                self._vertex_group.setEnabled(True)
-                self._update_values_from_model()
-            else:
-                self._header_label.setText("No Selection")
-                self._vertex_group.setEnabled(False)
-
-    def _on_face_data_changed(self, source):
-        # モデル側の変更をUIに反映
+            self._show_face_header(face)
+
+    # @intent:operation Face Mode のヘッダーと頂点編集欄を、主選択の面に合わせて更新します。複数選択時は選択数も表示します。
+    def _show_face_header(self, face):
+        if face:
+            count = self._selection_manager.count
+            suffix = f" (+{count - 1} more)" if count > 1 else ""
+            self._header_label.setText(f"Face ID: {face.id[:8]}...{suffix}")
+            self._vertex_group.setEnabled(True)
+            self._update_values_from_model()
+        else:
+            self._header_label.setText("No Selection")
+            self._vertex_group.setEnabled(False)
+
+    # @intent:operation モデルの変更をUIに反映します。
+    # @intent:rationale Face Mode では、編集中の面の頂点に関係しない変更（他の面の編集・追加・削除）で欄を更新しない。
+    # 面ごとに Observer を付け替える代わりに変更集合で判断するため、モデル全体の変換・取り消しも同じ経路で反映される。
+    def _on_model_changed(self, change):
         if self._radio_object.isChecked():
             self._update_object_values()
-        else:
+        elif self._current_face is not None and self._current_face.model is self._model \
+                and change.affects_face(self._current_face):
             self._update_values_from_model()
 
     # @intent:operation モデル全体の重心を計算し、UIに反映します。
     def _update_object_values(self):
-        if not self._model.faces:
+        if self._model.face_count == 0:
             self._object_group.setEnabled(False)
+            self._transform_group.setEnabled(False)
             return
             
         self._object_group.setEnabled(True)
+        self._transform_group.setEnabled(True)
         self._updating_ui = True
         try:
             # 重心計算 (Coreのロジックを使用)
-            cx, cy, cz = calculate_center(self._model.faces)
+            cx, cy, cz = self._model.center()
             
             for i, val in enumerate([cx, cy, cz]):
                 if self._obj_spinboxes[i].value() != val:
@@ -225,7 +331,7 @@ class ControlPanel(QWidget):
             return
 
         # 現在の重心を再計算（基準点）
-        current_center = calculate_center(self._model.faces)
+        current_center = self._model.center()
         current_val = current_center[axis_idx]
         
         # 差分移動量
@@ -236,8 +342,32 @@ class ControlPanel(QWidget):
         elif axis_idx == 1: dy = delta
         elif axis_idx == 2: dz = delta
         
-        # モデル一括更新 (Coreのメソッドを使用)
-        self._model.translate_all(dx, dy, dz)
+        # モデル一括更新。同じ軸のスピンボックスの連続した変更（ドラッグ・ホイール）は1つの操作として記録される
+        self._history.translate_all(dx, dy, dz, coalesce_key=("object_position", axis_idx))
+
+    # @intent:operation X -> Y -> Z の順の回転を、重心を中心として適用します。
+    def _on_rotate_clicked(self):
+        angles = [spin.value() for spin in self._rotation_spinboxes]
+        matrix = compose(*(rotation(axis, angle) for axis, angle in zip("xyz", angles) if angle != 0.0))
+        self._apply_about_center(matrix, "Rotate")
+        for spin in self._rotation_spinboxes:
+            spin.setValue(0.0)
+
+    # @intent:operation 軸ごとの拡大縮小を、重心を中心として適用します。
+    def _on_scale_clicked(self):
+        self._apply_about_center(scaling(*(spin.value() for spin in self._scale_spinboxes)), "Scale")
+        for spin in self._scale_spinboxes:
+            spin.setValue(1.0)
+
+    # @intent:operation 変換を対象（モデル全体、または選択中の全ての面）の重心を中心として1回のベクトル演算で適用します。
+    def _apply_about_center(self, matrix, label):
+        if self._check_selection_only.isChecked():
+            faces = [face for face in self._selection_manager.selected_faces if face.model is self._model]
+            if not faces:
+                return
+            self._history.apply_transform(about_pivot(matrix, calculate_center(faces)), faces, label)
+        else:
+            self._history.apply_transform(about_pivot(matrix, self._model.center()), label=label)
 
     # @intent:operation モデルのデータをUIに反映させます。
     # @intent:rationale 'spinBox.setValue' が 'valueChanged' シグナルを発火させるため、
@@ -269,8 +399,15 @@ class ControlPanel(QWidget):
             return
 
         # UIからの変更をモデルに反映
+        # @intent:rationale 1頂点の更新を Vertex.set による1回の書き込みとし、batch() で
+        # Vertex -> Face -> Model の連鎖通知を1回の再描画・パネル更新に集約します（EditHistory.set_vertex 内で行う）。
+        # 同じ頂点への連続した変更（スピンボックスのドラッグ・ホイール）は、取り消しの1ステップにまとめます。
         vertex = self._current_face.vertices[v_idx]
-        
-        if a_idx == 0: vertex.x = value
-        elif a_idx == 1: vertex.y = value
-        elif a_idx == 2: vertex.z = value
\ No newline at end of file
+        coords = [vertex.x, vertex.y, vertex.z]
+        coords[a_idx] = value
+        if self._snapper.enabled:
+            coords = self._snapper.snap(coords, exclude=[vertex])
+        self._history.set_vertex(vertex, *coords, coalesce_key=("vertex", vertex))
+        if self._snapper.enabled:
+            # 補正により入力値と座標が異なる場合（変化しない場合は通知が来ない）にも表示を座標に合わせる
+            self._update_values_from_model()
\ No newline at end of file
@@ -1,19 +1,34 @@
+import os
+from functools import partial
 from PySide6.QtWidgets import (QMainWindow, QSplitter, QMenuBar, QMenu, 
-                               QFileDialog, QMessageBox)
-from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+                               QFileDialog, QMessageBox, QProgressDialog)
+from PySide6.QtGui import QAction, QKeySequence
+from PySide6.QtCore import Qt, QTimer
 from UI.viewport import Viewport
 from UI.control_panel import ControlPanel
 from UI.export_dialog import ExportDialog
 from Service.exporter import Exporter
+from Service.binary_format import load_binary
+from Service.importer import Importer
+from Service.export_job import ExportJob
+from Service.history import EditHistory
+from Service.snapping import Snapper
 
 # @intent:responsibility アプリケーションのメインウィンドウ構造を定義します。
 # @intent:role コンポーネント（Viewport, ControlPanel）のコンテナであり、依存性注入のエントリーポイントとして機能します。
 class MainWindow(QMainWindow):
-    def __init__(self, model, selection_manager):
+    def __init__(self, model, selection_manager, history=None, snapper=None):
         super().__init__()
         self._model = model
         self._selection_manager = selection_manager
+        self._history = history if history is not None else EditHistory(model)
+        self._snapper = snapper if snapper is not None else Snapper(model)
+        # 実行中のバックグラウンドエクスポート（同時に1つまで）
+        self._export_job = None
+        self._export_progress = None
+        self._export_timer = QTimer(self)
+        self._export_timer.setInterval(100)
+        self._export_timer.timeout.connect(self._poll_export)
         
         self.setWindowTitle("Relabs 3D Modeler")
         self.resize(1024, 768)
@@ -24,16 +39,18 @@ class MainWindow(QMainWindow):
         splitter = QSplitter(Qt.Orientation.Horizontal)
         
         # 左：3Dビューポート
-        self.viewport = Viewport(model, selection_manager)
+        self.viewport = Viewport(model, selection_manager, self._history, self._snapper)
         splitter.addWidget(self.viewport)
         
         # 右：コントロールパネル
-        self.control_panel = ControlPanel(model, selection_manager)
+        self.control_panel = ControlPanel(model, selection_manager, self._history, self._snapper)
         splitter.addWidget(self.control_panel)
         
         # イベント接続
         self.control_panel.grid_visibility_changed.connect(self.viewport.set_grid_visible)
         self.control_panel.zoom_level_changed.connect(self.viewport.set_zoom)
+        self.control_panel.gpu_picking_changed.connect(self.viewport.set_gpu_picking)
+        self.control_panel.culling_changed.connect(self.viewport.set_culling)
 
         # 初期分割比率
         splitter.setStretchFactor(0, 3)
@@ -45,8 +62,12 @@ class MainWindow(QMainWindow):
     def _init_menu(self):
         menu_bar = self.menuBar()
         file_menu = menu_bar.addMenu("File")
+
+        open_action = QAction("Open...", self)
+        open_action.triggered.connect(self._open_model)
+        file_menu.addAction(open_action)
         
-        export_action = QAction("Export XML...", self)
+        export_action = QAction("Export...", self)
         export_action.triggered.connect(self._show_export_dialog)
         file_menu.addAction(export_action)
         
@@ -54,6 +75,28 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        edit_menu = menu_bar.addMenu("Edit")
+
+        self._undo_action = QAction("Undo", self)
+        self._undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self._undo_action.triggered.connect(self._history.undo)
+        edit_menu.addAction(self._undo_action)
+
+        self._redo_action = QAction("Redo", self)
+        self._redo_action.setShortcuts([QKeySequence.StandardKey.Redo, QKeySequence("Ctrl+Y")])
+        self._redo_action.triggered.connect(self._history.redo)
+        edit_menu.addAction(self._redo_action)
+
+        self._history.add_observer(self._on_history_changed)
+        self._on_history_changed(self._history)
+
+    # @intent:operation 履歴の状態に合わせて Undo / Redo の有効状態と表示名（取り消す操作の名前）を更新します。
+    def _on_history_changed(self, history):
+        self._undo_action.setEnabled(history.can_undo)
+        self._undo_action.setText(f"Undo {history.undo_label}" if history.can_undo else "Undo")
+        self._redo_action.setEnabled(history.can_redo)
+        self._redo_action.setText(f"Redo {history.redo_label}" if history.can_redo else "Redo")
+
     # @intent:operation エクスポートダイアログを表示し、ユーザー設定に基づいてファイル出力処理を調整します。
     def _show_export_dialog(self):
         dialog = ExportDialog(self)
@@ -61,16 +104,92 @@ class MainWindow(QMainWindow):
             scope, mode, ref_point = dialog.get_settings()
             
             # Selection Scopeのバリデーション
-            if scope == 'selection' and not self._selection_manager.selected_face:
+            if scope == 'selection' and not self._selection_manager.count:
                 QMessageBox.warning(self, "Export Error", "No face selected for export.")
                 return
 
-            filepath, _ = QFileDialog.getSaveFileName(self, "Save XML", "", "XML Files (*.xml)")
+            filepath, selected_filter = QFileDialog.getSaveFileName(
+                self, "Export", "", "XML Files (*.xml);;Relabs Binary (*.rlb)")
             if filepath:
+                # スナップショットは GUI スレッドで取得し、書き出しのみをワーカースレッドで行う
                 try:
-                    exporter = Exporter(self._model)
-                    exporter.export_xml(filepath, scope, mode, ref_point, 
-                                      self._selection_manager.selected_face)
-                    QMessageBox.information(self, "Success", "Export completed successfully.")
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Export failed: {str(e)}")
\ No newline at end of file
+                    snapshot = Exporter(self._model).snapshot(scope, mode, ref_point,
+                                                              self._selection_manager.selected_faces)
+                except ValueError as e:
+                    # 選択中の面がどれもモデルに残っていない場合は、空のファイルを書き出さない
+                    QMessageBox.warning(self, "Export Error", str(e))
+                    return
+                if selected_filter.startswith("Relabs"):
+                    write = Exporter.write_binary
+                elif snapshot.face_count >= Exporter.PARALLEL_MIN_FACES:
+                    # 大規模なモデルは XML の整形を全コアで並列に行う
+                    write = partial(Exporter.write_xml, processes=os.cpu_count() or 1)
+                else:
+                    write = Exporter.write_xml
+                self._start_export(write, snapshot, filepath)
+
+    # @intent:operation バックグラウンドでエクスポートを開始し、進捗ダイアログを表示します。
+    # @intent:rationale 書き出し中もビューポートの操作と編集を継続できるよう、進捗ダイアログはモーダルにしない。
+    # 進捗と結果はタイマーで定期的に問い合わせる（ワーカースレッドから Qt のオブジェクトには触れない）。
+    def _start_export(self, write, snapshot, filepath: str):
+        if self._export_job is not None:
+            QMessageBox.warning(self, "Export Error", "Another export is still running.")
+            return
+
+        progress = QProgressDialog("Exporting...", "Cancel", 0, max(1, snapshot.face_count), self)
+        progress.setWindowTitle("Export")
+        progress.setWindowModality(Qt.WindowModality.NonModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoReset(False)
+
+        job = ExportJob(write, snapshot, filepath)
+        progress.canceled.connect(job.cancel)
+        self._export_job = job
+        self._export_progress = progress
+        job.start()
+        self._export_timer.start()
+
+    def _poll_export(self):
+        job = self._export_job
+        self._export_progress.setValue(job.progress[0])
+        if job.is_running:
+            return
+
+        self._export_timer.stop()
+        self._export_progress.reset()
+        self._export_progress.deleteLater()
+        self._export_progress = None
+        self._export_job = None
+        if job.state == ExportJob.SUCCEEDED:
+            QMessageBox.information(self, "Success", "Export completed successfully.")
+        elif job.state == ExportJob.FAILED:
+            QMessageBox.critical(self, "Error", f"Export failed: {job.error}")
+
+    # @intent:operation 終了時に実行中のエクスポートを中止し、書きかけのファイルが残らないようにします。
+    def closeEvent(self, event):
+        if self._export_job is not None:
+            self._export_job.cancel()
+            self._export_job.wait()
+        super().closeEvent(event)
+
+    # @intent:operation モデルファイル（XML またはバイナリ形式）を開き、現在のモデルの内容を置き換えます。
+    def _open_model(self):
+        filepath, _ = QFileDialog.getOpenFileName(
+            self, "Open", "", "Model Files (*.xml *.rlb);;XML Files (*.xml);;Relabs Binary (*.rlb)")
+        if filepath:
+            try:
+                self.open_file(filepath)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Open failed: {str(e)}")
+
+    # @intent:operation 拡張子に応じた形式でモデルファイルを読み込みます。XML の場合は同一座標の頂点を共有頂点として復元します。
+    # 読み込みは履歴を経由せずにモデルの内容を置き換えるため、編集履歴は破棄します（失敗した場合も、モデルが途中まで置き換わり得るため破棄する）。
+    def open_file(self, filepath: str):
+        self._selection_manager.clear()
+        try:
+            if filepath.lower().endswith(".rlb"):
+                load_binary(filepath, self._model)
+            else:
+                Importer(self._model).import_xml(filepath, weld_vertices=True)
+        finally:
+            self._history.clear()
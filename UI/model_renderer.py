@@ -0,0 +1,224 @@
+from typing import Dict, Iterable, Optional
+import numpy as np
+from OpenGL.GL import *
+from Core.data_model import Model, Face
+from Core.visibility import VisibilityPlan
+
+# 頂点1つあたりのGPUバッファ上のバイト数 (float32 x 3)
+_VERTEX_STRIDE = 3 * 4
+
+# @intent:responsibility Model のジオメトリを GPU バッファ（VBO / IBO）に保持して描画する保持モード（Retained-mode）レンダラー。
+# @intent:rationale 即時モード（glBegin/glVertex3f）では毎フレーム全頂点を Python -> C の呼び出しで転送していた。
+# 座標は一度だけアップロードし、Model の DirtyTracker が示す変更範囲だけを glBufferSubData で再転送する。
+# 塗りつぶし・ワイヤーフレーム・選択ハイライトは同じバッファを参照する数回の glDrawElements で描画する。
+# 選択ハイライトは選択中の面のインデックスだけを持つ専用のインデックスバッファで描画し、選択または位相が変わった時のみ作り直す。
+# 描画計画（VisibilityPlan）が与えられた場合は、視錐台内の面だけのインデックスバッファ（塗りつぶし用・ワイヤーフレーム用）で描画し、
+# 遠方の葉は点で代用する。これらのバッファは計画が変わった時のみ作り直す。
+# @intent:warning 全てのメソッドは OpenGL コンテキストがカレントな状態（initializeGL / paintGL 内）で呼び出すこと。
+class ModelRenderer:
+    def __init__(self, model: Model, use_buffers: bool = True):
+        self._model = model
+        self._tracker = model.create_dirty_tracker()
+        self._prefer_buffers = use_buffers
+        self._use_buffers = False
+        self._vertex_buffer = None
+        self._index_buffer = None
+        self._index_count = 0
+        # 選択中の面（選択の差分で更新する）と、そのインデックスバッファ
+        self._selected: Dict[Face, None] = {}
+        self._selection_buffer = None
+        self._selection_index_count = 0
+        self._selection_dirty = True
+        # 描画計画と、計画に含まれる面のインデックスバッファ（塗りつぶし用・ワイヤーフレーム用）
+        self._visibility: Optional[VisibilityPlan] = None
+        self._visibility_dirty = False
+        self._fill_buffer = None
+        self._wire_buffer = None
+        self._fill_index_count = 0
+        self._wire_index_count = 0
+
+    # @intent:operation バッファオブジェクトを作成します。利用できない環境では即時モードにフォールバックします。
+    def initialize(self):
+        self._use_buffers = self._prefer_buffers and bool(glGenBuffers)
+        if self._use_buffers:
+            (self._vertex_buffer, self._index_buffer, self._selection_buffer,
+             self._fill_buffer, self._wire_buffer) = glGenBuffers(5)
+        self._tracker.mark_topology()
+        self._selection_dirty = True
+        self._visibility_dirty = self._visibility is not None
+
+    @property
+    def uses_buffers(self) -> bool:
+        return self._use_buffers
+
+    # @intent:operation GPUリソースを解放し、Model への登録を解除します。
+    def release(self):
+        if self._use_buffers:
+            glDeleteBuffers(5, [self._vertex_buffer, self._index_buffer, self._selection_buffer,
+                                self._fill_buffer, self._wire_buffer])
+            self._use_buffers = False
+        self._model.release_dirty_tracker(self._tracker)
+
+    # @intent:operation 選択の差分を反映します（SelectionManager の通知から呼び出す）。インデックスバッファは次の描画時に作り直します。
+    def update_selection(self, added: Iterable[Face], removed: Iterable[Face]):
+        for face in removed:
+            self._selected.pop(face, None)
+        self._selected.update(dict.fromkeys(added))
+        self._selection_dirty = True
+
+    # @intent:operation 選択中の面のうち、このモデルに属する面の行番号の配列。
+    def selected_rows(self) -> np.ndarray:
+        return np.fromiter((face.row for face in self._selected if face.model is self._model), dtype=np.int64)
+
+    # @intent:operation モデルを描画します。visibility を指定した場合はその計画に含まれる面のみを描画し、None の場合は全ての面を描画します。
+    # @intent:pre-condition visibility は現在の面の並び（行番号）に対して作成されたものであること。
+    def draw(self, visibility: Optional[VisibilityPlan] = None):
+        if visibility is not self._visibility:
+            self._visibility = visibility
+            self._visibility_dirty = visibility is not None
+
+        if not self._use_buffers:
+            self._draw_immediate()
+            return
+
+        self._sync_buffers()
+        if self._index_count == 0:
+            return
+
+        if visibility is not None:
+            fill_buffer, fill_count = self._fill_buffer, self._fill_index_count
+            wire_buffer, wire_count = self._wire_buffer, self._wire_index_count
+        else:
+            fill_buffer, fill_count = self._index_buffer, self._index_count
+            wire_buffer, wire_count = self._index_buffer, self._index_count
+
+        glBindBuffer(GL_ARRAY_BUFFER, self._vertex_buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+
+        # 選択されている面は赤色で先に描画する。同一頂点データは同一深度になるため、
+        # 後続の全面描画（グレー）は深度テストで弾かれ、選択色が残る。
+        if self._selection_index_count:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._selection_buffer)
+            glColor3f(1.0, 0.2, 0.2)
+            glDrawElements(GL_QUADS, self._selection_index_count, GL_UNSIGNED_INT, None)
+
+        glColor3f(0.8, 0.8, 0.8)
+        if fill_count:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, fill_buffer)
+            glDrawElements(GL_QUADS, fill_count, GL_UNSIGNED_INT, None)
+
+        # ワイヤーフレーム
+        if wire_count:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, wire_buffer)
+            glDisable(GL_CULL_FACE)
+            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+            glLineWidth(2.0)
+            glColor3f(0.0, 0.0, 0.0)
+            glDrawElements(GL_QUADS, wire_count, GL_UNSIGNED_INT, None)
+            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            glEnable(GL_CULL_FACE)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        # 遠方の葉の代用点（クライアント側の配列から描画する）
+        if visibility is not None and len(visibility.points):
+            self._draw_points(visibility.points)
+
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    # @intent:operation 詳細度を下げた葉を、面と同じ色の点として描画します。
+    def _draw_points(self, points: np.ndarray):
+        glColor3f(0.8, 0.8, 0.8)
+        glPointSize(2.0)
+        glVertexPointer(3, GL_DOUBLE, 0, np.ascontiguousarray(points, dtype=np.float64))
+        glDrawArrays(GL_POINTS, 0, len(points))
+
+    # @intent:operation 前回の同期以降の変更を GPU バッファへ反映します。
+    # 位相の変更時は全体を再転送し、座標のみの変更時は変更範囲だけを部分転送します。
+    def _sync_buffers(self):
+        topology_changed, lo, hi = self._tracker.take()
+        if topology_changed:
+            coords = np.ascontiguousarray(self._model.coordinates, dtype=np.float32)
+            quads = np.ascontiguousarray(self._model.face_indices, dtype=np.uint32)
+            glBindBuffer(GL_ARRAY_BUFFER, self._vertex_buffer)
+            glBufferData(GL_ARRAY_BUFFER, coords.nbytes, coords if coords.nbytes else None, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._index_buffer)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, quads.nbytes, quads if quads.nbytes else None, GL_STATIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self._index_count = quads.size
+            # 面の行番号と頂点インデックスが変わり得るため、選択・描画計画のインデックスバッファも作り直す
+            self._selection_dirty = True
+            self._visibility_dirty = self._visibility is not None
+        elif lo < hi:
+            part = np.ascontiguousarray(self._model.coordinates[lo:hi], dtype=np.float32)
+            glBindBuffer(GL_ARRAY_BUFFER, self._vertex_buffer)
+            glBufferSubData(GL_ARRAY_BUFFER, lo * _VERTEX_STRIDE, part.nbytes, part)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        if self._selection_dirty:
+            self._selection_dirty = False
+            self._selection_index_count = self._upload_rows(self._selection_buffer, self.selected_rows())
+
+        if self._visibility_dirty:
+            self._visibility_dirty = False
+            self._fill_index_count = self._upload_rows(self._fill_buffer, self._visibility.fill_rows)
+            self._wire_index_count = self._upload_rows(self._wire_buffer, self._visibility.wire_rows)
+
+    # @intent:operation 指定した面のインデックスをインデックスバッファへ転送し、インデックスの数を返します。
+    def _upload_rows(self, buffer, rows: np.ndarray) -> int:
+        quads = np.ascontiguousarray(self._model.face_indices[rows], dtype=np.uint32)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, quads.nbytes, quads if quads.nbytes else None, GL_STREAM_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        return quads.size
+
+    # @intent:operation バッファオブジェクトが利用できない環境向けの即時モード描画（従来の描画経路）。
+    def _draw_immediate(self):
+        visibility = self._visibility
+        if visibility is None:
+            rows = np.arange(self._model.face_count)
+            wire_coords = None
+        else:
+            rows = visibility.fill_rows
+            wire_coords = self._model.face_coordinates(visibility.wire_rows).tolist()
+        face_coords = self._model.face_coordinates(rows).tolist()
+        if wire_coords is None:
+            wire_coords = face_coords
+        selected_rows = set(self.selected_rows().tolist())
+
+        glBegin(GL_QUADS)
+        for row, corners in zip(rows.tolist(), face_coords):
+            # 選択されている面は赤色、それ以外はグレー
+            if row in selected_rows:
+                glColor3f(1.0, 0.2, 0.2)
+            else:
+                glColor3f(0.8, 0.8, 0.8)
+            for x, y, z in corners:
+                glVertex3f(x, y, z)
+        glEnd()
+
+        # ワイヤーフレーム
+        glDisable(GL_CULL_FACE)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+        glLineWidth(2.0)
+        glColor3f(0.0, 0.0, 0.0)
+
+        glBegin(GL_QUADS)
+        for corners in wire_coords:
+            for x, y, z in corners:
+                glVertex3f(x, y, z)
+        glEnd()
+
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        glEnable(GL_CULL_FACE)
+
+        if visibility is not None and len(visibility.points):
+            glColor3f(0.8, 0.8, 0.8)
+            glPointSize(2.0)
+            glBegin(GL_POINTS)
+            for x, y, z in visibility.points.tolist():
+                glVertex3f(x, y, z)
+            glEnd()
@@ -0,0 +1,205 @@
+import math
+from typing import Optional, Tuple
+from OpenGL.GL import *
+
+# グリッドの片側あたりの線の本数（間隔はズームに応じて変わるが、本数は一定に保つ）
+_GRID_LINES_PER_SIDE = 20
+
+# @intent:operation カメラ距離に応じたグリッドの (範囲, 間隔) を求めます。
+# @intent:rationale 間隔を10のべき乗に丸めることで、ズーム中にグリッドが連続的に揺れるのを防ぎ、
+# 表示リストの再構築を間隔が切り替わる時点だけに限定します。線の本数は一定のため、範囲を広げても描画コストは増えません。
+# 既定のズーム（距離10）では従来通り範囲20・間隔1になります。
+def adaptive_grid_parameters(camera_distance: float) -> Tuple[float, float]:
+    distance = max(abs(camera_distance), 0.5)
+    step = 10.0 ** math.floor(math.log10(distance / 5.0))
+    return _GRID_LINES_PER_SIDE * step, step
+
+# @intent:responsibility グリッド・座標軸インジケータ（ギズモ）などのオーバーレイを表示リストにキャッシュして描画します。
+# @intent:rationale オーバーレイの形状はグリッドの範囲・間隔が変わらない限り不変であるため、毎フレームの glVertex3f 呼び出しをやめ、
+# 一度コンパイルした表示リストを glCallList で再生します。ギズモの回転は表示リストの外で行列として適用します。
+# @intent:warning 全てのメソッドは OpenGL コンテキストがカレントな状態（paintGL 内）で呼び出すこと。
+class OverlayRenderer:
+    AXIS_LENGTH = 40.0
+    TIP_SIZE = 4.0
+
+    def __init__(self):
+        self._grid_list: Optional[int] = None
+        self._grid_key: Optional[Tuple[float, float]] = None
+        self._gizmo_list: Optional[int] = None
+
+    # @intent:operation 表示リストを解放します。
+    def release(self):
+        if self._grid_list is not None:
+            glDeleteLists(self._grid_list, 1)
+            self._grid_list = None
+            self._grid_key = None
+        if self._gizmo_list is not None:
+            glDeleteLists(self._gizmo_list, 1)
+            self._gizmo_list = None
+
+    # @intent:operation XZ平面にグリッドを描画し、空間スケールの把握を補助します。
+    def draw_grid(self, camera_distance: float):
+        key = adaptive_grid_parameters(camera_distance)
+        if key != self._grid_key:
+            if self._grid_list is None:
+                self._grid_list = glGenLists(1)
+            glNewList(self._grid_list, GL_COMPILE)
+            self._emit_grid(*key)
+            glEndList()
+            self._grid_key = key
+        glCallList(self._grid_list)
+
+    # @intent:operation 画面左下に、カメラの回転に追従する座標軸インジケータを描画します。
+    def draw_axes_indicator(self, width: int, height: int, rot_x: float, rot_y: float):
+        if self._gizmo_list is None:
+            self._gizmo_list = glGenLists(1)
+            glNewList(self._gizmo_list, GL_COMPILE)
+            self._emit_gizmo()
+            glEndList()
+
+        # 現在の投影行列等を保存
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+
+        # 2D描画用の正射影 (左下が0,0)
+        glOrtho(0, width, 0, height, -100, 100)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        # 左下 (60, 60) に配置
+        glTranslatef(60, 60, 0)
+
+        # メインカメラの回転を適用
+        glRotatef(rot_x, 1.0, 0.0, 0.0)
+        glRotatef(rot_y, 0.0, 1.0, 0.0)
+
+        glDisable(GL_DEPTH_TEST) # 重なりを気にせず描画
+        glCallList(self._gizmo_list)
+        glEnable(GL_DEPTH_TEST)
+
+        # 行列復帰
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    # @intent:operation 範囲選択中の領域（矩形・投げ縄）の輪郭を描画します。points は物理ピクセルのウィンドウ座標（左下が原点）。
+    # @intent:rationale 領域はドラッグ中に毎フレーム変わるため、表示リストにはキャッシュしない。
+    def draw_selection_region(self, width: int, height: int, points):
+        if len(points) < 2:
+            return
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, width, 0, height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        glDisable(GL_DEPTH_TEST)
+        glLineWidth(1.0)
+        glColor3f(1.0, 0.8, 0.2)
+        glBegin(GL_LINE_LOOP)
+        for x, y in points:
+            glVertex2f(x, y)
+        glEnd()
+        glEnable(GL_DEPTH_TEST)
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+    def _emit_grid(self, size: float, step: float):
+        glDisable(GL_LIGHTING)
+        glLineWidth(1.0)
+
+        glBegin(GL_LINES)
+
+        # 1. XZ平面 (Y=0) のグリッド (床)
+        glColor3f(0.5, 0.5, 0.5)
+        for n in range(-_GRID_LINES_PER_SIDE, _GRID_LINES_PER_SIDE + 1):
+            if n == 0: continue # 軸は別途描画するのでスキップ
+            i = n * step
+
+            # X軸に平行な線
+            glVertex3f(-size, 0, i)
+            glVertex3f(size, 0, i)
+
+            # Z軸に平行な線
+            glVertex3f(i, 0, -size)
+            glVertex3f(i, 0, size)
+
+        # 2. Y軸上の目盛り (X=0, Z=0 の位置に短い横棒)
+        glColor3f(0.7, 0.7, 0.7)
+        tick_size = 0.2 * step # 十字のサイズはグリッド間隔に比例させる
+        for n in range(-_GRID_LINES_PER_SIDE, _GRID_LINES_PER_SIDE + 1):
+            if n == 0: continue
+            y = n * step
+            # X方向の目盛り
+            glVertex3f(-tick_size, y, 0)
+            glVertex3f(tick_size, y, 0)
+            # Z方向の目盛り
+            glVertex3f(0, y, -tick_size)
+            glVertex3f(0, y, tick_size)
+
+        glEnd()
+
+        # メインの軸線 (少し濃く太く)
+        glLineWidth(2.0)
+        glBegin(GL_LINES)
+
+        # X軸 (赤みがかったグレー)
+        glColor3f(0.6, 0.4, 0.4)
+        glVertex3f(-size, 0, 0)
+        glVertex3f(size, 0, 0)
+
+        # Y軸 (緑みがかったグレー)
+        glColor3f(0.4, 0.6, 0.4)
+        glVertex3f(0, -size, 0)
+        glVertex3f(0, size, 0)
+
+        # Z軸 (青みがかったグレー)
+        glColor3f(0.4, 0.4, 0.6)
+        glVertex3f(0, 0, -size)
+        glVertex3f(0, 0, size)
+
+        glEnd()
+        glLineWidth(1.0)
+
+    def _emit_gizmo(self):
+        glLineWidth(2.0)
+        # X軸 (赤)
+        self._emit_axis((1, 0, 0), (1.0, 0.2, 0.2))
+        # Y軸 (緑)
+        self._emit_axis((0, 1, 0), (0.2, 1.0, 0.2))
+        # Z軸 (青)
+        self._emit_axis((0, 0, 1), (0.2, 0.2, 1.0))
+
+    # 軸とチップを出力する
+    def _emit_axis(self, vector, color):
+        axis_len = self.AXIS_LENGTH
+        glColor3fv(color)
+        # 軸の線
+        glBegin(GL_LINES)
+        glVertex3f(0, 0, 0)
+        glVertex3f(vector[0]*axis_len, vector[1]*axis_len, vector[2]*axis_len)
+        glEnd()
+
+        # 先端のボックス (ギズモっぽさ)
+        glPushMatrix()
+        glTranslatef(vector[0]*axis_len, vector[1]*axis_len, vector[2]*axis_len)
+        s = self.TIP_SIZE
+        glBegin(GL_QUADS)
+        # 小さな立方体を描画
+        glVertex3f(-s,-s, s); glVertex3f( s,-s, s); glVertex3f( s, s, s); glVertex3f(-s, s, s)
+        glVertex3f(-s,-s,-s); glVertex3f(-s, s,-s); glVertex3f( s, s,-s); glVertex3f( s,-s,-s)
+        glVertex3f(-s, s,-s); glVertex3f(-s, s, s); glVertex3f( s, s, s); glVertex3f( s, s,-s)
+        glVertex3f(-s,-s,-s); glVertex3f( s,-s,-s); glVertex3f( s,-s, s); glVertex3f(-s,-s, s)
+        glVertex3f( s,-s,-s); glVertex3f( s, s,-s); glVertex3f( s, s, s); glVertex3f( s,-s, s)
+        glVertex3f(-s,-s,-s); glVertex3f(-s,-s, s); glVertex3f(-s, s, s); glVertex3f(-s, s,-s)
+        glEnd()
+        glPopMatrix()
@@ -2,52 +2,132 @@ from PySide6.QtOpenGLWidgets import QOpenGLWidget
 from PySide6.QtCore import Qt, QPoint
 from OpenGL.GL import *
 from OpenGL.GLU import *
+import logging
+import numpy as np
 from Core.data_model import Face
-from Core.geometry_utils import ray_intersects_face
+from Core.bvh import FaceBVH
+from Core.geometry_utils import face_centroids, project_points, unproject_points, points_in_rect, points_in_polygon
+from Core.metrics import metrics
+from Core.visibility import plan_visibility
+from Service.history import EditHistory
+from Service.snapping import Snapper
+from UI.model_renderer import ModelRenderer
+from UI.overlay_renderer import OverlayRenderer
+from UI.color_id_picker import ColorIdPicker
+
+_logger = logging.getLogger(__name__)
+
+# 右ドラッグで頂点を掴む際の、カーソルと頂点の投影位置の最大距離（論理ピクセル）
+DRAG_PICK_PIXELS = 12.0
 
 # @intent:responsibility 3Dレンダリングとカメラ操作を担当します。
+# @intent:operation マウス操作: ドラッグでカメラ回転、クリックで面を選択（Ctrl+クリックで選択の反転）、
+# Shift+ドラッグで矩形選択、Alt+ドラッグで投げ縄選択（Ctrl を併用すると現在の選択に追加）、
+# 右ドラッグで主選択の面の角（カーソルに最も近い頂点）を移動（Snapper の設定に従って吸着）。
 class Viewport(QOpenGLWidget):
-    def __init__(self, model, selection_manager, parent=None):
+    def __init__(self, model, selection_manager, history=None, snapper=None, parent=None):
         super().__init__(parent)
         self._model = model
         self._model.add_observer(self._on_model_changed)
         
         self._selection_manager = selection_manager
         self._selection_manager.add_observer(self._on_selection_changed)
+        # 頂点のドラッグも履歴を経由して編集する
+        self._history = history if history is not None else EditHistory(model)
+        self._snapper = snapper if snapper is not None else Snapper(model)
         
         # カメラの状態
         self._cam_rot_x = 0.0
         self._cam_rot_y = 0.0
         self._last_mouse_pos = QPoint()
         self._press_pos = QPoint() # クリック判定用
+        # 範囲選択の状態（None / 'box' / 'lasso'）と、ドラッグの軌跡（物理ピクセルのウィンドウ座標）
+        self._region_mode = None
+        self._region_points = []
+        # ドラッグ中の頂点と、その深度（ウィンドウ座標の z）。ドラッグごとに履歴のまとめ単位を分ける
+        self._drag_vertex = None
+        self._drag_depth = 0.0
+        self._drag_count = 0
         self._zoom = -10.0
         
         # 表示設定
         self._show_grid = False
+        # ピッキング方式 (False: CPUレイキャスト / True: GPUの面IDバッファ)
+        self._gpu_picking = False
         
-        # レイキャスティング用のキャッシュ
+        # レイキャスティング用のキャッシュ（最初の paintGL で設定される）
         self._last_modelview = None
+        self._last_projection = None
+        self._last_viewport = None
+        # ピッキング用の加速構造（モデルの変更は問い合わせ時に取り込まれる）
+        self._bvh = FaceBVH(model)
+        # GPUピッキング（フレームバッファはGLコンテキスト生成後に作成）
+        self._picker = ColorIdPicker(model)
+
+        # 視錐台カリング・LOD の描画計画。カメラ・ビューポート・モデルのいずれかが変わった時のみ作り直す
+        self._culling = True
+        self._visibility = None
+        self._visibility_key = None
+        self._model_version = 0
+
+        # モデル描画（GPUバッファはGLコンテキスト生成後の initializeGL で作成）
+        self._renderer = ModelRenderer(model)
+        self._renderer.update_selection(selection_manager.selected_faces, ())
+        # グリッド・ギズモの表示リストキャッシュ
+        self._overlay = OverlayRenderer()
 
     # @intent:operation グリッド表示のON/OFFを切り替えます。
     def set_grid_visible(self, visible: bool):
         self._show_grid = visible
         self.update()
 
+    # @intent:operation ピッキング方式を切り替えます。GPUピッキングが利用できない環境では CPU のレイキャストが使われます。
+    def set_gpu_picking(self, enabled: bool):
+        self._gpu_picking = enabled
+
+    # @intent:operation 視錐台カリングと詳細度（LOD）の適用を切り替えます。無効の場合は全ての面を詳細に描画します。
+    def set_culling(self, enabled: bool):
+        self._culling = enabled
+        self.update()
+
     # @intent:operation 外部（スライダー等）からズームレベルを設定します。
     def set_zoom(self, value: float):
         self._zoom = value
         self.update()
 
-    def _on_model_changed(self, source):
+    # @intent:operation モデルの変更で再描画を要求します。GPUバッファへの転送範囲はレンダラーが DirtyTracker から取り出すため、ここでは扱いません。
+    def _on_model_changed(self, change):
+        if change.is_empty:
+            return
+        # 再描画の要求数（Qt により paintGL の実行回数へ集約される）
+        if metrics.enabled:
+            metrics.count("viewport.update_requests")
+        self._model_version += 1
         self.update()
 
-    def _on_selection_changed(self, selected_face):
+    # @intent:operation 選択の差分のみをレンダラーに反映します（選択全体の走査はしない）。
+    def _on_selection_changed(self, change):
+        self._renderer.update_selection(change.added, change.removed)
         self.update()
 
     def initializeGL(self):
         glClearColor(0.2, 0.2, 0.2, 1.0)
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_CULL_FACE)
+        self._renderer.initialize()
+        self._picker.initialize()
+
+        # @intent:rationale GPUリソースはコンテキストが有効なうちに解放する必要があるため、破棄直前のシグナルで解放します。
+        context = self.context()
+        if context is not None:
+            context.aboutToBeDestroyed.connect(self._release_gl_resources)
+
+    def _release_gl_resources(self):
+        self.makeCurrent()
+        self._renderer.release()
+        self._overlay.release()
+        self._picker.release()
+        self.doneCurrent()
 
     def resizeGL(self, w, h):
         glViewport(0, 0, w, h)
@@ -58,6 +138,10 @@ class Viewport(QOpenGLWidget):
         glMatrixMode(GL_MODELVIEW)
 
     def paintGL(self):
+        with metrics.span("viewport.paintGL", "ui"):
+            self._paint()
+
+    def _paint(self):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
         
@@ -73,174 +157,69 @@ class Viewport(QOpenGLWidget):
         self._last_projection = glGetDoublev(GL_PROJECTION_MATRIX)
         self._last_viewport = glGetIntegerv(GL_VIEWPORT)
         
-        selected_face = self._selection_manager.selected_face
-
         # グリッドの描画 (モデルより奥に描画したい場合はここで)
         if self._show_grid:
-            self._draw_grid()
-
-        # モデルの描画
-        glBegin(GL_QUADS)
-        for face in self._model.faces:
-            # 選択されている面は赤色、それ以外はグレー
-            if face == selected_face:
-                glColor3f(1.0, 0.2, 0.2)
-            else:
-                glColor3f(0.8, 0.8, 0.8)
-            
-            for v in face.vertices:
-                glVertex3f(v.x, v.y, v.z)
-        glEnd()
-        
-        # ワイヤーフレーム
-        glDisable(GL_CULL_FACE)
-        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-        glLineWidth(2.0)
-        glColor3f(0.0, 0.0, 0.0)
-        
-        glBegin(GL_QUADS)
-        for face in self._model.faces:
-            for v in face.vertices:
-                glVertex3f(v.x, v.y, v.z)
-        glEnd()
-        
-        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-        glEnable(GL_CULL_FACE)
+            self._overlay.draw_grid(self._zoom)
 
-        # 座標軸インジケータの描画 (Overdraw)
-        self._draw_axes_indicator()
-
-    # @intent:operation XZ平面にグリッドを描画し、空間スケールの把握を補助します。
-    def _draw_grid(self):
-        size = 20  # グリッドの範囲 (-20 ~ 20)
-        step = 1   # グリッドの間隔
-
-        glDisable(GL_LIGHTING)
-        glLineWidth(1.0)
-        
-        glBegin(GL_LINES)
-        
-        # 1. XZ平面 (Y=0) のグリッド (床)
-        glColor3f(0.5, 0.5, 0.5)
-        for i in range(-size, size + 1, step):
-            if i == 0: continue # 軸は別途描画するのでスキップ
-            
-            # X軸に平行な線
-            glVertex3f(-size, 0, i)
-            glVertex3f(size, 0, i)
-            
-            # Z軸に平行な線
-            glVertex3f(i, 0, -size)
-            glVertex3f(i, 0, size)
-
-        # 2. Y軸上の目盛り (X=0, Z=0 の位置に短い横棒)
-        # 床の交点から垂直に伸びる線は削除し、Y軸上の目盛りだけに絞る
-        glColor3f(0.7, 0.7, 0.7)
-        tick_size = 0.2 # 十字のサイズを小さく調整
-        for y in range(-size, size + 1, step):
-            if y == 0: continue
-            # X方向の目盛り
-            glVertex3f(-tick_size, y, 0)
-            glVertex3f(tick_size, y, 0)
-            # Z方向の目盛り
-            glVertex3f(0, y, -tick_size)
-            glVertex3f(0, y, tick_size)
-
-        glEnd()
-
-        # メインの軸線 (少し濃く太く)
-        glLineWidth(2.0)
-        glBegin(GL_LINES)
-        
-        # X軸 (赤みがかったグレー)
-        glColor3f(0.6, 0.4, 0.4)
-        glVertex3f(-size, 0, 0)
-        glVertex3f(size, 0, 0)
-        
-        # Y軸 (緑みがかったグレー)
-        glColor3f(0.4, 0.6, 0.4)
-        glVertex3f(0, -size, 0)
-        glVertex3f(0, size, 0)
-
-        # Z軸 (青みがかったグレー)
-        glColor3f(0.4, 0.4, 0.6)
-        glVertex3f(0, 0, -size)
-        glVertex3f(0, 0, size)
-        
-        glEnd()
-        glLineWidth(1.0)
+        # モデルの描画（選択のハイライトはレンダラーが保持する選択集合から描画する）
+        self._renderer.draw(self._current_visibility())
 
-    def _draw_axes_indicator(self):
-        # 現在の投影行列等を保存
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        
-        # 2D描画用の正射影 (左下が0,0)
-        w, h = self.width(), self.height()
-        glOrtho(0, w, 0, h, -100, 100)
-        
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        
-        # 左下 (60, 60) に配置
-        glTranslatef(60, 60, 0)
-        
-        # メインカメラの回転を適用
-        glRotatef(self._cam_rot_x, 1.0, 0.0, 0.0)
-        glRotatef(self._cam_rot_y, 0.0, 1.0, 0.0)
-        
-        axis_len = 40.0
-        tip_size = 4.0
-        
-        glDisable(GL_DEPTH_TEST) # 重なりを気にせず描画
-        glLineWidth(2.0)
-
-        # 軸とチップを描画するヘルパー
-        def draw_axis(vector, color):
-            glColor3fv(color)
-            # 軸の線
-            glBegin(GL_LINES)
-            glVertex3f(0, 0, 0)
-            glVertex3f(vector[0]*axis_len, vector[1]*axis_len, vector[2]*axis_len)
-            glEnd()
-            
-            # 先端のボックス (ギズモっぽさ)
-            glPushMatrix()
-            glTranslatef(vector[0]*axis_len, vector[1]*axis_len, vector[2]*axis_len)
-            s = tip_size
-            glBegin(GL_QUADS)
-            # 小さな立方体を描画
-            glVertex3f(-s,-s, s); glVertex3f( s,-s, s); glVertex3f( s, s, s); glVertex3f(-s, s, s)
-            glVertex3f(-s,-s,-s); glVertex3f(-s, s,-s); glVertex3f( s, s,-s); glVertex3f( s,-s,-s)
-            glVertex3f(-s, s,-s); glVertex3f(-s, s, s); glVertex3f( s, s, s); glVertex3f( s, s,-s)
-            glVertex3f(-s,-s,-s); glVertex3f( s,-s,-s); glVertex3f( s,-s, s); glVertex3f(-s,-s, s)
-            glVertex3f( s,-s,-s); glVertex3f( s, s,-s); glVertex3f( s, s, s); glVertex3f( s,-s, s)
-            glVertex3f(-s,-s,-s); glVertex3f(-s,-s, s); glVertex3f(-s, s, s); glVertex3f(-s, s,-s)
-            glEnd()
-            glPopMatrix()
-
-        # X軸 (赤)
-        draw_axis((1, 0, 0), (1.0, 0.2, 0.2))
-        # Y軸 (緑)
-        draw_axis((0, 1, 0), (0.2, 1.0, 0.2))
-        # Z軸 (青)
-        draw_axis((0, 0, 1), (0.2, 0.2, 1.0))
-        
-        glEnable(GL_DEPTH_TEST)
-        
-        # 行列復帰
-        glPopMatrix()
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
+        # 座標軸インジケータの描画 (Overdraw)
+        self._overlay.draw_axes_indicator(self.width(), self.height(),
+                                          self._cam_rot_x, self._cam_rot_y)
+
+        # 範囲選択中の領域
+        if self._region_mode is not None:
+            self._overlay.draw_selection_region(self._last_viewport[2], self._last_viewport[3],
+                                                self._region_outline())
+
+    # @intent:operation 現在のカメラに対する描画計画を返します。カメラ・ビューポート・モデルが前回から変わっていなければ再利用します。
+    # @intent:rationale 選択の変更などモデルの形状に関係しない再描画では、カリングとインデックスバッファの再転送を行わない。
+    def _current_visibility(self):
+        if not self._culling:
+            return None
+        key = (self._last_modelview.tobytes(), self._last_projection.tobytes(),
+               tuple(int(v) for v in self._last_viewport), self._model_version)
+        if key != self._visibility_key:
+            with metrics.span("viewport.cull", "ui", faces=self._model.face_count) as trace_args:
+                self._visibility = plan_visibility(self._bvh, self._last_modelview, self._last_projection,
+                                                   self._last_viewport)
+                if trace_args is not None:
+                    trace_args["visible"] = self._visibility.visible_faces
+                    trace_args["points"] = len(self._visibility.points)
+            self._visibility_key = key
+        return self._visibility
 
     def mousePressEvent(self, event):
         self._last_mouse_pos = event.position().toPoint()
         self._press_pos = event.position().toPoint()
 
+        modifiers = event.modifiers()
+        self._region_mode = None
+        self._drag_vertex = None
+        if event.button() == Qt.MouseButton.RightButton and self._last_modelview is not None:
+            self._grab_vertex(self._to_window(self._press_pos))
+        elif event.button() == Qt.MouseButton.LeftButton and self._last_modelview is not None:
+            if modifiers & Qt.KeyboardModifier.ShiftModifier:
+                self._region_mode = 'box'
+            elif modifiers & Qt.KeyboardModifier.AltModifier:
+                self._region_mode = 'lasso'
+        self._region_points = [self._to_window(self._press_pos)] if self._region_mode else []
+
     def mouseMoveEvent(self, event):
+        if self._drag_vertex is not None:
+            self._drag_vertex_to(self._to_window(event.position().toPoint()))
+            return
+
+        if self._region_mode is not None:
+            point = self._to_window(event.position().toPoint())
+            if self._region_mode == 'box':
+                self._region_points[1:] = [point]
+            else:
+                self._region_points.append(point)
+            self.update()
+            return
+
         dx = event.position().toPoint().x() - self._last_mouse_pos.x()
         dy = event.position().toPoint().y() - self._last_mouse_pos.y()
 
@@ -252,20 +231,94 @@ class Viewport(QOpenGLWidget):
         self._last_mouse_pos = event.position().toPoint()
 
     def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.RightButton:
+            self._drag_vertex = None
+            return
+
         # クリック判定（移動距離が小さい場合のみ）
         dist = (event.position().toPoint() - self._press_pos).manhattanLength()
-        if dist < 5:
-            self._perform_raycast(event.position().toPoint())
+        additive = bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        region_mode, self._region_mode = self._region_mode, None
+        if region_mode is not None and dist >= 5:
+            self._select_region(region_mode, self._region_points, additive)
+            self.update()
+        elif dist < 5:
+            self._perform_raycast(event.position().toPoint(), toggle=additive)
 
     def wheelEvent(self, event):
         delta = event.angleDelta().y()
         self._zoom += delta * 0.01
         self.update()
 
-    # @intent:operation クリック位置から3D空間へのレイを飛ばし、交差する面を特定します。
-    def _perform_raycast(self, pos):
+    # @intent:operation ウィジェットの論理座標を、物理ピクセルのウィンドウ座標（OpenGL と同じく左下が原点）に変換します。
+    def _to_window(self, pos):
+        ratio = self.devicePixelRatio()
+        height = self._last_viewport[3] if self._last_viewport is not None else self.height() * ratio
+        return (pos.x() * ratio, height - pos.y() * ratio)
+
+    # @intent:operation 描画用の領域の輪郭。矩形は2つの角から4頂点に展開します。
+    def _region_outline(self):
+        if self._region_mode == 'box' and len(self._region_points) == 2:
+            (x0, y0), (x1, y1) = self._region_points
+            return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+        return self._region_points
+
+    # @intent:operation 主選択の面の角のうち、ウィンドウ座標 point に最も近く投影される頂点をドラッグの対象にします。
+    # @intent:return 対象の頂点。主選択がない場合、またはカーソルから DRAG_PICK_PIXELS 以上離れている場合は None。
+    def _grab_vertex(self, point):
+        face = self._selection_manager.selected_face
+        if self._last_modelview is None or face is None or face.model is not self._model:
+            return None
+        window, visible = project_points([(v.x, v.y, v.z) for v in face.vertices], self._last_modelview,
+                                         self._last_projection, self._last_viewport)
+        distances = np.where(visible, np.hypot(window[:, 0] - point[0], window[:, 1] - point[1]), np.inf)
+        corner = int(np.argmin(distances))
+        if distances[corner] >= DRAG_PICK_PIXELS * self.devicePixelRatio():
+            return None
+        self._drag_vertex = face.vertices[corner]
+        self._drag_depth = float(window[corner, 2])
+        self._drag_count += 1
+        return self._drag_vertex
+
+    # @intent:operation ドラッグ中の頂点を、視線に垂直な平面（掴んだ時点の深度）上のカーソル位置へ移動します。
+    # 移動先は Snapper の設定（格子・既存の頂点）で補正し、1回のドラッグは取り消しの1ステップにまとめます。
+    def _drag_vertex_to(self, point):
+        vertex = self._drag_vertex
+        if vertex is None or self._last_modelview is None:
+            return
+        world = unproject_points([(point[0], point[1], self._drag_depth)], self._last_modelview,
+                                 self._last_projection, self._last_viewport)[0]
+        if not np.all(np.isfinite(world)):
+            return
+        target = self._snapper.snap(world, exclude=[vertex])
+        self._history.set_vertex(vertex, *target, coalesce_key=("vertex_drag", self._drag_count))
+
+    # @intent:operation 重心が領域（矩形・投げ縄）の内側に投影される面を選択します。additive の場合は現在の選択に追加します。
+    # @intent:rationale 全ての面の重心を1回のベクトル演算でスクリーン座標へ投影し、領域の内外判定も配列演算で行う（面ごとの Python ループを持たない）。
+    # 視点の背後・クリップ範囲外の重心は対象外とする。遮蔽（手前の面に隠れた面）は考慮しない。
+    def _select_region(self, mode, points, additive=False):
+        if self._last_modelview is None or len(points) < 2:
+            return
+        with metrics.span("viewport.select_region", "ui", mode=mode) as trace_args:
+            window, visible = project_points(face_centroids(self._model), self._last_modelview,
+                                             self._last_projection, self._last_viewport)
+            if mode == 'box':
+                inside = points_in_rect(window[:, :2], points[0], points[-1])
+            else:
+                inside = points_in_polygon(window[:, :2], np.array(points))
+            rows = np.flatnonzero(inside & visible)
+            if trace_args is not None:
+                trace_args["faces"] = len(rows)
+        selected = [self._model.face(row) for row in rows.tolist()]
+        if additive:
+            self._selection_manager.add_faces(selected)
+        else:
+            self._selection_manager.set_selection(selected)
+
+    # @intent:operation クリック位置から3D空間へのレイを飛ばし、交差する面を特定します。toggle の場合は面の選択状態を反転します。
+    def _perform_raycast(self, pos, toggle=False):
         if self._last_modelview is None:
-            print("Debug: ModelView matrix is not ready.")
+            metrics.instant("viewport.pick.not_ready", "ui")
             return
 
         # 高DPI対応: 論理ピクセルを物理ピクセルに変換
@@ -276,42 +329,58 @@ class Viewport(QOpenGLWidget):
         # OpenGLのY軸は下から上。ビューポートの高さも考慮して反転
         y = self._last_viewport[3] - (pos.y() * ratio)
 
-        print(f"Debug: Click at logical({pos.x()}, {pos.y()}) -> physical({x}, {y})")
+        # @intent:rationale クリック位置とピッキング結果はトレースのイベント引数として記録する（計測が無効の場合は何も出力しない）。
+        with metrics.span("viewport.pick", "ui", x=float(x), y=float(y), gpu=self._gpu_picking) as trace_args:
+            try:
+                hit_face = self._pick(x, y)
+            except Exception as e:
+                # 失敗はスパンの引数（計測が有効な場合）とログに記録し、選択は変更しない
+                if trace_args is not None:
+                    trace_args["error"] = f"{type(e).__name__}: {e}"
+                _logger.exception("Picking failed at (%.1f, %.1f)", x, y)
+                return
+            if trace_args is not None:
+                trace_args["face"] = hit_face.id if hit_face is not None else None
+        if toggle:
+            if hit_face is not None:
+                self._selection_manager.toggle_face(hit_face)
+        else:
+            self._selection_manager.select_face(hit_face)
 
+    # @intent:operation 物理ピクセル座標 (x, y) にある面を返します。面がない場合は None。
+    def _pick(self, x, y):
+        if self._gpu_picking and self._picker.available:
+            return self._pick_by_color(x, y)
+
+        # Near平面上の点
+        near_pt = gluUnProject(x, y, 0.0, 
+                             self._last_modelview, 
+                             self._last_projection, 
+                             self._last_viewport)
+        # Far平面上の点
+        far_pt = gluUnProject(x, y, 1.0, 
+                            self._last_modelview, 
+                            self._last_projection, 
+                            self._last_viewport)
+        
+        origin = near_pt
+        # 方向ベクトルの正規化
+        direction = (far_pt[0]-near_pt[0], far_pt[1]-near_pt[1], far_pt[2]-near_pt[2])
+        length = (direction[0]**2 + direction[1]**2 + direction[2]**2)**0.5
+        direction = (direction[0]/length, direction[1]/length, direction[2]/length)
+
+        # 最も近い交差面を探す (BVHにより面数に対して対数オーダー)
+        hit = self._bvh.intersect(origin, direction)
+        return self._model.face(hit[1]) if hit is not None else None
+
+    # @intent:operation 面IDを描画したオフスクリーンバッファから、物理ピクセル座標 (x, y) の面を読み取ります。
+    # @intent:rationale イベントハンドラ内ではコンテキストが保証されないため、makeCurrent で明示的にカレントにします。
+    def _pick_by_color(self, x, y):
+        self.makeCurrent()
         try:
-            # Near平面上の点
-            near_pt = gluUnProject(x, y, 0.0, 
-                                 self._last_modelview, 
-                                 self._last_projection, 
-                                 self._last_viewport)
-            # Far平面上の点
-            far_pt = gluUnProject(x, y, 1.0, 
-                                self._last_modelview, 
-                                self._last_projection, 
-                                self._last_viewport)
-            
-            origin = near_pt
-            # 方向ベクトルの正規化
-            direction = (far_pt[0]-near_pt[0], far_pt[1]-near_pt[1], far_pt[2]-near_pt[2])
-            length = (direction[0]**2 + direction[1]**2 + direction[2]**2)**0.5
-            direction = (direction[0]/length, direction[1]/length, direction[2]/length)
-
-            # 最も近い交差面を探す
-            min_dist = float('inf')
-            hit_face = None
-
-            for face in self._model.faces:
-                dist = ray_intersects_face(origin, direction, face)
-                if dist is not None and dist < min_dist:
-                    min_dist = dist
-                    hit_face = face
-
-            if hit_face:
-                print(f"Debug: Hit face {hit_face.id}")
-            else:
-                print("Debug: No face hit.")
+            row = self._picker.pick(int(x), int(y), self._last_viewport,
+                                    self._last_modelview, self._last_projection)
+        finally:
+            self.doneCurrent()
 
-            self._selection_manager.select_face(hit_face)
-            
-        except Exception as e:
-            print(f"Raycast error: {e}")
+        return self._model.face(row) if row is not None else None
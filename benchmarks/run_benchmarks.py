@@ -0,0 +1,415 @@
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.geometry_utils import (calculate_center, ray_intersects_face, face_centroids, project_points,
+                                 points_in_polygon)
+from Core.bvh import FaceBVH
+from Core.transform import rotation, about_pivot
+from Core.visibility import plan_visibility
+from Core.spatial_hash import VertexHash
+from Service.exporter import Exporter
+from Service.selection_manager import SelectionManager
+
+# @intent:responsibility Core / Service / ピッキングの処理時間を、表示環境なしで計測するベンチマークスイート。
+# @intent:role 結果を JSON に出力し、保存済みのベースラインと比較して性能の退行を検出します。
+# 実行方法: リポジトリのルートで `python -m benchmarks.run_benchmarks`（詳細は benchmarks/ARCHITECTURE_MANIFEST.md）。
+
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# 退行と判定する比率（ベースラインの最小時間に対する増加率）と、計測の揺らぎとして無視する絶対差（秒）
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR = 0.001
+# ピッキングで1回の計測あたりに投げるレイの本数
+RAYS_PER_PICK = 100
+# 頂点の近傍探索で1回の計測あたりに行う問い合わせの数
+QUERIES_PER_LOOKUP = 100
+# 面の削除で1回の計測あたりに1つずつ削除する面の数
+FACES_PER_REMOVAL = 100
+
+# --- 合成モデルの生成 ---
+
+# @intent:operation face_count 個の面からなる平面グリッド（隣接面で頂点を共有）の座標 (N, 3) とインデックス (F, 4) を生成します。
+# 面は z = 0 の平面上に並び、+z 方向から -z 方向へのレイで全面がピッキング可能です。
+def grid_arrays(face_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    columns = max(1, int(np.ceil(np.sqrt(face_count))))
+    rows = -(-face_count // columns)
+    xs, ys = np.meshgrid(np.arange(columns + 1, dtype=np.float64), np.arange(rows + 1, dtype=np.float64))
+    coordinates = np.column_stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)])
+    cells = np.arange(face_count)
+    lower_left = (cells // columns) * (columns + 1) + cells % columns
+    quads = np.column_stack([lower_left, lower_left + 1, lower_left + columns + 2, lower_left + columns + 1])
+    return coordinates, quads.astype(np.int64)
+
+# @intent:operation 合成グリッドを Model に一括で読み込みます（計測対象外の準備処理）。
+def grid_model(face_count: int) -> Model:
+    coordinates, quads = grid_arrays(face_count)
+    model = Model()
+    model._load_arrays(coordinates, quads, [f"face_{i}" for i in range(face_count)])
+    return model
+
+# @intent:operation 合成グリッドを Model に属さない Face の一覧として生成します（add_face の計測用）。
+def grid_faces(face_count: int) -> List[Face]:
+    coordinates, quads = grid_arrays(face_count)
+    vertices = [Vertex(*xyz) for xyz in coordinates.tolist()]
+    return [Face([vertices[i] for i in quad], f"face_{row}") for row, quad in enumerate(quads.tolist())]
+
+# グリッド上の点を真上から狙うレイ（origin, direction）の一覧
+def grid_rays(model: Model, count: int) -> List[Tuple[tuple, tuple]]:
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, model.face_count, count)
+    centers = model.face_coordinates(rows).mean(axis=1)
+    return [((x, y, 10.0), (0.0, 0.0, -1.0)) for x, y, _ in centers.tolist()]
+
+# --- ベンチマークの定義 ---
+# 各ベンチマークは setup(face_count) を受け取り、計測対象の処理を行う引数なしの関数を返します。
+# setup は計測ごとに呼び出されるため、モデルを変更する処理も毎回同じ初期状態から計測されます。
+
+def _bench_add_face(face_count: int) -> Callable[[], None]:
+    faces = grid_faces(face_count)
+    model = Model()
+    def run():
+        with model.batch():
+            for face in faces:
+                model.add_face(face)
+    return run
+
+# @intent:rationale 配列からの一括構築（要素は遅延生成）と、続く全ての面の生成を分けて計測する。
+def _bench_from_arrays(face_count: int) -> Callable[[], None]:
+    coordinates, quads = grid_arrays(face_count)
+    return lambda: Model.from_arrays(coordinates, quads)
+
+def _bench_materialize_faces(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    return lambda: model.faces
+
+def _bench_add_faces(face_count: int) -> Callable[[], None]:
+    faces = grid_faces(face_count)
+    model = Model()
+    return lambda: model.add_faces(faces)
+
+# @intent:rationale 無作為に選んだ面を1つずつ削除する（Undo や編集操作による削除と同じ経路）。
+def _bench_remove_face(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    rng = np.random.default_rng(0)
+    rows = rng.choice(face_count, min(FACES_PER_REMOVAL, face_count), replace=False)
+    faces = [model.face(row) for row in rows.tolist()]
+    def run():
+        for face in faces:
+            model.remove_face(face)
+    return run
+
+def _bench_remove_faces(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    faces = model.faces[::2]
+    return lambda: model.remove_faces(faces)
+
+def _bench_translate_all(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    return lambda: model.translate_all(1.0, -1.0, 0.5)
+
+def _bench_apply_transform(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    matrix = about_pivot(rotation((1.0, 1.0, 0.0), 30.0), model.center())
+    return lambda: model.apply_transform(matrix)
+
+def _bench_calculate_center(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    faces = model.faces
+    return lambda: calculate_center(faces)
+
+def _bench_model_center(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    return lambda: model.center()
+
+# @intent:rationale BVH 導入前の線形走査（viewport のピッキングループ）と同じ処理。1本のレイで全面を判定する。
+def _bench_pick_linear(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    (origin, direction), = grid_rays(model, 1)
+    faces = model.faces
+    def run():
+        closest = None
+        for face in faces:
+            t = ray_intersects_face(origin, direction, face)
+            if t is not None and (closest is None or t < closest):
+                closest = t
+    return run
+
+def _bench_bvh_build(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    # 構築は初回の問い合わせ時に行われる
+    return lambda: FaceBVH(model).intersect((0.5, 0.5, 10.0), (0.0, 0.0, -1.0))
+
+def _bench_bvh_pick(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    bvh = FaceBVH(model)
+    rays = grid_rays(model, RAYS_PER_PICK)
+    bvh.intersect(*rays[0])
+    def run():
+        for origin, direction in rays:
+            bvh.intersect(origin, direction)
+    return run
+
+# @intent:rationale 頂点スナップで行う近傍探索（k = 8）を、グリッド上のランダムな位置で QUERIES_PER_LOOKUP 回計測する。
+# 索引の構築は setup に含め、問い合わせのみを計測する。
+def _bench_vertex_nearest(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    index = VertexHash(model)
+    rng = np.random.default_rng(0)
+    points = model.coordinates[rng.integers(0, model.vertex_count, QUERIES_PER_LOOKUP)] \
+        + rng.uniform(-0.5, 0.5, size=(QUERIES_PER_LOOKUP, 3))
+    index.nearest(points[0], 8)
+    def run():
+        for point in points:
+            index.nearest(point, 8)
+    return run
+
+# @intent:rationale 投げ縄選択（重心の一括投影 -> 多角形の内外判定 -> 選択の置き換え）を、グリッド全体を写す正射影で計測する。
+# 投げ縄はビューポートに内接するひし形（32頂点）で、面のおよそ半分が選択される。
+def _bench_select_region(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    selection = SelectionManager()
+    upper = model.coordinates.max(axis=0)
+    viewport = (0, 0, 1000, 1000)
+    projection = np.identity(4)
+    projection[0, 0], projection[1, 1] = 2.0 / upper[0], 2.0 / upper[1]
+    projection[0:2, 3] = -1.0
+    # glGetDoublev と同じ列優先の配列として渡す
+    modelview, projection = np.identity(4), projection.T
+    angles = np.linspace(0.0, 2.0 * np.pi, 32, endpoint=False)
+    lasso = np.column_stack([500.0 + 500.0 * np.cos(angles), 500.0 + 500.0 * np.sin(angles)])
+    def run():
+        window, visible = project_points(face_centroids(model), modelview, projection, viewport)
+        rows = np.flatnonzero(points_in_polygon(window[:, :2], lasso) & visible)
+        selection.set_selection([model.face(row) for row in rows.tolist()])
+    return run
+
+# @intent:rationale 1フレーム分の描画計画（視錐台カリング・LOD）の作成を、グリッドの角の付近（約25x25面）を写すカメラで計測する。
+# 見えている面の数は一定のため、計測値が総面数に依存しないこと（描画コストが見えている部分の複雑さに比例すること）を確認できる。
+def _bench_visibility_plan(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    bvh = FaceBVH(model)
+    f = 1.0 / np.tan(np.radians(22.5))
+    near, far = 0.1, 100.0
+    projection = np.array([[f, 0, 0, 0], [0, f, 0, 0],
+                           [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)], [0, 0, -1, 0]])
+    modelview = np.identity(4)
+    modelview[:3, 3] = (-10.0, -10.0, -30.0)
+    # glGetDoublev と同じ列優先の配列として渡す
+    modelview, projection = modelview.T, projection.T
+    viewport = (0, 0, 1000, 1000)
+    plan_visibility(bvh, modelview, projection, viewport)
+    return lambda: plan_visibility(bvh, modelview, projection, viewport)
+
+# @intent:rationale 頂点の書き込みは Vertex -> Model -> Model の購読者へと伝播する（Face は Observer を持つ場合のみ経由する）。全頂点を1回ずつ書き換えて伝播のコストを計測する。
+def _observer_fan_out(face_count: int, batched: bool) -> Callable[[], None]:
+    model = grid_model(face_count)
+    received = []
+    # 同じコールバックの二重登録は無視されるため、購読者ごとに別の関数を登録する
+    for _ in range(4):
+        model.add_observer(lambda source: received.append(source))
+    vertices = [model.vertex(i) for i in range(model.vertex_count)]
+    def write_all():
+        for vertex in vertices:
+            vertex.x += 1.0
+    def run():
+        if batched:
+            with model.batch():
+                write_all()
+        else:
+            write_all()
+        received.clear()
+    return run
+
+# @intent:rationale UI の購読者の付け替え（選択の変更など）に相当する、全ての面への Observer の登録と解除を計測する。
+def _bench_observer_churn(face_count: int) -> Callable[[], None]:
+    model = grid_model(face_count)
+    faces = model.faces
+    def on_changed(source):
+        pass
+    def run():
+        for face in faces:
+            face.add_observer(on_changed)
+        for face in faces:
+            face.remove_observer(on_changed)
+    return run
+
+# 出力ファイルを置く作業ディレクトリ（プロセス終了時に削除）
+_scratch_directory: Optional[str] = None
+
+def _scratch_path(name: str) -> str:
+    global _scratch_directory
+    if _scratch_directory is None:
+        _scratch_directory = tempfile.mkdtemp(prefix="relabs_bench_")
+        atexit.register(shutil.rmtree, _scratch_directory, True)
+    return os.path.join(_scratch_directory, name)
+
+def _bench_export_xml(scope: str, mode: str) -> Callable[[int], Callable[[], None]]:
+    def setup(face_count: int) -> Callable[[], None]:
+        model = grid_model(face_count)
+        reference = Vertex(0.5, -2.0, 1.0) if mode == 'relative' else None
+        selected = [model.face(face_count // 2)] if scope == 'selection' else None
+        filepath = _scratch_path("model.xml")
+        # 前回の出力の削除（置き換え時の unlink）が計測に入らないよう、準備の段階で消しておく
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return lambda: Exporter(model).export_xml(filepath, scope, mode, reference, selected)
+    return setup
+
+# 名前 -> setup。名前の先頭は計測対象の層（core / picking / observer / service）
+BENCHMARKS: Dict[str, Callable[[int], Callable[[], None]]] = {
+    "core.add_face": _bench_add_face,
+    "core.add_faces": _bench_add_faces,
+    "core.from_arrays": _bench_from_arrays,
+    "core.materialize_faces": _bench_materialize_faces,
+    "core.remove_face": _bench_remove_face,
+    "core.remove_faces": _bench_remove_faces,
+    "core.translate_all": _bench_translate_all,
+    "core.apply_transform": _bench_apply_transform,
+    "core.calculate_center": _bench_calculate_center,
+    "core.visibility_plan": _bench_visibility_plan,
+    "core.model_center": _bench_model_center,
+    "picking.ray_intersects_face_loop": _bench_pick_linear,
+    "picking.bvh_build": _bench_bvh_build,
+    "picking.bvh_intersect": _bench_bvh_pick,
+    "picking.select_region": _bench_select_region,
+    "picking.vertex_nearest": _bench_vertex_nearest,
+    "observer.vertex_writes": lambda n: _observer_fan_out(n, batched=False),
+    "observer.vertex_writes_batched": lambda n: _observer_fan_out(n, batched=True),
+    "observer.churn": _bench_observer_churn,
+    "service.export_xml.all.absolute": _bench_export_xml('all', 'absolute'),
+    "service.export_xml.all.relative": _bench_export_xml('all', 'relative'),
+    "service.export_xml.selection.absolute": _bench_export_xml('selection', 'absolute'),
+    "service.export_xml.selection.relative": _bench_export_xml('selection', 'relative'),
+}
+
+# --- 計測と比較 ---
+
+# @intent:operation 1つのベンチマークを repeat 回計測し、最小・中央値（秒）を返します。準備処理は計測に含めません。
+# @intent:rationale timeit と同様に計測中は GC を止める。準備処理で生成した大量のオブジェクトに対する
+# 世代別 GC の走査が、たまたま計測区間に入って結果が大きく揺らぐのを防ぐため。
+def measure(setup: Callable[[int], Callable[[], None]], face_count: int, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        run = setup(face_count)
+        gc.collect()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return {"min": min(timings), "median": statistics.median(timings), "repeat": repeat}
+
+# @intent:operation 選択したベンチマークを全サイズで実行し、JSON に書き出せる結果の辞書を返します。
+# results の構造は {ベンチマーク名: {面数（文字列）: {"min", "median", "repeat"}}}。
+def run_suite(sizes, repeat: int = 3, names: Optional[List[str]] = None,
+              log: Optional[Callable[[str], None]] = None) -> dict:
+    results: Dict[str, Dict[str, dict]] = {}
+    for name in names if names is not None else BENCHMARKS:
+        setup = BENCHMARKS[name]
+        results[name] = {}
+        for face_count in sizes:
+            results[name][str(face_count)] = measure(setup, face_count, repeat)
+            if log is not None:
+                log(f"{name:40s} {face_count:>9d} faces  {results[name][str(face_count)]['min']:.6f} s")
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+# @intent:operation 結果をベースラインと比較し、計測した (名前, 面数) ごとの比較結果を返します。
+# ベースラインに記録がない組は `missing` を True とし、baseline / ratio を None として返します（退行とはしない）。
+# @intent:rationale 最小時間の比率が 1 + threshold を超え、かつ差が NOISE_FLOOR 秒を超えた場合のみ退行とする（小さな計測での揺らぎを除く）。
+# 記録のない組を黙って読み飛ばすと、ベースラインの更新漏れで退行検査の対象から外れたことに気付けないため、結果に含めて報告する。
+def compare_results(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    comparisons = []
+    for name, by_size in current["results"].items():
+        for size, timing in by_size.items():
+            reference = baseline.get("results", {}).get(name, {}).get(size)
+            if reference is None:
+                comparisons.append({"name": name, "faces": int(size), "baseline": None, "current": timing["min"],
+                                    "ratio": None, "regressed": False, "missing": True})
+                continue
+            ratio = timing["min"] / reference["min"] if reference["min"] > 0 else float("inf")
+            regressed = ratio > 1.0 + threshold and timing["min"] - reference["min"] > NOISE_FLOOR
+            comparisons.append({"name": name, "faces": int(size), "baseline": reference["min"],
+                                "current": timing["min"], "ratio": ratio, "regressed": regressed, "missing": False})
+    return comparisons
+
+def _parse_sizes(text: str) -> List[int]:
+    return [int(float(token)) for token in text.split(",") if token.strip()]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Relabs headless performance benchmarks")
+    parser.add_argument("--sizes", type=_parse_sizes, default=list(DEFAULT_SIZES),
+                        help="comma separated face counts (default: 100,1000,10000,100000,1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per benchmark and size (minimum is reported)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name starts with this prefix")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown ratio before a result counts as a regression (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if name.startswith(args.filter)]
+    if not names:
+        parser.error(f"no benchmark matches '{args.filter}'")
+    current = run_suite(args.sizes, args.repeat, names, log=print)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; skipping comparison.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    comparisons = compare_results(current, baseline, args.threshold)
+    print()
+    for c in comparisons:
+        if c["missing"]:
+            print(f"{c['name']:40s} {c['faces']:>9d} faces  {'-':>8s} -> {c['current']:.6f} s        NO BASELINE")
+            continue
+        marker = "REGRESSION" if c["regressed"] else ""
+        print(f"{c['name']:40s} {c['faces']:>9d} faces  {c['baseline']:.6f} -> {c['current']:.6f} s  x{c['ratio']:.2f} {marker}")
+    regressions = [c for c in comparisons if c["regressed"]]
+    missing = [c for c in comparisons if c["missing"]]
+    print(f"\n{len(regressions)} regression(s) in {len(comparisons) - len(missing)} comparison(s) against {args.baseline}")
+    if missing:
+        print(f"{len(missing)} result(s) without a baseline entry; run with --update-baseline to record them.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,54 +1,61 @@
+import os
 import sys
 from PySide6.QtWidgets import QApplication
 from UI.main_window import MainWindow
-from Core.data_model import Model, Face, Vertex
+from Core.data_model import Model
 from Service.selection_manager import SelectionManager
+from Service.history import EditHistory
+from Service.snapping import Snapper
+from Core.metrics import metrics
 
 def main():
     app = QApplication(sys.argv)
+
+    # 環境変数 RELABS_TRACE にファイルパスが指定された場合は計測を有効にし、終了時に Chrome トレース形式で書き出す
+    trace_path = os.environ.get("RELABS_TRACE")
+    if trace_path:
+        metrics.enable()
+        app.aboutToQuit.connect(lambda: metrics.dump_chrome_trace(trace_path))
     
-    # 唯一のモデルインスタンスを生成
-    model = Model()
+    # 唯一のモデルインスタンスを生成（ファイルが指定されない場合は初期データの立方体）
+    model = Model() if len(sys.argv) > 1 else initial_cube()
     
     # 選択状態管理マネージャの生成
     selection_manager = SelectionManager()
+
+    # 編集履歴（取り消し・やり直し）の生成
+    history = EditHistory(model)
+
+    # スナップ設定（ControlPanel と Viewport で共有）の生成
+    snapper = Snapper(model)
     
-    # 初期データの投入: 原点に1つの立方体の面を追加 (テスト用)
-    # @intent:rationale 現状のプロトタイプでは、頂点インスタンスは面ごとに独立して生成されており、共有されていない。
-    # これは最もシンプルな実装だが、トポロジー情報（どの頂点がどの面と隣接しているか）が失われる。
-    # このため、頂点単位でのスムーズな変形（例：1つの角を動かすと隣接する面が追従する）はできない。
-    # この制約を回避しオブジェクト全体を操作するため、UI側に「Object Mode」が導入された。
-    # 将来的な機能拡張（頂点編集など）の際には、頂点共有（Vertex Pool）の導入を検討する必要がある。
-    # 前面
-    model.add_face(Face([
-        Vertex(-1, -1, 1), Vertex(1, -1, 1), Vertex(1, 1, 1), Vertex(-1, 1, 1)
-    ], "front"))
-    # 背面
-    model.add_face(Face([
-        Vertex(1, -1, -1), Vertex(-1, -1, -1), Vertex(-1, 1, -1), Vertex(1, 1, -1)
-    ], "back"))
-    # 上面
-    model.add_face(Face([
-        Vertex(-1, 1, 1), Vertex(1, 1, 1), Vertex(1, 1, -1), Vertex(-1, 1, -1)
-    ], "top"))
-    # 下面
-    model.add_face(Face([
-        Vertex(-1, -1, -1), Vertex(1, -1, -1), Vertex(1, -1, 1), Vertex(-1, -1, 1)
-    ], "bottom"))
-    # 右面
-    model.add_face(Face([
-        Vertex(1, -1, 1), Vertex(1, -1, -1), Vertex(1, 1, -1), Vertex(1, 1, 1)
-    ], "right"))
-    # 左面
-    model.add_face(Face([
-        Vertex(-1, -1, -1), Vertex(-1, -1, 1), Vertex(-1, 1, 1), Vertex(-1, 1, -1)
-    ], "left"))
-    
-    # メインウィンドウの作成と表示
-    window = MainWindow(model, selection_manager)
+    # メインウィンドウの作成
+    window = MainWindow(model, selection_manager, history, snapper)
+
+    # コマンドライン引数でファイルが指定された場合はそれを読み込む
+    if len(sys.argv) > 1:
+        window.open_file(sys.argv[1])
+
     window.show()
     
     sys.exit(app.exec())
 
+# 初期データ: 原点に1つの立方体 (テスト用)
+def initial_cube() -> Model:
+    # @intent:rationale 頂点は面の間で共有する（Vertex Pool）。立方体は24頂点ではなく8頂点で構成され、
+    # 1つの角を動かすと、その角を共有する全ての面が同じ1回の書き込みで追従する。
+    # 隣接する面は `Model.faces_of_vertex` で取得できる。
+    corners = [(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+    faces = {
+        "front": ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)),
+        "back": ((1, -1, -1), (-1, -1, -1), (-1, 1, -1), (1, 1, -1)),
+        "top": ((-1, 1, 1), (1, 1, 1), (1, 1, -1), (-1, 1, -1)),
+        "bottom": ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)),
+        "right": ((1, -1, 1), (1, -1, -1), (1, 1, -1), (1, 1, 1)),
+        "left": ((-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1)),
+    }
+    quads = [[corners.index(p) for p in points] for points in faces.values()]
+    return Model.from_arrays(corners, quads, faces.keys())
+
 if __name__ == "__main__":
     main()
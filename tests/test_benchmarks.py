@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from benchmarks.run_benchmarks import BENCHMARKS, grid_arrays, grid_model, run_suite, compare_results
+
+class TestBenchmarks(unittest.TestCase):
+    def test_grid_shares_vertices(self):
+        """合成グリッドが指定数の面を持ち、隣接面で頂点を共有しているか"""
+        coordinates, quads = grid_arrays(10)
+        self.assertEqual(quads.shape, (10, 4))
+        self.assertEqual(len(coordinates), 5 * 4)
+        self.assertEqual(quads[0, 1], quads[1, 0])
+        model = grid_model(10)
+        np.testing.assert_array_equal(model.face_indices, quads)
+
+    def test_suite_runs_every_benchmark(self):
+        """全てのベンチマークが小さなモデルで実行でき、結果が面数ごとに記録されるか"""
+        current = run_suite([4, 9], repeat=1)
+        self.assertEqual(set(current["results"]), set(BENCHMARKS))
+        for by_size in current["results"].values():
+            self.assertEqual(set(by_size), {"4", "9"})
+            self.assertGreaterEqual(by_size["9"]["min"], 0.0)
+
+    def test_compare_flags_regressions_above_threshold_and_noise_floor(self):
+        def result(**timings):
+            return {"results": {name: {"1000": {"min": t, "median": t, "repeat": 1}} for name, t in timings.items()}}
+        baseline = result(slow=0.10, fast=0.10, tiny=0.0001, removed=1.0)
+        current = result(slow=0.20, fast=0.11, tiny=0.0005, added=1.0)
+
+        comparisons = {c["name"]: c for c in compare_results(current, baseline, threshold=0.25)}
+        self.assertEqual(set(comparisons), {"slow", "fast", "tiny", "added"})
+        self.assertTrue(comparisons["slow"]["regressed"])
+        self.assertAlmostEqual(comparisons["slow"]["ratio"], 2.0)
+        self.assertFalse(comparisons["fast"]["regressed"])
+        # 比率は大きいが差が計測の揺らぎの範囲内
+        self.assertFalse(comparisons["tiny"]["regressed"])
+        # ベースラインに記録のない計測は、退行ではなく記録なしとして報告される
+        self.assertTrue(comparisons["added"]["missing"])
+        self.assertFalse(comparisons["added"]["regressed"])
+        self.assertIsNone(comparisons["added"]["baseline"])
+        self.assertFalse(comparisons["slow"]["missing"])
+
+if __name__ == '__main__':
+    unittest.main()
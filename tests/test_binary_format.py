@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Service.exporter import Exporter
+from Service.binary_format import read_binary, load_binary
+
+class TestBinaryFormat(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        # 頂点を共有する 3x2 のグリッド
+        grid = [[Vertex(i, j, 0.5 * i * j) for j in range(3)] for i in range(4)]
+        for i in range(3):
+            for j in range(2):
+                self.model.add_face(Face([grid[i][j], grid[i + 1][j], grid[i + 1][j + 1], grid[i][j + 1]]))
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "model.rlb")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        """座標・面インデックス・面ID・共有頂点が保たれるか"""
+        Exporter(self.model).export_binary(self.path)
+        loaded = Model()
+        metadata = load_binary(self.path, loaded)
+
+        self.assertEqual(metadata, {"scope": "all", "coordinate_mode": "absolute", "reference_point": None})
+        np.testing.assert_array_equal(loaded.coordinates, self.model.coordinates)
+        np.testing.assert_array_equal(loaded.face_indices, self.model.face_indices)
+        self.assertEqual([f.id for f in loaded.faces], [f.id for f in self.model.faces])
+        self.assertEqual(loaded.vertex_count, 12)
+
+        # 共有頂点への書き込みが隣接面に伝播し、ファイルは変更されない（copy-on-write）
+        corner = loaded.faces[0].vertices[2]
+        self.assertIs(corner, loaded.faces[3].vertices[0])
+        notified = []
+        loaded.faces[3].add_observer(notified.append)
+        corner.x = 100.0
+        self.assertEqual(notified, [loaded.faces[3]])
+        self.assertEqual(read_binary(self.path)[0][corner.index, 0], 1.0)
+
+        # 読み込んだモデルへの面の追加・削除
+        loaded.add_face(Face([Vertex(0, 0, 9) for _ in range(4)]))
+        loaded.remove_face(loaded.faces[0])
+        self.assertEqual(len(loaded.faces), 6)
+        self.assertEqual(loaded.vertex_count, 15)
+
+    def test_relative_selection(self):
+        """選択範囲・相対座標の出力が、参照される頂点だけに詰められ絶対座標に復元されるか"""
+        face = self.model.faces[3]
+        Exporter(self.model).export_binary(self.path, 'selection', 'relative', Vertex(1, 2, 3), [face])
+        coordinates, quads, face_ids, metadata = read_binary(self.path)
+        self.assertEqual(metadata["reference_point"], [1.0, 2.0, 3.0])
+        self.assertEqual(coordinates.shape, (4, 3))
+        self.assertEqual(face_ids, [face.id])
+
+        loaded = Model()
+        load_binary(self.path, loaded)
+        np.testing.assert_array_equal(loaded.face_coordinates(), self.model.face_coordinates([3]))
+
+    def test_empty_model(self):
+        """面のないモデルを書き出し、空のモデルとして読み込めるか"""
+        Exporter(Model()).export_binary(self.path)
+        coordinates, quads, face_ids, _ = read_binary(self.path)
+        self.assertEqual((coordinates.shape, quads.shape, face_ids), ((0, 3), (0, 4), []))
+
+        load_binary(self.path, self.model)
+        self.assertEqual((self.model.face_count, self.model.vertex_count), (0, 0))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"<?xml version='1.0'?>")
+        with self.assertRaises(ValueError):
+            read_binary(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.bvh import FaceBVH
+from Core.geometry_utils import ray_intersects_face
+
+def _grid_model(n: int) -> Model:
+    """XY平面上に n x n 枚の四角形を、Z方向に少しずつずらして並べたモデル"""
+    model = Model()
+    for i in range(n):
+        for j in range(n):
+            z = 0.1 * ((i * 7 + j * 3) % 5)
+            model.add_face(Face([Vertex(i, j, z), Vertex(i + 1, j, z),
+                                 Vertex(i + 1, j + 1, z), Vertex(i, j + 1, z)]))
+    return model
+
+def _brute_force(model: Model, origin, direction):
+    hits = []
+    for row, face in enumerate(model.faces):
+        t = ray_intersects_face(origin, direction, face)
+        if t is not None:
+            hits.append((t, row))
+    return sorted(hits)
+
+class TestFaceBVH(unittest.TestCase):
+    def setUp(self):
+        self.model = _grid_model(12)
+        self.bvh = FaceBVH(self.model, leaf_size=4)
+        self.rng = np.random.default_rng(0)
+
+    def _random_rays(self, count):
+        for _ in range(count):
+            origin = (self.rng.uniform(-2, 14), self.rng.uniform(-2, 14), 10.0)
+            direction = np.array([self.rng.uniform(-0.3, 0.3), self.rng.uniform(-0.3, 0.3), -1.0])
+            yield origin, tuple((direction / np.linalg.norm(direction)).tolist())
+
+    def test_matches_linear_scan(self):
+        """最近傍・全交差の結果が線形走査と一致するかテスト"""
+        for origin, direction in self._random_rays(50):
+            expected = _brute_force(self.model, origin, direction)
+            self.assertEqual(self.bvh.intersect_all(origin, direction), expected)
+            nearest = self.bvh.intersect(origin, direction)
+            self.assertEqual(nearest, expected[0] if expected else None)
+
+    def test_refit_after_vertex_move(self):
+        """頂点の移動後、再フィットされたBVHで移動先の面が見つかるかテスト"""
+        face = self.model.faces[0]
+        self.bvh.intersect((0.5, 0.5, 10.0), (0.0, 0.0, -1.0))
+        with self.model.batch():
+            for v in face.vertices:
+                v.set(v.x + 50.0, v.y, v.z)
+        hit = self.bvh.intersect((50.5, 0.5, 10.0), (0.0, 0.0, -1.0))
+        self.assertEqual(hit[1], face.row)
+        self.assertIsNone(self.bvh.intersect((0.5, 0.5, 10.0), (0.0, 0.0, -1.0)))
+
+    def test_rebuild_after_topology_change(self):
+        """面の追加・削除後に再構築されるかテスト"""
+        new_face = Face([Vertex(0, 0, 5), Vertex(1, 0, 5), Vertex(1, 1, 5), Vertex(0, 1, 5)])
+        self.model.add_face(new_face)
+        self.assertEqual(self.bvh.intersect((0.5, 0.5, 10.0), (0.0, 0.0, -1.0))[1], new_face.row)
+
+        self.model.remove_face(new_face)
+        self.model.translate_all(0, 0, 1)
+        for origin, direction in self._random_rays(10):
+            self.assertEqual(self.bvh.intersect_all(origin, direction),
+                             _brute_force(self.model, origin, direction))
+
+        self.model.clear()
+        self.assertIsNone(self.bvh.intersect((0.5, 0.5, 10.0), (0.0, 0.0, -1.0)))
+
+if __name__ == '__main__':
+    unittest.main()
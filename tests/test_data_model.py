@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import Mock
+import numpy as np
 from Core.data_model import Vertex, Face, Model
+from Core.geometry_utils import calculate_center
 
 class TestDataModel(unittest.TestCase):
     def test_vertex_update_notification(self):
@@ -60,19 +62,352 @@ class TestDataModel(unittest.TestCase):
 
         # 追加
         model.add_face(face)
-        observer.assert_called_with(model)
+        change = observer.call_args[0][0]
+        self.assertIs(change.model, model)
+        self.assertEqual(change.added_faces, (face,))
+        self.assertTrue(change.topology)
         self.assertIn(face, model.faces)
 
-        # 頂点変更によるModelへの通知波及
+        # 頂点変更によるModelへの通知波及（変更集合には書き込まれた頂点のみが載る）
         observer.reset_mock()
         vertices[0].y = 5.0
-        observer.assert_called_with(model)
+        change = observer.call_args[0][0]
+        self.assertEqual(change.vertices.tolist(), [vertices[0].index])
+        self.assertFalse(change.topology or change.transform or change.added_faces)
 
         # 削除
         observer.reset_mock()
         model.remove_face(face)
-        observer.assert_called_with(model)
+        self.assertEqual(observer.call_args[0][0].removed_faces, (face,))
         self.assertNotIn(face, model.faces)
 
+    def test_model_vertex_buffer(self):
+        """Modelに追加された頂点が座標バッファのビューとなり、共有頂点が1行にまとまるかテスト"""
+        model = Model()
+        shared = Vertex(1, 0, 0)
+        face_a = Face([Vertex(0, 0, 0), shared, Vertex(1, 1, 0), Vertex(0, 1, 0)])
+        face_b = Face([shared, Vertex(2, 0, 0), Vertex(2, 1, 0), Vertex(1, 1, 0)])
+        model.add_face(face_a)
+        model.add_face(face_b)
+
+        self.assertEqual(model.vertex_count, 7)
+        self.assertEqual(model.coordinates.shape, (7, 3))
+        self.assertEqual(model.face_indices[0, 1], model.face_indices[1, 0])
+
+        # 頂点への書き込みはバッファに反映される
+        shared.x = 5.0
+        self.assertEqual(model.coordinates[shared.index, 0], 5.0)
+
+        # 読み取り専用ビューへの直接書き込みは禁止
+        with self.assertRaises(ValueError):
+            model.coordinates[0, 0] = 1.0
+
+    def test_model_remove_face_compacts_buffer(self):
+        """面の削除で未参照になった頂点がバッファから取り除かれ、残りのインデックスが整合するかテスト"""
+        model = Model()
+        face_a = Face([Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0), Vertex(0, 1, 0)])
+        face_b = Face([Vertex(0, 0, 1), Vertex(1, 0, 1), Vertex(1, 1, 1), Vertex(0, 1, 1)])
+        model.add_face(face_a)
+        model.add_face(face_b)
+
+        model.remove_face(face_a)
+        self.assertEqual(model.vertex_count, 4)
+        self.assertEqual(face_b.row, 0)
+        expected = [(v.x, v.y, v.z) for v in face_b.vertices]
+        self.assertEqual(model.face_coordinates()[0].tolist(), [list(p) for p in expected])
+
+        # 削除された面の頂点は座標を保持したまま独立する
+        self.assertEqual(face_a.vertices[2].index, -1)
+        self.assertEqual((face_a.vertices[2].x, face_a.vertices[2].y), (1.0, 1.0))
+
+    def test_face_index_and_bulk_edit(self):
+        """ID による面の検索、一括追加・削除の単一通知、スワップ削除後の行番号と頂点バッファの整合性テスト"""
+        model = Model()
+        observer = Mock()
+        model.add_observer(observer)
+        shared = [Vertex(i, 0, 0) for i in range(11)]
+        faces = [Face([shared[i], shared[i + 1], Vertex(i + 1, 1, 0), Vertex(i, 1, 0)], f"f{i}") for i in range(10)]
+
+        model.add_faces(faces)
+        observer.assert_called_once()
+        self.assertEqual(observer.call_args[0][0].added_faces, tuple(faces))
+        self.assertIs(model.get_face("f3"), faces[3])
+        self.assertIsNone(model.get_face("missing"))
+
+        # ID の重複・他のモデルに属する面は、何も追加せずにエラー
+        with self.assertRaises(ValueError):
+            model.add_faces([Face([Vertex(0, 0, 5) for _ in range(4)], "new"), Face([Vertex(0, 0, 6) for _ in range(4)], "f0")])
+        with self.assertRaises(ValueError):
+            Model().add_face(faces[0])
+        self.assertEqual(len(model.faces), 10)
+        self.assertIsNone(model.get_face("new"))
+
+        # 他のモデルに属する頂点を含む面の追加・頂点の付け替えは、頂点を登録する前に拒否され、モデルは変わらない
+        observer.reset_mock()
+        state = (model.vertex_count, model.center(), model.face_indices.copy())
+        foreign = faces[0].vertices[0]
+        with self.assertRaises(ValueError):
+            Model().add_faces([Face([Vertex(7, 7, 7), Vertex(8, 7, 7), Vertex(8, 8, 7), foreign])])
+        other = Model()
+        other.add_face(Face([Vertex(0, 0, 9), Vertex(1, 0, 9), Vertex(1, 1, 9), Vertex(0, 1, 9)]))
+        with self.assertRaises(ValueError):
+            model.add_face(Face([Vertex(7, 7, 7), Vertex(8, 7, 7), Vertex(8, 8, 7), other.vertex(0)], "mixed"))
+        old_vertices = list(faces[2].vertices)
+        with self.assertRaises(ValueError):
+            faces[2].update_vertices([Vertex(7, 7, 7), Vertex(8, 7, 7), Vertex(8, 8, 7), other.vertex(1)])
+        self.assertEqual(faces[2].vertices, old_vertices)
+        self.assertEqual((model.vertex_count, model.center()), state[:2])
+        np.testing.assert_array_equal(model.face_indices, state[2])
+        self.assertEqual(other.vertex_count, 4)
+        self.assertIsNone(model.get_face("mixed"))
+        observer.assert_not_called()
+
+        observer.reset_mock()
+        model.remove_faces([faces[1], faces[4], faces[9], faces[4], Face([Vertex(0, 0, 0) for _ in range(4)])])
+        observer.assert_called_once()
+        self.assertEqual(observer.call_args[0][0].removed_faces, (faces[1], faces[4], faces[9]))
+        self.assertEqual(len(model.faces), 7)
+        self.assertIsNone(model.get_face("f4"))
+        self.assertEqual((faces[4].model, faces[4].row), (None, -1))
+
+        # 残った面の行番号・インデックス配列・頂点数が、面の頂点と一致する
+        for row, face in enumerate(model.faces):
+            self.assertEqual(face.row, row)
+            self.assertEqual(model.face_indices[row].tolist(), [v.index for v in face.vertices])
+        self.assertEqual(model.vertex_count, len({v for face in model.faces for v in face.vertices}))
+        self.assertEqual(model.coordinates[faces[8].vertices[2].index].tolist(), [9.0, 1.0, 0.0])
+
+        # 一括読み込みでも索引が再構築され、重複した ID は読み込み前に拒否される
+        with self.assertRaises(ValueError):
+            model._load_arrays(np.zeros((4, 3)), [[0, 1, 2, 3], [3, 2, 1, 0]], ["a", "a"])
+        self.assertIs(model.get_face("f0"), faces[0])
+        model._load_arrays(np.zeros((4, 3)), [[0, 1, 2, 3]], ["a"])
+        self.assertIsNone(model.get_face("f0"))
+        self.assertIs(model.get_face("a"), model.faces[0])
+
+    def test_from_arrays(self):
+        """配列からの一括構築・to_arrays による往復と、要素の遅延生成・遅延した監視の登録のテスト"""
+        coordinates = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [2, 0, 0], [2, 1, 0]], dtype=np.float64)
+        quads = np.array([[0, 1, 2, 3], [1, 4, 5, 2]])
+        model = Model.from_arrays(coordinates, quads)
+        coordinates[0, 0] = 9.0
+        self.assertEqual(model.face_ids, ["0", "1"])
+        self.assertEqual(model.face_count, 2)
+        self.assertEqual(model.center(), (1.0, 0.5, 0.0))
+
+        restored = Model.from_arrays(*model.to_arrays())
+        np.testing.assert_array_equal(restored.coordinates, model.coordinates)
+        np.testing.assert_array_equal(restored.face_indices, quads)
+        self.assertEqual(restored.face_ids, ["0", "1"])
+        with self.assertRaises(ValueError):
+            Model.from_arrays(coordinates, [[0, 1, 2, 6]])
+        with self.assertRaises(ValueError):
+            Model.from_arrays(coordinates, quads, ["a", "a"])
+
+        # 要素は最初に参照された時点で生成され、共有頂点は同じ Vertex になる
+        self.assertEqual(model._faces, [None, None])
+        face = model.get_face("1")
+        self.assertIs(model.face(1), face)
+        self.assertIs(face.vertices[0], model.faces[0].vertices[1])
+        self.assertIs(model.vertex(4), face.vertices[1])
+        self.assertEqual([model.vertex(i).observer_count for i in range(model.vertex_count)], [0] * 6)
+
+        # 監視されていない面を経由せずに Model へ通知され、面は Observer の登録後にのみ頂点を監視する
+        model_observer, face_observer = Mock(), Mock()
+        model.add_observer(model_observer)
+        model.vertex(1).x = 1.5
+        model_observer.assert_called_once()
+        self.assertEqual(model_observer.call_args[0][0].vertices.tolist(), [1])
+        face.add_observer(face_observer)
+        model.vertex(1).x = 1.25
+        face_observer.assert_called_once_with(face)
+        self.assertEqual(model.faces_of_vertex(model.vertex(1)), [model.face(0), face])
+
+    def test_translate_all_and_center(self):
+        """translate_all が全頂点を一括移動し、一度だけ通知するかテスト"""
+        model = Model()
+        model.add_face(Face([Vertex(0, 0, 0), Vertex(2, 0, 0), Vertex(2, 2, 0), Vertex(0, 2, 0)]))
+        observer = Mock()
+        model.add_observer(observer)
+
+        model.translate_all(1.0, 2.0, 3.0)
+        observer.assert_called_once()
+        self.assertTrue(observer.call_args[0][0].transform)
+        self.assertEqual(model.center(), (2.0, 3.0, 3.0))
+        self.assertEqual(model.faces[0].vertices[0].z, 3.0)
+
+    def test_incremental_center_and_bounds(self):
+        """増分管理された重心・境界ボックスが、編集の後も全体からの再計算と一致するかテスト"""
+        model = Model()
+        self.assertEqual(model.center(), (0.0, 0.0, 0.0))
+        self.assertIsNone(model.bounds())
+
+        def assert_consistent():
+            np.testing.assert_allclose(model.center(), calculate_center(model.faces))
+            coords = model.coordinates
+            self.assertEqual(model.bounds(), (tuple(coords.min(axis=0).tolist()), tuple(coords.max(axis=0).tolist())))
+
+        shared = Vertex(4, 4, 4)
+        face_a = Face([Vertex(0, 0, 0), Vertex(2, 0, 0), shared, Vertex(0, 2, -1)])
+        face_b = Face([shared, Vertex(6, 4, 4), Vertex(6, 6, 4), Vertex(4, 6, 4)])
+        model.add_face(face_a)
+        model.add_face(face_b)
+        assert_consistent()
+
+        # 境界上の頂点が内側へ移動（縮小）・外側へ移動（拡大）
+        face_b.vertices[2].set(5, 5, 4)
+        assert_consistent()
+        shared.z = 10.0
+        assert_consistent()
+        model.translate_all(1, -2, 0.5)
+        assert_consistent()
+        face_a.update_vertices([Vertex(-3, 0, 0), *face_a.vertices[1:]])
+        assert_consistent()
+        model.remove_face(face_b)
+        assert_consistent()
+        model.remove_face(face_a)
+        self.assertEqual(model.center(), (0.0, 0.0, 0.0))
+        self.assertIsNone(model.bounds())
+
+    def test_vertex_set_single_notification(self):
+        """Vertex.set が3軸をまとめて更新し、通知が1回になるかテスト"""
+        v = Vertex(0, 0, 0)
+        observer = Mock()
+        v.add_observer(observer)
+
+        v.set(1, 2, 3)
+        observer.assert_called_once_with(v)
+        self.assertEqual((v.x, v.y, v.z), (1.0, 2.0, 3.0))
+
+        observer.reset_mock()
+        v.set(1, 2, 3)
+        observer.assert_not_called()
+
+    def test_batch_coalesces_notifications(self):
+        """batch() 中の通知が保留・重複排除され、終了時に1回だけ配送されるかテスト"""
+        model = Model()
+        vertices = [Vertex(i, 0, 0) for i in range(4)]
+        face = Face(vertices)
+        model.add_face(face)
+
+        model_observer = Mock()
+        face_observer = Mock()
+        vertex_observer = Mock()
+        model.add_observer(model_observer)
+        face.add_observer(face_observer)
+        vertices[0].add_observer(vertex_observer)
+
+        with model.batch():
+            with model.batch():
+                for i, v in enumerate(vertices):
+                    v.set(i, 1, 2)
+                vertices[0].x = 10.0
+            model.translate_all(1, 0, 0)
+            # ネストした内側の終了時点ではまだ配送されない
+            model_observer.assert_not_called()
+            face_observer.assert_not_called()
+
+        model_observer.assert_called_once()
+        face_observer.assert_called_once_with(face)
+        vertex_observer.assert_called_once_with(vertices[0])
+        self.assertEqual(vertices[0].x, 11.0)
+        # トランザクション内の全ての変更が1つの変更集合にまとまる
+        change = model_observer.call_args[0][0]
+        self.assertTrue(change.transform)
+        self.assertEqual(change.vertices.tolist(), [0, 1, 2, 3])
+
+        # トランザクション外では従来通り即時通知
+        model_observer.reset_mock()
+        vertices[1].z = 5.0
+        model_observer.assert_called_once()
+        self.assertEqual(model_observer.call_args[0][0].vertices.tolist(), [vertices[1].index])
+
+    def test_observer_registry(self):
+        """Observer の遅延確保・二重登録の無視・登録順の配送・多数の Observer の登録と解除"""
+        v = Vertex(0, 0, 0)
+        self.assertIsNone(v._observers)
+        self.assertEqual(v.observer_count, 0)
+
+        calls = []
+        observers = [lambda source, i=i: calls.append(i) for i in range(20)]
+        for observer in observers:
+            v.add_observer(observer)
+        v.add_observer(observers[0])
+        self.assertEqual(v.observer_count, 20)
+        v.x = 1.0
+        self.assertEqual(calls, list(range(20)))
+
+        # 配送中の解除は、その回の配送に影響しない
+        calls.clear()
+        v.add_observer(lambda source: v.remove_observer(observers[19]))
+        v.x = 2.0
+        self.assertEqual(calls, list(range(20)))
+        for observer in observers:
+            v.remove_observer(observer)
+        v.remove_observer(observers[0])
+        self.assertEqual(v.observer_count, 1)
+
+        # Face は Observer を持つ間だけ頂点を監視し、頂点の付け替えで古い頂点の登録が解除される
+        old = [Vertex(i, 0, 0) for i in range(4)]
+        face = Face(old)
+        self.assertEqual([vertex.observer_count for vertex in old], [0, 0, 0, 0])
+        face_observer = Mock()
+        face.add_observer(face_observer)
+        self.assertEqual([vertex.observer_count for vertex in old], [1, 1, 1, 1])
+        face.update_vertices([Vertex(i, 1, 0) for i in range(4)])
+        self.assertEqual([vertex.observer_count for vertex in old], [0, 0, 0, 0])
+        self.assertEqual([vertex.observer_count for vertex in face.vertices], [1, 1, 1, 1])
+        face.remove_observer(face_observer)
+        self.assertEqual([vertex.observer_count for vertex in face.vertices], [0, 0, 0, 0])
+
+    def test_weak_observer(self):
+        """弱参照で登録した Observer が、破棄された時点で自動的に外れるか"""
+        class Listener:
+            def __init__(self):
+                self.received = []
+
+            def on_changed(self, source):
+                self.received.append(source)
+
+        v = Vertex(0, 0, 0)
+        kept, dropped = Listener(), Listener()
+        v.add_observer(kept.on_changed, weak=True)
+        v.add_observer(dropped.on_changed, weak=True)
+        self.assertEqual(v.observer_count, 2)
+        v.x = 1.0
+        self.assertEqual(len(dropped.received), 1)
+
+        del dropped
+        self.assertEqual(v.observer_count, 1)
+        v.x = 2.0
+        self.assertEqual(len(kept.received), 2)
+
+        # 元のバウンドメソッドで解除できる
+        v.remove_observer(kept.on_changed)
+        self.assertIsNone(v._observers)
+
+    def test_dirty_tracker(self):
+        """DirtyTrackerに頂点の変更範囲と位相変更が蓄積されるかテスト"""
+        model = Model()
+        vertices = [Vertex(i, 0, 0) for i in range(4)]
+        model.add_face(Face(vertices))
+        tracker = model.create_dirty_tracker()
+        self.assertEqual(tracker.take(), (True, 0, 0))
+
+        vertices[2].x = 5.0
+        vertices[1].set(1, 1, 1)
+        self.assertEqual(tracker.take(), (False, 1, 3))
+        self.assertFalse(tracker.is_dirty)
+
+        model.translate_all(1, 0, 0)
+        self.assertEqual(tracker.take(), (False, 0, 4))
+
+        model.add_face(Face([Vertex(0, 0, i) for i in range(4)]))
+        self.assertTrue(tracker.take()[0])
+
+        model.release_dirty_tracker(tracker)
+        vertices[0].x = 9.0
+        self.assertFalse(tracker.is_dirty)
+
 if __name__ == '__main__':
     unittest.main()
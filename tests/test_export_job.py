@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from Core.data_model import Vertex, Face, Model
+from Service.exporter import Exporter
+from Service.export_job import ExportJob
+
+class TestExportJob(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        for i in range(10):
+            self.model.add_face(Face([Vertex(i, 0, 0), Vertex(i + 1, 0, 0), Vertex(i + 1, 1, 0), Vertex(i, 1, 0)]))
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "model.xml")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_exports_snapshot_in_background(self):
+        """スナップショット取得後のモデル編集は出力に影響せず、進捗が総面数まで進むか"""
+        snapshot = Exporter(self.model).snapshot()
+        self.model.translate_all(100, 0, 0)
+        self.model.remove_face(self.model.faces[0])
+
+        with patch.object(Exporter, "FACES_PER_CHUNK", 3):
+            job = ExportJob(Exporter.write_xml, snapshot, self.path)
+            job.start()
+            self.assertTrue(job.wait(10))
+        self.assertEqual(job.state, ExportJob.SUCCEEDED)
+        self.assertEqual(job.progress, (10, 10))
+
+        expected = os.path.join(self.dir.name, "expected.xml")
+        self.model.translate_all(-100, 0, 0)
+        self.model.add_face(Face([Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0), Vertex(0, 1, 0)]))
+        Exporter.write_xml(snapshot, expected)
+        with open(self.path, "rb") as a, open(expected, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_cancel_leaves_no_partial_file(self):
+        """中止した場合に書きかけのファイルが残らず、既存のファイルも変更されないか"""
+        with open(self.path, "w") as f:
+            f.write("previous")
+        snapshot = Exporter(self.model).snapshot()
+
+        # 最初のチャンクを書き込んだ時点で中止する
+        def write(snapshot, filepath, progress, is_cancelled):
+            def on_progress(done, total):
+                job.cancel()
+                progress(done, total)
+            Exporter.write_xml(snapshot, filepath, on_progress, is_cancelled)
+
+        with patch.object(Exporter, "FACES_PER_CHUNK", 2):
+            job = ExportJob(write, snapshot, self.path)
+            job.start()
+            self.assertTrue(job.wait(10))
+        self.assertEqual(job.state, ExportJob.CANCELLED)
+        self.assertEqual(job.progress, (2, 10))
+        self.assertEqual(os.listdir(self.dir.name), ["model.xml"])
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "previous")
+
+    def test_failure_is_reported(self):
+        snapshot = Exporter(self.model).snapshot()
+        job = ExportJob(Exporter.write_xml, snapshot, os.path.join(self.dir.name, "missing", "model.xml"))
+        job.start()
+        self.assertTrue(job.wait(10))
+        self.assertEqual(job.state, ExportJob.FAILED)
+        self.assertTrue(job.error)
+
+if __name__ == '__main__':
+    unittest.main()
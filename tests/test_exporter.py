@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import xml.etree.ElementTree as ET
+from Core.data_model import Vertex, Face, Model
+from Service.exporter import Exporter
+
+def reference_export(filepath, faces, scope, coordinate_mode, reference_point):
+    """従来の ElementTree による実装（出力の参照用）"""
+    root = ET.Element("ModelingData")
+    settings_elem = ET.SubElement(root, "ExportSettings")
+    ET.SubElement(settings_elem, "Scope").text = scope
+    ET.SubElement(settings_elem, "CoordinateMode").text = coordinate_mode
+    ref = (0.0, 0.0, 0.0)
+    if coordinate_mode == 'relative' and reference_point:
+        ref_elem = ET.SubElement(settings_elem, "ReferencePoint")
+        ref_elem.set("x", str(reference_point.x))
+        ref_elem.set("y", str(reference_point.y))
+        ref_elem.set("z", str(reference_point.z))
+        ref = (reference_point.x, reference_point.y, reference_point.z)
+    models_elem = ET.SubElement(root, "Models")
+    model_elem = ET.SubElement(models_elem, "Model", id="main_model")
+    for face in faces:
+        face_elem = ET.SubElement(model_elem, "Face", id=face.id)
+        for v_idx, v in enumerate(face.vertices):
+            ET.SubElement(face_elem, "Vertex", index=str(v_idx),
+                          x=str(float(v.x - ref[0])), y=str(float(v.y - ref[1])), z=str(float(v.z - ref[2])))
+    tree = ET.ElementTree(root)
+    ET.indent(tree, space="    ", level=0)
+    tree.write(filepath, encoding="utf-8", xml_declaration=True)
+
+def make_face():
+    return Face([Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0), Vertex(0, 1, 0)])
+
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        for i in range(10):
+            self.model.add_face(Face([Vertex(i, 0.1 * i, -1e-7 * i), Vertex(i + 1, 0, 2.5),
+                                      Vertex(i + 1, 1, 1e20), Vertex(i, 1, -3)]))
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _read(self, name):
+        with open(os.path.join(self.dir.name, name), "rb") as f:
+            return f.read()
+
+    def assert_matches_reference(self, faces, scope='all', mode='absolute', ref=None, selected=None):
+        streamed = os.path.join(self.dir.name, "streamed.xml")
+        expected = os.path.join(self.dir.name, "expected.xml")
+        Exporter(self.model).export_xml(streamed, scope, mode, ref, selected)
+        reference_export(expected, faces, scope, mode, ref)
+        self.assertEqual(self._read("streamed.xml"), self._read("expected.xml"))
+
+    def test_streamed_output_is_byte_identical(self):
+        """逐次書き出しの出力が ElementTree の出力とバイト単位で一致するか"""
+        self.assert_matches_reference(self.model.faces)
+        self.assert_matches_reference(self.model.faces, mode='relative', ref=Vertex(0.5, -2, 1e-3))
+        face = self.model.faces[3]
+        self.assert_matches_reference([face], scope='selection', selected=[face])
+        # 複数選択は選択した順ではなくモデル内の並び順で出力する（他のモデルの面は含めない）
+        faces = self.model.faces
+        self.assert_matches_reference([faces[2], faces[5], faces[7]], scope='selection',
+                                      selected=[faces[7], faces[2], make_face(), faces[5]])
+        # 選択中の面がどれもモデルに属さない場合は、空の文書を書き出さずにエラー
+        removed = faces[4]
+        self.model.remove_face(removed)
+        path = os.path.join(self.dir.name, "stale.xml")
+        with self.assertRaises(ValueError):
+            Exporter(self.model).export_xml(path, 'selection', 'absolute', None, [removed, make_face()])
+        self.assertFalse(os.path.exists(path))
+
+    def test_chunk_boundaries_and_empty_model(self):
+        """チャンク境界をまたぐ場合と、面が1つもない場合の出力"""
+        with patch.object(Exporter, "FACES_PER_CHUNK", 3):
+            self.assert_matches_reference(self.model.faces)
+
+        self.model = Model()
+        self.assert_matches_reference([])
+
+    def test_parallel_output_is_byte_identical(self):
+        """複数プロセスで整形した断片を連結した出力が、逐次の出力と一致し進捗が順に通知されるか"""
+        for mode, ref in (('absolute', None), ('relative', Vertex(0.5, -2, 1e-3))):
+            snapshot = Exporter(self.model).snapshot('all', mode, ref)
+            serial = os.path.join(self.dir.name, "serial.xml")
+            parallel = os.path.join(self.dir.name, "parallel.xml")
+            progress = []
+            with patch.object(Exporter, "FACES_PER_CHUNK", 3):
+                Exporter.write_xml(snapshot, serial)
+                Exporter.write_xml(snapshot, parallel, lambda done, total: progress.append(done), processes=2)
+            self.assertEqual(self._read("parallel.xml"), self._read("serial.xml"))
+            self.assertEqual(progress, [3, 6, 9, 10])
+
+if __name__ == '__main__':
+    unittest.main()
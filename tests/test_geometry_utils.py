@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.geometry_utils import (ray_intersects_triangle, ray_intersects_quad, ray_intersects_face,
+                                 ray_quad_distances, ray_intersects_quads, calculate_center,
+                                 face_centroids, project_points, points_in_rect, points_in_polygon)
+
+class TestGeometryUtils(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        # 原点付近にランダムな（非平面を含む）四角形を散らす
+        self.quads = rng.uniform(-2.0, 2.0, size=(200, 4, 3))
+        directions = rng.normal(size=(30, 3))
+        self.directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+        self.origins = -5.0 * self.directions + rng.uniform(-0.5, 0.5, size=(30, 3))
+
+    def test_triangle_basic(self):
+        """三角形の交差・非交差・並行の判定をテスト"""
+        v0, v1, v2 = (0, 0, 0), (1, 0, 0), (0, 1, 0)
+        self.assertAlmostEqual(ray_intersects_triangle((0.2, 0.2, 1), (0, 0, -1), v0, v1, v2), 1.0)
+        self.assertIsNone(ray_intersects_triangle((2, 2, 1), (0, 0, -1), v0, v1, v2))
+        self.assertIsNone(ray_intersects_triangle((0.2, 0.2, 1), (1, 0, 0), v0, v1, v2))
+        # 背後にある三角形とは交差しない
+        self.assertIsNone(ray_intersects_triangle((0.2, 0.2, 1), (0, 0, 1), v0, v1, v2))
+
+    def test_face_uses_nearest_triangle(self):
+        """Faceの判定が2つの三角形の近い方を返すかテスト"""
+        face = Face([Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0), Vertex(0, 1, 0)])
+        self.assertAlmostEqual(ray_intersects_face((0.2, 0.8, 2), (0, 0, -1), face), 2.0)
+
+    def test_vectorized_kernel_matches_scalar(self):
+        """ベクトル化カーネルの距離がスカラー版とビット単位で一致するかテスト"""
+        for origin, direction in zip(self.origins.tolist(), self.directions.tolist()):
+            t = ray_quad_distances(origin, direction, self.quads)
+            for quad, actual in zip(self.quads.tolist(), t.tolist()):
+                expected = ray_intersects_quad(origin, direction, quad)
+                self.assertEqual(actual, float('inf') if expected is None else expected)
+
+    def test_batch_nearest_hits(self):
+        """複数レイの一括判定がレイごとの最近傍面を返すかテスト"""
+        distances, indices = ray_intersects_quads(self.origins, self.directions, self.quads)
+        self.assertEqual(distances.shape, (30,))
+        hit_count = 0
+        for r, (origin, direction) in enumerate(zip(self.origins.tolist(), self.directions.tolist())):
+            hits = [(t, i) for i, quad in enumerate(self.quads.tolist())
+                    if (t := ray_intersects_quad(origin, direction, quad)) is not None]
+            if hits:
+                hit_count += 1
+                self.assertEqual((distances[r], indices[r]), min(hits))
+            else:
+                self.assertEqual((distances[r], indices[r]), (np.inf, -1))
+        self.assertGreater(hit_count, 0)
+
+        # 1本のレイ (3,) も受け付ける
+        distance, index = ray_intersects_quads(self.origins[0], self.directions[0], self.quads)
+        self.assertEqual((distance[0], index[0]), (distances[0], indices[0]))
+
+    def test_calculate_center(self):
+        """重心計算が Model 所属の有無に依らず一致するかテスト"""
+        face = Face([Vertex(0, 0, 0), Vertex(2, 0, 0), Vertex(2, 2, 0), Vertex(0, 2, 4)])
+        self.assertEqual(calculate_center([face]), (1.0, 1.0, 1.0))
+        self.assertEqual(calculate_center([]), (0.0, 0.0, 0.0))
+
+    def test_project_points(self):
+        """一括投影が gluProject と同じ式（列優先の行列、ビューポート変換）で計算され、視点の背後の点が除外されるか"""
+        # gluPerspective(45, 4/3, 0.1, 100) と glTranslatef(0, 0, -10) に相当する行列（数学的な行優先の表現）
+        f = 1.0 / np.tan(np.radians(45.0) / 2.0)
+        near, far = 0.1, 100.0
+        projection = np.array([[f / (4 / 3), 0, 0, 0], [0, f, 0, 0],
+                               [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)], [0, 0, -1, 0]])
+        modelview = np.identity(4)
+        modelview[2, 3] = -10.0
+        viewport = (0, 0, 800, 600)
+
+        points = np.array([[0.0, 0.0, 0.0], [1.0, -2.0, 3.0], [0.0, 0.0, 20.0]])
+        window, visible = project_points(points, modelview.T, projection.T, viewport)
+        np.testing.assert_allclose(window[0, :2], (400.0, 300.0))
+        clip = projection @ modelview @ np.array([1.0, -2.0, 3.0, 1.0])
+        ndc = clip[:3] / clip[3]
+        np.testing.assert_allclose(window[1], (400 * (ndc[0] + 1), 300 * (ndc[1] + 1), (ndc[2] + 1) / 2))
+        self.assertEqual(visible.tolist(), [True, True, False])
+
+    def test_region_tests_and_centroids(self):
+        """矩形（角の向きを問わない）・多角形（凹形を含む）の内外判定と、面の重心の一括計算"""
+        points = np.array([[1.0, 1.0], [3.0, 1.0], [1.0, 3.0], [5.0, 5.0]])
+        self.assertEqual(points_in_rect(points, (4, 0), (0, 2)).tolist(), [True, True, False, False])
+        # L字型の多角形: (1, 3) は内側、(3, 3) は切り欠き部分
+        polygon = [(0, 0), (4, 0), (4, 2), (2, 2), (2, 4), (0, 4)]
+        self.assertEqual(points_in_polygon(np.array([[1, 3], [3, 3], [3, 1], [5, 1]]), polygon).tolist(),
+                         [True, False, True, False])
+        self.assertFalse(points_in_polygon(points, [(0, 0), (1, 1)]).any())
+
+        model = Model()
+        model.add_face(Face([Vertex(0, 0, 0), Vertex(2, 0, 0), Vertex(2, 2, 0), Vertex(0, 2, 4)]))
+        model.add_face(Face([Vertex(5, 5, 5) for _ in range(4)]))
+        np.testing.assert_array_equal(face_centroids(model), [[1, 1, 1], [5, 5, 5]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import unittest
+from unittest.mock import Mock, patch
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.transform import rotation, scaling, about_pivot
+from Service.history import EditHistory
+
+def make_quad(x=0.0):
+    return Face([Vertex(x, 0, 0), Vertex(x + 1, 0, 0), Vertex(x + 1, 1, 0), Vertex(x, 1, 0)])
+
+class TestEditHistory(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        self.face = make_quad()
+        self.model.add_face(self.face)
+        self.history = EditHistory(self.model)
+
+    def test_vertex_edit_undo_redo(self):
+        """頂点の編集が取り消し・やり直しでき、新しい編集でやり直しの履歴が破棄されるか"""
+        vertex = self.face.vertices[0]
+        self.history.set_vertex(vertex, 5, 6, 7)
+        self.assertEqual((vertex.x, vertex.y, vertex.z), (5, 6, 7))
+        self.assertEqual(self.history.undo_label, "Edit Vertex")
+
+        self.assertTrue(self.history.undo())
+        self.assertEqual((vertex.x, vertex.y, vertex.z), (0, 0, 0))
+        self.assertFalse(self.history.can_undo)
+        self.assertTrue(self.history.redo())
+        self.assertEqual((vertex.x, vertex.y, vertex.z), (5, 6, 7))
+
+        self.history.undo()
+        self.history.set_vertex(vertex, 1, 1, 1)
+        self.assertFalse(self.history.can_redo)
+        # 値が変わらない編集は記録しない
+        self.history.set_vertex(vertex, 1, 1, 1)
+        self.assertEqual(self.history.undo_count, 1)
+
+    def test_coalescing(self):
+        """同じキーの連続した編集が1つの操作にまとめられ、時間が空いた場合や取り消し後はまとめられないか"""
+        vertex = self.face.vertices[1]
+        with patch("Service.history.time.monotonic") as clock:
+            for now, x in ((0.0, 2.0), (0.5, 3.0), (1.2, 4.0)):
+                clock.return_value = now
+                self.history.set_vertex(vertex, x, 0, 0, coalesce_key=("vertex", vertex))
+            self.assertEqual(self.history.undo_count, 1)
+            clock.return_value = 5.0
+            self.history.set_vertex(vertex, 9.0, 0, 0, coalesce_key=("vertex", vertex))
+        self.assertEqual(self.history.undo_count, 2)
+
+        self.history.undo()
+        self.assertEqual(vertex.x, 4.0)
+        self.history.undo()
+        self.assertEqual(vertex.x, 1.0)
+
+        # 別の頂点への編集はまとめない
+        other = self.face.vertices[2]
+        self.history.set_vertex(vertex, 2, 0, 0, coalesce_key=("vertex", vertex))
+        self.history.set_vertex(other, 2, 2, 2, coalesce_key=("vertex", other))
+        self.assertEqual(self.history.undo_count, 2)
+
+        # 平行移動も移動量を合成して1つにまとめる
+        self.history.clear()
+        for _ in range(3):
+            self.history.translate_all(1, 0, 0, coalesce_key=("object_position", 0))
+        self.assertEqual(self.history.undo_count, 1)
+        self.history.undo()
+        self.assertEqual(vertex.x, 2.0)
+
+    def test_transform_stores_matrix_and_undoes(self):
+        """変換は頂点数によらず行列として記録され、取り消しで元の座標・重心に戻るか"""
+        for i in range(1, 50):
+            self.model.add_face(make_quad(i * 2.0))
+        before = self.model.coordinates.copy()
+        center = self.model.center()
+
+        self.history.apply_transform(about_pivot(rotation('y', 33), center), label="Rotate")
+        self.history.translate_all(1, 2, 3)
+        self.assertLess(self.history.memory_usage, 2048)
+
+        self.history.undo()
+        self.history.undo()
+        np.testing.assert_allclose(self.model.coordinates, before, atol=1e-12)
+        np.testing.assert_allclose(self.model.center(), center, atol=1e-12)
+
+        self.history.redo()
+        np.testing.assert_allclose(self.model.coordinates[0], before[0] @ rotation('y', 33)[:3, :3].T
+                                   + about_pivot(rotation('y', 33), center)[:3, 3])
+
+        # 逆行列を持たない変換（拡大率 0）は頂点座標として記録し、取り消しで復元する
+        self.history.clear()
+        target = self.model.faces[3]
+        original = [[v.x, v.y, v.z] for v in target.vertices]
+        self.history.apply_transform(scaling(0), [target])
+        self.history.undo()
+        self.assertEqual([[v.x, v.y, v.z] for v in target.vertices], original)
+
+    def test_singular_whole_model_transform(self):
+        """逆行列を持たないモデル全体の変換が座標配列として記録され、要素を生成せずに取り消し・やり直しできるか"""
+        grid = np.array([[i, j, 0.5 * i * j] for i in range(4) for j in range(3)], dtype=float)
+        quads = [[i * 3 + j, (i + 1) * 3 + j, (i + 1) * 3 + j + 1, i * 3 + j + 1] for i in range(3) for j in range(2)]
+        model = Model.from_arrays(grid, quads)
+        history = EditHistory(model)
+        before = model.coordinates.copy()
+        center = model.center()
+
+        history.apply_transform(scaling(1, 1, 0))
+        flattened = model.coordinates.copy()
+        np.testing.assert_array_equal(flattened[:, 2], 0.0)
+        history.undo()
+        np.testing.assert_array_equal(model.coordinates, before)
+        np.testing.assert_allclose(model.center(), center)
+        history.redo()
+        np.testing.assert_array_equal(model.coordinates, flattened)
+        self.assertEqual(model.bounds()[1][2], 0.0)
+        self.assertTrue(all(face is None for face in model._faces))
+        self.assertTrue(all(model._store.owner(i) is None for i in range(model.vertex_count)))
+
+        # 頂点の並びを変える面の削除を取り消した後も、記録したインデックスが同じ頂点を指す
+        removed = model.face(0)
+        history.remove_face(removed)
+        history.undo()
+        self.assertEqual([v.index for v in removed.vertices], quads[0])
+        history.undo()
+        np.testing.assert_array_equal(model.coordinates, before)
+        self.assertEqual([[v.x, v.y, v.z] for v in removed.vertices], before[quads[0]].tolist())
+
+    def test_face_add_remove_and_transaction(self):
+        """面の追加・削除の取り消しと、transaction による複数の編集の1操作化・通知の集約"""
+        observer = Mock()
+        self.model.add_observer(observer)
+        added = make_quad(3.0)
+        with self.history.transaction("Replace"):
+            self.history.add_face(added)
+            self.history.remove_face(self.face)
+        self.assertEqual(observer.call_count, 1)
+        self.assertEqual(self.history.undo_count, 1)
+        self.assertEqual(self.model.faces, [added])
+
+        self.history.undo()
+        self.assertEqual(observer.call_count, 2)
+        self.assertEqual(self.model.faces, [self.face])
+        self.assertEqual(self.model.vertex_count, 4)
+        self.assertIsNone(added.model)
+        self.history.redo()
+        self.assertEqual(self.model.faces, [added])
+        self.assertIsNone(self.face.model)
+
+    def test_memory_budget(self):
+        """見積もりサイズが予算を超えた場合に古い操作から破棄され、上限内に収まるか"""
+        history = EditHistory(self.model, budget_bytes=4096)
+        vertex = self.face.vertices[0]
+        for i in range(200):
+            history.set_vertex(vertex, i + 1, 0, 0)
+        self.assertLessEqual(history.memory_usage, 4096)
+        self.assertGreater(history.undo_count, 0)
+        self.assertLess(history.undo_count, 200)
+        kept = history.undo_count
+        while history.undo():
+            pass
+        # 破棄された操作より前には戻れないが、残った操作は正しく戻る
+        self.assertEqual(vertex.x, 200 - kept)
+
+        history.budget_bytes = 0
+        self.assertEqual(history.memory_usage, 0)
+        self.assertFalse(history.can_undo or history.can_redo)
+
+    def test_observer(self):
+        observer = Mock()
+        self.history.add_observer(observer)
+        self.history.set_vertex(self.face.vertices[0], 1, 0, 0)
+        self.history.undo()
+        self.history.redo()
+        self.history.clear()
+        self.assertEqual(observer.call_count, 4)
+        observer.assert_called_with(self.history)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Service.exporter import Exporter
+from Service.importer import Importer
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        corners = {(x, y, z): Vertex(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1.5, 2.25)}
+        for points, face_id in ((((-1, -1, 2.25), (1, -1, 2.25), (1, 1, 2.25), (-1, 1, 2.25)), "front"),
+                                (((-1, 1, 2.25), (1, 1, 2.25), (1, 1, -1.5), (-1, 1, -1.5)), "top")):
+            self.model.add_face(Face([corners[p] for p in points], face_id))
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "model.xml")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        """エクスポートした XML から同じ面・座標が復元され、再出力が一致するか"""
+        Exporter(self.model).export_xml(self.path)
+        loaded = Model()
+        observer = Mock()
+        loaded.add_observer(observer)
+        settings = Importer(loaded).import_xml(self.path)
+
+        self.assertEqual(settings, {"scope": "all", "coordinate_mode": "absolute", "reference_point": None})
+        self.assertEqual([f.id for f in loaded.faces], ["front", "top"])
+        np.testing.assert_array_equal(loaded.face_coordinates(), self.model.face_coordinates())
+        # XML は頂点の共有を持たないため、面ごとに独立した頂点となる
+        self.assertEqual(loaded.vertex_count, 8)
+        # 面ごとの通知は発生せず、モデルの通知は1回
+        observer.assert_called_once()
+        self.assertTrue(observer.call_args[0][0].reset)
+
+        again = os.path.join(self.dir.name, "again.xml")
+        Exporter(loaded).export_xml(again)
+        with open(self.path, "rb") as a, open(again, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_relative_coordinates_and_welding(self):
+        """相対座標は基準点を加算して復元され、weld_vertices で頂点の共有が復元されるか"""
+        Exporter(self.model).export_xml(self.path, 'all', 'relative', Vertex(0.5, -2, 10))
+        loaded = Model()
+        settings = Importer(loaded).import_xml(self.path, weld_vertices=True)
+
+        self.assertEqual(settings["reference_point"], [0.5, -2.0, 10.0])
+        np.testing.assert_array_equal(loaded.face_coordinates(), self.model.face_coordinates())
+        self.assertEqual(loaded.vertex_count, 6)
+        self.assertIs(loaded.faces[0].vertices[3], loaded.faces[1].vertices[0])
+
+    def test_replaces_existing_content_and_rejects_malformed_faces(self):
+        Exporter(self.model).export_xml(self.path)
+        Importer(self.model).import_xml(self.path)
+        self.assertEqual(len(self.model.faces), 2)
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('<ModelingData><Models><Model id="m"><Face id="a">'
+                    '<Vertex index="0" x="0" y="0" z="0" /></Face></Model></Models></ModelingData>')
+        with self.assertRaises(ValueError):
+            Importer(Model()).import_xml(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+from Core.data_model import Vertex, Face, Model
+from Core.metrics import Metrics, metrics
+
+class TestMetrics(unittest.TestCase):
+    def test_disabled_mode_records_nothing(self):
+        m = Metrics()
+        with m.span("work") as args:
+            self.assertIsNone(args)
+        self.assertIs(m.span("a"), m.span("b"))
+        m.count("calls")
+        m.instant("click")
+        self.assertEqual(m.counters(), {})
+        self.assertEqual(m.chrome_trace()["traceEvents"], [])
+
+    def test_chrome_trace_and_ring_buffer(self):
+        """スパン・インスタント・カウンターが Chrome トレース形式で書き出され、リングバッファが古いイベントを捨てるか"""
+        m = Metrics()
+        m.enable(capacity=3)
+        with m.span("paint", "ui", frame=1) as args:
+            args["faces"] = 6
+        m.instant("click", "ui", x=1.5)
+        m.count("notify.Model", 2)
+        m.count("notify.Model")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            m.dump_chrome_trace(path)
+            with open(path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+        span, instant, counter = events
+        self.assertEqual((span["name"], span["cat"], span["ph"]), ("paint", "ui", "X"))
+        self.assertEqual(span["args"], {"frame": 1, "faces": 6})
+        self.assertGreaterEqual(span["dur"], 0.0)
+        self.assertEqual((instant["ph"], instant["args"]), ("i", {"x": 1.5}))
+        self.assertEqual((counter["name"], counter["ph"], counter["args"]), ("notify.Model", "C", {"value": 3}))
+
+        for i in range(5):
+            m.instant(f"event{i}")
+        self.assertEqual([e["name"] for e in m.chrome_trace()["traceEvents"] if e["ph"] == "i"],
+                         ["event2", "event3", "event4"])
+
+        with self.assertRaises(ValueError):
+            with m.span("failing"):
+                raise ValueError()
+        self.assertEqual(m.chrome_trace()["traceEvents"][2]["args"], {"error": "ValueError"})
+
+    def test_notification_fan_out_counters(self):
+        """通知の配送回数が Observable の型ごとに数えられ、batch() 中の保留も数えられるか"""
+        model = Model()
+        vertices = [Vertex(i, 0, 0) for i in range(4)]
+        face = Face(vertices)
+        model.add_face(face)
+        # 面は Observer を持つ間だけ頂点を監視する
+        face.add_observer(lambda source: None)
+        model.add_observer(lambda source: None)
+        model.add_observer(lambda source: None)
+
+        metrics.reset()
+        metrics.enable()
+        try:
+            vertices[0].x = 5.0
+            with model.batch():
+                vertices[1].x = 5.0
+                vertices[2].x = 5.0
+        finally:
+            metrics.disable()
+        counters = metrics.counters()
+        metrics.reset()
+        # 頂点 -> 面（1回）、面 -> 1つの購読者、モデル -> 2つの購読者（モデルへは頂点から直接通知される）
+        self.assertEqual(counters["notify.Vertex"], 3)
+        self.assertEqual(counters["notify.Face"], 2)
+        self.assertEqual(counters["notify.Model"], 4)
+        self.assertEqual(counters["notify.deferred.Vertex"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.transform import translation
+
+def _strip_model(count):
+    """x 方向に並んだ count 枚の面。隣り合う面は2頂点を共有する"""
+    coordinates = [(x, y, 0.0) for x in range(count + 1) for y in (0.0, 1.0)]
+    quads = [[2 * i, 2 * i + 2, 2 * i + 3, 2 * i + 1] for i in range(count)]
+    return Model.from_arrays(coordinates, quads)
+
+class TestModelChange(unittest.TestCase):
+    def setUp(self):
+        self.model = _strip_model(4)
+        self.observer = Mock()
+        self.model.add_observer(self.observer)
+
+    def last_change(self):
+        return self.observer.call_args[0][0]
+
+    def test_vertex_writes(self):
+        """書き込まれた頂点・その範囲・影響を受ける面が変更集合から分かり、無関係な面は影響を受けないこと"""
+        self.model.vertex(4).y = 0.5
+        change = self.last_change()
+        self.assertFalse(change.is_empty)
+        self.assertEqual(change.vertices.tolist(), [4])
+        self.assertEqual(change.vertex_range, (4, 5))
+        self.assertEqual(change.face_rows().tolist(), [1, 2])
+        self.assertTrue(change.affects_face(self.model.face(2)))
+        self.assertFalse(change.affects_face(self.model.face(0)))
+        self.assertFalse(change.affects_face(_strip_model(4).face(1)))
+
+    def test_batch_accumulates_one_change(self):
+        """batch() 中の書き込み・部分変換が1つの変更集合（重複なし）にまとまり、配送後は新しい変更集合になること"""
+        with self.model.batch():
+            self.model.vertex(9).x = 5.0
+            self.model.vertex(0).x = -1.0
+            self.model.vertex(9).x = 6.0
+            self.model.apply_transform(translation(0, 0, 1), [self.model.face(3)])
+        self.observer.assert_called_once()
+        change = self.last_change()
+        self.assertEqual(change.vertices.tolist(), [0, 6, 7, 8, 9])
+        self.assertEqual(change.vertex_range, (0, 10))
+        self.assertFalse(change.transform or change.topology)
+
+        self.model.vertex(1).x = 0.5
+        self.assertEqual(self.last_change().vertices.tolist(), [1])
+
+    def test_whole_model_transform(self):
+        self.model.translate_all(1, 0, 0)
+        change = self.last_change()
+        self.assertTrue(change.transform)
+        self.assertEqual(change.vertex_range, (0, self.model.vertex_count))
+        self.assertEqual(change.face_rows().tolist(), [0, 1, 2, 3])
+        self.assertTrue(change.affects_face(self.model.face(0)))
+
+    def test_added_and_removed_faces(self):
+        """面の追加・削除が記録され、同じトランザクション内で追加して削除した面は相殺されること"""
+        kept = Face([Vertex(0, 0, 5), Vertex(1, 0, 5), Vertex(1, 1, 5), Vertex(0, 1, 5)])
+        temporary = Face([Vertex(0, 0, 6), Vertex(1, 0, 6), Vertex(1, 1, 6), Vertex(0, 1, 6)])
+        removed = self.model.face(0)
+        with self.model.batch():
+            self.model.add_faces([kept, temporary])
+            self.model.remove_faces([temporary, removed])
+        change = self.last_change()
+        self.assertEqual(change.added_faces, (kept,))
+        self.assertEqual(change.removed_faces, (removed,))
+        self.assertTrue(change.topology)
+        # 位相の変更は全ての面に影響するものとして扱う
+        self.assertTrue(change.affects_face(self.model.face(1)))
+
+    def test_reset(self):
+        self.model.clear()
+        change = self.last_change()
+        self.assertTrue(change.reset)
+        self.assertIsNone(change.vertex_range)
+        self.assertEqual(len(change.face_rows()), 0)
+
+    def test_changes_during_dispatch_go_to_next_change(self):
+        """Observer 内で行った変更は、配送中の変更集合ではなく次の通知の変更集合に記録されること"""
+        received = []
+        def on_changed(change):
+            received.append(change.vertices.tolist())
+            if len(received) == 1:
+                self.model.vertex(3).x = 2.0
+        self.model.add_observer(on_changed)
+        self.model.vertex(2).x = 2.0
+        self.assertEqual(received, [[2], [3]])
+        np.testing.assert_array_equal(self.model.coordinates[[2, 3], 0], [2.0, 2.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import Mock
+from Core.data_model import Vertex, Face
+from Service.selection_manager import SelectionManager, SelectionChange
+
+def make_face():
+    return Face([Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0), Vertex(0, 1, 0)])
+
+class TestSelectionManager(unittest.TestCase):
+    def setUp(self):
+        self.faces = [make_face() for _ in range(5)]
+        self.manager = SelectionManager()
+        self.observer = Mock()
+        self.manager.add_observer(self.observer)
+
+    def test_single_selection(self):
+        """単一選択の置き換え・解除が差分として通知され、変化がない場合は通知されないか"""
+        a, b = self.faces[:2]
+        self.manager.select_face(a)
+        self.observer.assert_called_with(SelectionChange((a,), (), a))
+        self.manager.select_face(b)
+        self.observer.assert_called_with(SelectionChange((b,), (a,), b))
+        self.manager.select_face(b)
+        self.assertEqual(self.observer.call_count, 2)
+        self.manager.select_face(None)
+        self.observer.assert_called_with(SelectionChange((), (b,), None))
+        self.assertIsNone(self.manager.selected_face)
+
+    def test_multi_selection_deltas(self):
+        """複数選択の追加・解除・反転・置き換えで、差分のみが通知され主選択が維持されるか"""
+        a, b, c, d, e = self.faces
+        self.manager.select_face(a)
+        self.manager.add_faces([b, c, a])
+        self.observer.assert_called_with(SelectionChange((b, c), (), c))
+        self.assertTrue(self.manager.is_selected(b))
+        self.assertIn(c, self.manager)
+        self.assertNotIn(d, self.manager)
+        self.assertEqual(self.manager.selected_faces, [a, b, c])
+
+        # 主選択が外れた場合は、残りのうち最後に選択した面が主選択となる
+        self.manager.toggle_face(c)
+        self.observer.assert_called_with(SelectionChange((), (c,), b))
+        self.manager.toggle_face(d)
+        self.observer.assert_called_with(SelectionChange((d,), (), d))
+
+        # 置き換えは差分のみを通知し、残った主選択を維持する
+        self.manager.set_selection([d, e, a])
+        self.observer.assert_called_with(SelectionChange((e,), (b,), d))
+        self.assertEqual(len(self.manager), 3)
+
+        # 選択に含まれない面の解除は通知しない
+        count = self.observer.call_count
+        self.manager.remove_faces([b, c])
+        self.assertEqual(self.observer.call_count, count)
+
+        self.manager.clear()
+        self.observer.assert_called_with(SelectionChange((), (d, e, a), None))
+        self.assertEqual(self.manager.count, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.spatial_hash import VertexHash
+from Service.snapping import Snapper, SNAP_GRID, SNAP_VERTEX
+
+def scattered_model(count, seed=0):
+    rng = np.random.default_rng(seed)
+    coordinates = rng.uniform(-10.0, 10.0, size=(count * 4, 3))
+    model = Model()
+    model._load_arrays(coordinates, np.arange(count * 4).reshape(-1, 4), [f"f{i}" for i in range(count)])
+    return model
+
+class TestVertexHash(unittest.TestCase):
+    def setUp(self):
+        self.model = scattered_model(500)
+        self.index = VertexHash(self.model)
+        self.points = np.random.default_rng(1).uniform(-12.0, 12.0, size=(20, 3))
+
+    def brute_force(self, point):
+        distances = np.linalg.norm(self.model.coordinates - point, axis=1)
+        order = np.lexsort((np.arange(len(distances)), distances))
+        return order, distances[order]
+
+    def assert_matches_brute_force(self):
+        for point in self.points:
+            order, distances = self.brute_force(point)
+            indices, found = self.index.within(point, 2.5)
+            np.testing.assert_array_equal(indices, order[distances <= 2.5])
+            indices, found = self.index.nearest(point, 5)
+            np.testing.assert_array_equal(indices, order[:5])
+            np.testing.assert_allclose(found, distances[:5])
+
+    def test_queries_match_brute_force(self):
+        """半径内・k 近傍の結果が全頂点の走査と一致するか（範囲外の点・全頂点を超える k を含む）"""
+        self.assert_matches_brute_force()
+        indices, _ = self.index.nearest((1000.0, 0.0, 0.0), 3)
+        np.testing.assert_array_equal(indices, self.brute_force(np.array([1000.0, 0.0, 0.0]))[0][:3])
+        indices, _ = self.index.nearest((0.0, 0.0, 0.0), self.model.vertex_count + 10)
+        self.assertEqual(len(indices), self.model.vertex_count)
+        indices, _ = self.index.nearest((1000.0, 0.0, 0.0), 1, max_distance=5.0)
+        self.assertEqual(len(indices), 0)
+
+    def test_exclude(self):
+        vertex = self.model.vertex(7)
+        point = (vertex.x, vertex.y, vertex.z)
+        self.assertEqual(self.index.nearest(point)[0][0], 7)
+        self.assertNotIn(7, self.index.nearest(point, 3, exclude=[7])[0].tolist())
+
+    def test_incremental_updates(self):
+        """頂点の移動（セルの移動・元のセルへの復帰）、全体の移動、面の追加・削除が次の問い合わせに反映されるか"""
+        vertex = self.model.vertex(3)
+        original = (vertex.x, vertex.y, vertex.z)
+        vertex.set(50.0, 50.0, 50.0)
+        self.assertEqual(self.index.nearest((50.0, 50.0, 50.0))[0].tolist(), [3])
+        self.assert_matches_brute_force()
+        vertex.set(*original)
+        self.assertEqual(self.index.nearest(original)[0].tolist(), [3])
+        self.assertEqual(len(self.index.within((50.0, 50.0, 50.0), 1.0)[0]), 0)
+
+        self.model.translate_all(0.5, -0.25, 3.0)
+        self.assert_matches_brute_force()
+
+        face = Face([Vertex(30, 30, 30), Vertex(31, 30, 30), Vertex(31, 31, 30), Vertex(30, 31, 30)])
+        self.model.add_face(face)
+        self.assertEqual(self.index.nearest((30.0, 30.0, 30.0))[0].tolist(), [face.vertices[0].index])
+        self.model.remove_face(self.model.faces[0])
+        self.assert_matches_brute_force()
+
+class TestSnapper(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        self.face = Face([Vertex(0, 0, 0), Vertex(1, 0, 0), Vertex(1, 1, 0), Vertex(0, 1, 0)])
+        self.model.add_face(self.face)
+        self.snapper = Snapper(self.model, spacing=0.25)
+
+    def test_grid_snap(self):
+        self.assertEqual(self.snapper.snap((0.3, -0.4, 1.0)), (0.3, -0.4, 1.0))
+        self.snapper.set_mode(SNAP_GRID)
+        self.assertEqual(self.snapper.snap((0.3, -0.4, 1.0)), (0.25, -0.5, 1.0))
+        with self.assertRaises(ValueError):
+            self.snapper.set_spacing(0.0)
+        with self.assertRaises(ValueError):
+            self.snapper.set_mode("edge")
+
+    def test_vertex_snap(self):
+        """吸着距離内の最も近い頂点へ補正され、編集中の頂点自身には吸着しないか"""
+        self.snapper.set_mode(SNAP_VERTEX)
+        moving = self.face.vertices[0]
+        self.assertEqual(self.snapper.snap((0.9, 0.1, 0.1), exclude=[moving]), (1.0, 0.0, 0.0))
+        self.assertEqual(self.snapper.snap((0.5, 0.5, 0.0), exclude=[moving]), (0.5, 0.5, 0.0))
+        self.assertEqual(self.snapper.snap((0.1, 0.0, 0.0), exclude=[moving]), (0.1, 0.0, 0.0))
+        self.assertIs(self.snapper.nearest_vertex((0.1, 0.0, 0.0)), moving)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.topology import build_vertex_face_adjacency, weld_coordinates
+
+def _cube_faces(shared: bool):
+    corners = {}
+    def vertex(x, y, z):
+        if not shared:
+            return Vertex(x, y, z)
+        return corners.setdefault((x, y, z), Vertex(x, y, z))
+    quads = [
+        [(-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)],
+        [(1, -1, -1), (-1, -1, -1), (-1, 1, -1), (1, 1, -1)],
+        [(-1, 1, 1), (1, 1, 1), (1, 1, -1), (-1, 1, -1)],
+        [(-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)],
+        [(1, -1, 1), (1, -1, -1), (1, 1, -1), (1, 1, 1)],
+        [(-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1)],
+    ]
+    return [Face([vertex(*p) for p in q]) for q in quads]
+
+class TestTopology(unittest.TestCase):
+    def test_vertex_face_adjacency(self):
+        """CSR形式の頂点→面隣接関係が正しく構築されるかテスト"""
+        quads = np.array([[0, 1, 2, 3], [1, 4, 5, 2]])
+        offsets, rows = build_vertex_face_adjacency(quads, 6)
+        self.assertEqual(rows[offsets[1]:offsets[2]].tolist(), [0, 1])
+        self.assertEqual(rows[offsets[4]:offsets[5]].tolist(), [1])
+        self.assertEqual(offsets[-1], 8)
+
+    def test_weld_coordinates(self):
+        """重複座標が最初の出現順で統合されるかテスト"""
+        coords = np.array([[1, 0, 0], [0, 0, 0], [1, 0, 0], [0, 0, 0.0004]])
+        representatives, inverse = weld_coordinates(coords)
+        self.assertEqual(representatives.tolist(), [0, 1, 3])
+        self.assertEqual(inverse.tolist(), [0, 1, 0, 2])
+
+        representatives, inverse = weld_coordinates(coords, tolerance=0.01)
+        self.assertEqual(representatives.tolist(), [0, 1])
+        self.assertEqual(inverse.tolist(), [0, 1, 0, 1])
+
+    def test_shared_cube_vertex_pool(self):
+        """共有頂点で構築した立方体が8頂点で構成され、隣接面を取得できるかテスト"""
+        model = Model()
+        for face in _cube_faces(shared=True):
+            model.add_face(face)
+        self.assertEqual(model.vertex_count, 8)
+
+        corner = model.faces[0].vertices[2]  # (1, 1, 1)
+        adjacent = model.faces_of_vertex(corner)
+        self.assertEqual(len(adjacent), 3)
+
+        # 1回の書き込みで隣接する全ての面が通知される
+        observers = [Mock() for _ in adjacent]
+        for face, observer in zip(adjacent, observers):
+            face.add_observer(observer)
+        corner.x = 2.0
+        for face, observer in zip(adjacent, observers):
+            observer.assert_called_once_with(face)
+
+        # 共有頂点は最後の参照が外れるまでプールに残る
+        model.remove_face(adjacent[0])
+        self.assertEqual(model.vertex_count, 8)
+        self.assertEqual(len(model.faces_of_vertex(corner)), 2)
+        for face in list(model.faces):
+            model.remove_face(face)
+        self.assertEqual(model.vertex_count, 0)
+        self.assertEqual(corner.x, 2.0)
+
+    def test_weld_vertices(self):
+        """面ごとに独立した頂点の立方体が溶接で8頂点に統合されるかテスト"""
+        model = Model()
+        for face in _cube_faces(shared=False):
+            model.add_face(face)
+        self.assertEqual(model.vertex_count, 24)
+        before = model.face_coordinates().copy()
+
+        observer = Mock()
+        model.add_observer(observer)
+        self.assertEqual(model.weld_vertices(), 16)
+        observer.assert_called_once()
+        self.assertTrue(observer.call_args[0][0].topology)
+
+        self.assertEqual(model.vertex_count, 8)
+        np.testing.assert_array_equal(model.face_coordinates(), before)
+        corner = model.faces[0].vertices[2]
+        self.assertEqual(len(model.faces_of_vertex(corner)), 3)
+        self.assertIs(model.faces[2].vertices[1], corner)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from Core.data_model import Vertex, Face, Model
+from Core.geometry_utils import calculate_center
+from Core.transform import (translation, scaling, rotation, mirroring, about_pivot, compose,
+                            transform_points, as_matrix)
+
+class TestTransform(unittest.TestCase):
+    def test_matrix_builders(self):
+        points = np.array([[1.0, 0.0, 0.0], [0.0, 2.0, 3.0]])
+        np.testing.assert_array_equal(transform_points(points, translation(1, 2, 3)), [[2, 2, 3], [1, 4, 6]])
+        np.testing.assert_array_equal(transform_points(points, scaling(2)), [[2, 0, 0], [0, 4, 6]])
+        np.testing.assert_array_equal(transform_points(points, rotation('z', 90)), [[0, 1, 0], [-2, 0, 3]])
+        np.testing.assert_array_equal(transform_points(points, mirroring('y')), [[1, 0, 0], [0, -2, 3]])
+        # 任意軸の回転は座標軸の回転と一致する
+        np.testing.assert_allclose(rotation((0, 0, 2), 30), rotation('z', 30))
+        # compose は引数の順に適用する（拡大してから移動）
+        np.testing.assert_array_equal(transform_points(points, compose(scaling(2), translation(1, 0, 0))),
+                                      [[3, 0, 0], [1, 4, 6]])
+        # 基準点を中心とする変換では基準点は動かない
+        pivot = (1.0, 2.0, 3.0)
+        np.testing.assert_allclose(transform_points(np.array([pivot]), about_pivot(rotation('x', 37), pivot)),
+                                   [pivot])
+
+        with self.assertRaises(ValueError):
+            as_matrix(np.identity(3))
+        with self.assertRaises(ValueError):
+            as_matrix(np.ones((4, 4)))
+
+    def test_apply_transform_to_whole_model(self):
+        """モデル全体への変換が1回の通知で適用され、重心・境界ボックス・変更範囲が更新されるか"""
+        model = Model()
+        model.add_face(Face([Vertex(0, 0, 0), Vertex(2, 0, 0), Vertex(2, 2, 0), Vertex(0, 2, 0)]))
+        observer = Mock()
+        model.add_observer(observer)
+        tracker = model.create_dirty_tracker()
+        tracker.take()
+
+        model.apply_transform(about_pivot(scaling(2, 1, 1), model.center()))
+        observer.assert_called_once()
+        self.assertTrue(observer.call_args[0][0].transform)
+        self.assertEqual(tracker.take(), (False, 0, 4))
+        self.assertEqual(model.center(), (1.0, 1.0, 0.0))
+        self.assertEqual(model.bounds(), ((-1.0, 0.0, 0.0), (3.0, 2.0, 0.0)))
+        self.assertEqual(model.faces[0].vertices[1].x, 3.0)
+
+    def test_apply_transform_to_face_subset(self):
+        """指定した面の頂点のみが変換され、共有頂点を介して隣接面も追従するか"""
+        model = Model()
+        shared = [Vertex(1, 0, 0), Vertex(1, 1, 0)]
+        left = Face([Vertex(0, 0, 0), shared[0], shared[1], Vertex(0, 1, 0)])
+        right = Face([shared[0], Vertex(2, 0, 0), Vertex(2, 1, 0), shared[1]])
+        model.add_face(left)
+        model.add_face(right)
+        observer = Mock()
+        model.add_observer(observer)
+
+        model.apply_transform(translation(0, 0, 5), [right])
+        observer.assert_called_once()
+        change = observer.call_args[0][0]
+        self.assertFalse(change.transform)
+        self.assertEqual(change.vertices.tolist(), sorted(v.index for v in right.vertices))
+        self.assertTrue(change.affects_face(left))
+        self.assertEqual([v.z for v in left.vertices], [0.0, 5.0, 5.0, 0.0])
+        self.assertEqual([v.z for v in right.vertices], [5.0] * 4)
+        np.testing.assert_allclose(model.center(), calculate_center(model.faces))
+        self.assertEqual(model.bounds(), ((0.0, 0.0, 0.0), (2.0, 1.0, 5.0)))
+
+        with self.assertRaises(ValueError):
+            model.apply_transform(translation(1, 0, 0), [Face([Vertex(0, 0, 0)] * 4)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from Core.data_model import Model
+from Core.bvh import FaceBVH
+from Core.geometry_utils import frustum_planes, classify_boxes, project_points, OUTSIDE, INSIDE, INTERSECTING
+from Core.visibility import plan_visibility
+
+def perspective(fovy, aspect, near, far):
+    f = 1.0 / np.tan(np.radians(fovy) / 2.0)
+    return np.array([[f / aspect, 0, 0, 0], [0, f, 0, 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)], [0, 0, -1, 0]])
+
+def camera(x, y, distance):
+    """(x, y, distance) から -z 方向を見るカメラの modelview / projection（glGetDoublev と同じ列優先の配列）"""
+    modelview = np.identity(4)
+    modelview[:3, 3] = (-x, -y, -distance)
+    return modelview.T, perspective(45.0, 1.0, 0.1, 100000.0).T
+
+def grid(columns, rows):
+    xs, ys = np.meshgrid(np.arange(columns + 1, dtype=np.float64), np.arange(rows + 1, dtype=np.float64))
+    coordinates = np.column_stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)])
+    cells = np.arange(columns * rows)
+    lower_left = (cells // columns) * (columns + 1) + cells % columns
+    quads = np.column_stack([lower_left, lower_left + 1, lower_left + columns + 2, lower_left + columns + 1])
+    model = Model()
+    model._load_arrays(coordinates, quads, [f"f{i}" for i in cells])
+    return model
+
+class TestVisibility(unittest.TestCase):
+    def setUp(self):
+        self.model = grid(100, 100)
+        self.bvh = FaceBVH(self.model)
+        self.viewport = (0, 0, 800, 800)
+
+    def test_classify_boxes(self):
+        """AABB の視錐台判定（外側・交差・内側、空の箱）"""
+        planes = frustum_planes(*camera(0, 0, 10))
+        lo = np.array([[-1.0, -1.0, -1.0], [-1.0, -1.0, 20.0], [-100.0, -1.0, -1.0], [np.inf] * 3])
+        hi = np.array([[1.0, 1.0, 1.0], [1.0, 1.0, 21.0], [1.0, 1.0, 1.0], [-np.inf] * 3])
+        self.assertEqual(classify_boxes(lo, hi, planes).tolist(), [INSIDE, OUTSIDE, INTERSECTING, OUTSIDE])
+
+    def test_culling_is_conservative(self):
+        """画面内に投影される面は全て計画に含まれ、画面外の面の多くが除外されるか"""
+        modelview, projection = camera(10, 10, 8)
+        plan = plan_visibility(self.bvh, modelview, projection, self.viewport, point_pixels=0.0, wire_pixels=0.0)
+        corners, visible = project_points(self.model.face_coordinates().reshape(-1, 3), modelview, projection,
+                                          self.viewport)
+        on_screen = (visible & np.all((corners[:, :2] >= 0) & (corners[:, :2] <= 800), axis=1)).reshape(-1, 4)
+        expected = np.flatnonzero(on_screen.any(axis=1))
+        self.assertTrue(set(expected.tolist()) <= set(plan.fill_rows.tolist()))
+        self.assertLess(len(plan.fill_rows), len(self.model.faces) // 10)
+        np.testing.assert_array_equal(np.sort(plan.wire_rows), np.sort(plan.fill_rows))
+        self.assertEqual(len(plan.points), 0)
+
+        # カメラの背後にある場合は何も描画しない
+        modelview, projection = camera(10, 10, -5)
+        self.assertEqual(plan_visibility(self.bvh, modelview, projection, self.viewport).visible_faces, 0)
+
+    def test_level_of_detail(self):
+        """遠方ではワイヤーフレームを省き、さらに遠方では葉を点で代用するか。近くでは全て詳細に描画するか"""
+        near = plan_visibility(self.bvh, *camera(50, 50, 3), self.viewport)
+        self.assertEqual(len(near.points), 0)
+        self.assertEqual(len(near.wire_rows), len(near.fill_rows))
+
+        middle = plan_visibility(self.bvh, *camera(50, 50, 2000), self.viewport)
+        self.assertEqual(middle.visible_faces, len(self.model.faces))
+        self.assertEqual(len(middle.fill_rows), len(self.model.faces))
+        self.assertLess(len(middle.wire_rows), len(self.model.faces) // 10)
+        self.assertEqual(len(middle.points), 0)
+
+        far = plan_visibility(self.bvh, *camera(50, 50, 20000), self.viewport)
+        # 点で代用した葉と詳細に描画した面を合わせると、全ての面を覆う（Morton 順の境界で細長くなった一部の葉は詳細のまま残る）
+        self.assertLess(len(far.fill_rows), len(self.model.faces) // 100)
+        self.assertEqual(len(far.fill_rows) + 8 * len(far.points), len(self.model.faces))
+
+    def test_follows_model_changes(self):
+        """頂点の移動（再フィット）と面の削除（再構築）が次の計画に反映されるか"""
+        modelview, projection = camera(-50, -50, 10)
+        self.assertEqual(plan_visibility(self.bvh, modelview, projection, self.viewport).visible_faces, 0)
+        face = self.model.faces[0]
+        with self.model.batch():
+            for vertex in face.vertices:
+                vertex.set(vertex.x - 50, vertex.y - 50, vertex.z)
+        plan = plan_visibility(self.bvh, modelview, projection, self.viewport)
+        self.assertIn(face.row, plan.fill_rows.tolist())
+
+        # 移動した頂点を共有する面を全て削除すると、再び何も見えなくなる
+        with self.model.batch():
+            for other in {f for vertex in face.vertices for f in self.model.faces_of_vertex(vertex)}:
+                self.model.remove_face(other)
+        self.assertEqual(plan_visibility(self.bvh, modelview, projection, self.viewport).visible_faces, 0)
+
+if __name__ == '__main__':
+    unittest.main()